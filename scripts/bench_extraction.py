@@ -0,0 +1,128 @@
+"""Benchmark of the extraction of the results from the odb.
+
+`extract_odb_data` is run outside of Abaqus on the synthetic odb of
+`tests/fake_odb.py`, with a nodal field (`U`) and a field at the integration points
+of the elements (`S`) holding half of the values each. Each case runs in its
+own process, and the throughput in rows (values) per second and the peak
+resident memory are reported.
+
+Usage
+-----
+python scripts/bench_extraction.py --values 10000 1000000 10000000 --formats db npy
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# the synthetic odb is shared with the tests
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+import fake_odb  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# the extraction script is loaded on its own, as when it runs in Abaqus
+SCRIPT = os.path.join(os.path.dirname(__file__), "..", "src", "compas_fea2_abaqus", "results", "results_to_sql.py")
+# requests of the fields, see `results_to_sql.field_request`
+FIELDS = [
+    {"name": "u", "abaqus_fields": ["U"], "components": [["U1", "x"], ["U2", "y"], ["U3", "z"]]},
+    {
+        "name": "s",
+        "abaqus_fields": ["S"],
+        "components": [["S11", "s11"], ["S22", "s22"], ["S33", "s33"], ["S12", "s12"], ["S13", "s13"], ["S23", "s23"]],
+    },
+]
+
+
+def peak_rss():
+    """Peak resident memory of the process in MB."""
+    if resource is None:
+        return float("nan")
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / 1e6 if sys.platform == "darwin" else rss / 1e3
+
+
+def run(values, file_format, parts, integration_points, frames, reduction):
+    nodes = max(1, values // (2 * parts))
+    elements = max(1, values // (2 * parts * integration_points))
+    fake_odb.ODB = fake_odb.build(
+        nodes=nodes, elements=elements, integration_points=integration_points, parts=parts, frames=frames
+    )
+    sys.modules["odbAccess"] = fake_odb
+    spec = importlib.util.spec_from_file_location("results_to_sql", SCRIPT)
+    results_to_sql = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(results_to_sql)
+
+    rows = parts * (nodes + elements * integration_points) * frames
+    baseline = peak_rss()
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        fields = [results_to_sql.field_request(frames="all", reduction=reduction, **field) for field in FIELDS]
+        results_to_sql.extract_odb_data(folder, "bench", fields, file_format=file_format)
+        elapsed = time.perf_counter() - start
+    return {"rows": rows, "time": elapsed, "baseline": baseline, "peak": peak_rss()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--values", type=int, nargs="*", default=[10000, 1000000, 10000000], help="values per frame")
+    parser.add_argument("--formats", nargs="*", default=["db", "npy"])
+    parser.add_argument("--parts", type=int, default=2, help="number of parts")
+    parser.add_argument("--integration-points", type=int, default=4, help="integration points per element")
+    parser.add_argument("--frames", type=int, default=1, help="frames of the step")
+    parser.add_argument("--reduction", default=None, help="reduction of the values at the integration points")
+    parser.add_argument("--case", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        # single case, in the process started below
+        values, file_format = args.case.split(":")
+        result = run(int(values), file_format, args.parts, args.integration_points, args.frames, args.reduction)
+        print(json.dumps(result))
+        return
+
+    print(
+        "{:>10} {:>6} {:>12} {:>10} {:>12} {:>14} {:>12}".format(
+            "values", "format", "rows", "time [s]", "rows/s", "baseline [MB]", "peak [MB]"
+        )
+    )
+    options = [
+        "--parts={}".format(args.parts),
+        "--integration-points={}".format(args.integration_points),
+        "--frames={}".format(args.frames),
+    ]
+    if args.reduction:
+        options.append("--reduction={}".format(args.reduction))
+    for values in args.values:
+        for file_format in args.formats:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--case={}:{}".format(values, file_format)] + options,
+                check=True,
+                stdout=subprocess.PIPE,
+                universal_newlines=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                "{:>10} {:>6} {:>12} {:>10.2f} {:>12.0f} {:>14.1f} {:>12.1f}".format(
+                    values,
+                    file_format,
+                    result["rows"],
+                    result["time"],
+                    result["rows"] / result["time"],
+                    result["baseline"],
+                    result["peak"],
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
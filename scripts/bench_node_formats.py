@@ -0,0 +1,57 @@
+"""Benchmark of the node coordinates formats of the input file.
+
+For each format policy, the `*Node` block of a synthetic mesh is written to a
+temporary file with :func:`compas_fea2_abaqus.model.nodes.iter_nodes_jobdata`,
+and the file size and the write throughput are reported.
+
+Usage
+-----
+python scripts/bench_node_formats.py --nodes 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from compas_fea2_abaqus.job.streaming import BUFFER_SIZE
+from compas_fea2_abaqus.job.streaming import write_lines
+from compas_fea2_abaqus.model.nodes import FLOAT_FORMATS
+from compas_fea2_abaqus.model.nodes import iter_nodes_jobdata
+
+
+def bench(keys, xyz, policy, path):
+    start = time.perf_counter()
+    with open(path, "w", buffering=BUFFER_SIZE) as f:
+        write_lines(f, iter_nodes_jobdata(keys, xyz, policy=policy))
+    elapsed = time.perf_counter() - start
+    return os.path.getsize(path), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=1000000, help="number of nodes")
+    parser.add_argument("--scale", type=float, default=100.0, help="size of the bounding box of the mesh")
+    parser.add_argument("--formats", nargs="*", default=list(FLOAT_FORMATS) + ["%.6f", "%.8g"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    keys = np.arange(1, args.nodes + 1)
+    xyz = rng.uniform(-args.scale, args.scale, (args.nodes, 3))
+
+    print("{:>10} {:>12} {:>10} {:>12} {:>12}".format("format", "size [MB]", "time [s]", "MB/s", "nodes/s"))
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "nodes.inp")
+        for policy in args.formats:
+            size, elapsed = bench(keys, xyz, policy, path)
+            print(
+                "{:>10} {:>12.1f} {:>10.2f} {:>12.1f} {:>12.0f}".format(
+                    policy, size / 1e6, elapsed, size / 1e6 / elapsed, args.nodes / elapsed
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
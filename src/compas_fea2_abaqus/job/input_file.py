@@ -1,4 +1,6 @@
+import os
 from datetime import datetime
+from functools import partial
 import compas_fea2
 import compas_fea2_abaqus
 from compas_fea2.job import InputFile
@@ -6,6 +8,13 @@ from compas_fea2.job.input_file import ParametersFile
 
 from compas_fea2.units import no_units
 
+from ..model.parts import parts_renderer
+from .streaming import BUFFER_SIZE
+from .streaming import read_manifest
+from .streaming import write_lines
+from .streaming import write_manifest
+from .streaming import write_sections
+
 
 class AbaqusInputFile(InputFile):
     """"""
@@ -33,6 +42,97 @@ class AbaqusInputFile(InputFile):
         str
             content of the input file
         """
+        return "\n".join(self.iter_jobdata())
+
+    @no_units
+    def iter_jobdata(self, **kwargs):
+        """Yield the content of the input file line by line.
+
+        Parameters
+        ----------
+        kwargs : dict
+            Options passed to :meth:`iter_sections`.
+
+        Yields
+        ------
+        str
+            input file data line.
+        """
+        for _, _, lines in self.iter_sections(**kwargs):
+            yield from lines()
+
+    @no_units
+    def iter_sections(self, include_parts=None, path=None, renderer=None):
+        """Yield the sections of the input file.
+
+        Parameters
+        ----------
+        include_parts : str, optional
+            Folder where the parts are written as separate include files, by
+            default ``None``, which writes the parts in the input file.
+        path : str, optional
+            Folder of the input file, used to reference the include files with
+            a relative path. Required with `include_parts`.
+        renderer : :class:`compas_fea2_abaqus.model.parts.PartsRenderer`, optional
+            Open pool of processes rendering the parts in parallel, by default
+            ``None``, which renders them in the current process. With
+            `include_parts`, the missing include files are rendered in
+            parallel before being referenced.
+
+        Yields
+        ------
+        tuple
+            ``(name, fingerprint, lines)`` of each section, see
+            :mod:`compas_fea2_abaqus.job.streaming`.
+        """
+        yield "heading", None, lambda: [self._generate_heading_section()]
+        if include_parts:
+            if renderer:
+                self.model._write_part_includes(include_parts, renderer)
+            yield from self.model.iter_sections(part_section=partial(self._include_section, include_parts, path))
+        else:
+            yield from self.model.iter_sections(renderer=renderer)
+        yield "problem", None, lambda: [
+            """**
+**------------------------------------------------------------------
+**------------------------------------------------------------------
+** PROBLEM
+**------------------------------------------------------------------
+**------------------------------------------------------------------"""
+        ]
+        yield from self.problem.iter_sections()
+
+    def _include_section(self, folder, path, part):
+        """Return the section including a part written to a separate file.
+
+        Parameters
+        ----------
+        folder : str
+            Folder of the include file.
+        path : str
+            Folder of the input file.
+        part : :class:`compas_fea2_abaqus.model.AbaqusPart`
+            The part.
+
+        Returns
+        -------
+        tuple
+            ``(fingerprint, lines)`` of the section.
+        """
+
+        def lines():
+            file_path = part._write_include(folder)
+            try:
+                # abaqus is launched from the folder of the input file
+                file_path = os.path.relpath(file_path, path)
+            except ValueError:
+                # on Windows, when the files are on different drives
+                pass
+            return [f"*Include, input={file_path}"]
+
+        return None, lines
+
+    def _generate_heading_section(self):
         now = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
         return f"""*Heading
 ** Job name: {self.problem.name}
@@ -51,14 +151,98 @@ class AbaqusInputFile(InputFile):
 ** MODEL
 **------------------------------------------------------------------
 **------------------------------------------------------------------
-**
-{self.model.jobdata}**
-**------------------------------------------------------------------
-**------------------------------------------------------------------
-** PROBLEM
-**------------------------------------------------------------------
-**------------------------------------------------------------------
-{self.problem.jobdata}"""
+**"""
+
+    # ==============================================================================
+    # Writing methods
+    # ==============================================================================
+
+    @no_units
+    def write(self, fileobj, workers=None):
+        """Stream the content of the input file to a file object.
+
+        The input file is written section by section, so that the whole
+        content is never held in memory.
+
+        Parameters
+        ----------
+        fileobj : file
+            Text file object opened for writing.
+        workers : int, optional
+            Number of processes rendering the parts in parallel, by default
+            ``None``, which renders them in the current process.
+
+        Returns
+        -------
+        None
+        """
+        with parts_renderer(workers) as renderer:
+            write_lines(fileobj, self.iter_jobdata(renderer=renderer))
+
+    @no_units
+    def write_to_file(self, path=None, incremental=False, include_parts=None, workers=None):
+        """Writes the InputFile to a file in a specified location.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path to the folder where the input file will be saved, by default
+            ``None``. If not provided, the Problem path attributed is used.
+        incremental : bool, optional
+            If ``True``, the parts and the instances whose content did not
+            change since the previous incremental write are copied from the
+            existing input file instead of being generated again, by default
+            ``False``. The fingerprints of the sections are stored next to the
+            input file in `<name>-sections.json`.
+        include_parts : str | bool, optional
+            Folder where each part is written to its own include file, named
+            after the part and the fingerprint of its content, and referenced
+            with `*Include`. Existing include files are reused, so problems
+            sharing the same parts (e.g. load combinations) write them only
+            once when they use the same folder. If ``True``, the folder of the
+            input file is used. By default ``None``, which writes the parts in
+            the input file.
+        workers : int, optional
+            Number of processes rendering the parts in parallel, by default
+            ``None``, which renders them in the current process. The content
+            of the input file does not depend on the number of workers. Each
+            worker streams a part to a temporary file, or to its include file
+            with `include_parts`. The pool lives until the input file is
+            written.
+
+        Returns
+        -------
+        str
+            Path to the input file.
+        """
+        path = path or self.problem.path
+        if not path:
+            raise ValueError("A path to the folder for the input file must be provided")
+        file_path = os.path.join(path, f"{self.problem.name}.{self._extension}")
+        if include_parts is True:
+            include_parts = path
+        if include_parts:
+            os.makedirs(include_parts, exist_ok=True)
+        with parts_renderer(workers) as renderer:
+            options = dict(include_parts=include_parts, path=path, renderer=renderer)
+            if not incremental:
+                with open(file_path, "w", buffering=BUFFER_SIZE) as f:
+                    write_lines(f, self.iter_jobdata(**options))
+                return file_path
+
+            manifest_path = os.path.join(path, f"{self.problem.name}-sections.json")
+            previous = read_manifest(manifest_path, file_path)
+            if previous:
+                # the sections are spliced from the previous file into a new one
+                temp_path = file_path + ".tmp"
+                with open(file_path, "rb") as source, open(temp_path, "w", buffering=BUFFER_SIZE) as f:
+                    sections = write_sections(f, self.iter_sections(**options), previous=previous, source=source)
+                os.replace(temp_path, file_path)
+            else:
+                with open(file_path, "w", buffering=BUFFER_SIZE) as f:
+                    sections = write_sections(f, self.iter_sections(**options))
+        write_manifest(manifest_path, file_path, sections)
+        return file_path
 
 
 class _AbaqusRestartInputFile(InputFile):
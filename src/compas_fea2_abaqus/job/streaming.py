@@ -0,0 +1,275 @@
+"""Helpers to stream the input file instead of building it in memory.
+
+Note
+----
+Every ``iter_jobdata`` generator of the backend yields *lines*, i.e. chunks of
+text without the trailing newline (a chunk may span several lines, as long as
+it does not end with a newline). Joining the lines with ``"\\n"`` gives back
+the corresponding ``jobdata`` string, while :func:`write_lines` writes the very
+same content to a file object one chunk at a time.
+
+The input file is also split in named *sections*, described by a tuple
+``(name, fingerprint, lines)``: `lines` is a callable returning the lines of
+the section and `fingerprint` is either ``None`` or a callable returning a
+digest of everything the section depends on. :func:`write_sections` uses the
+fingerprints to copy the unchanged sections from the previous input file
+instead of rendering them again.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Size of the buffer used when writing the input file to disk.
+BUFFER_SIZE = 2**20
+
+# Version of the layout of the sections manifest.
+MANIFEST_VERSION = 1
+
+
+def or_comment(lines, comment="**"):
+    """Yield the given lines, or a single comment line if there are none.
+
+    This is the streaming counterpart of the ``section or "**"`` idiom used to
+    avoid empty sections in the input file.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        Lines of the section.
+    comment : str, optional
+        Line to yield if `lines` is empty, by default ``"**"``.
+
+    Yields
+    ------
+    str
+        input file data line.
+    """
+    empty = True
+    for line in lines:
+        empty = False
+        yield line
+    if empty:
+        yield comment
+
+
+def iter_lines(obj):
+    """Yield the input file lines of an object.
+
+    Objects implementing ``iter_jobdata`` are streamed, the others fall back to
+    their ``jobdata`` property.
+
+    Parameters
+    ----------
+    obj : :class:`compas_fea2.base.FEAData`
+        Object to write in the input file.
+
+    Yields
+    ------
+    str
+        input file data line.
+    """
+    iter_jobdata = getattr(obj, "iter_jobdata", None)
+    if iter_jobdata is None:
+        yield obj.jobdata
+    else:
+        yield from iter_jobdata()
+
+
+def write_lines(fileobj, lines):
+    """Write the lines to a file object, separating them by a newline.
+
+    Parameters
+    ----------
+    fileobj : file
+        Text file object opened for writing.
+    lines : Iterable[str]
+        Lines to write.
+
+    Returns
+    -------
+    None
+    """
+    write = fileobj.write
+    lines = iter(lines)
+    for line in lines:
+        write(line)
+        break
+    for line in lines:
+        write("\n")
+        write(line)
+
+
+def read_lines(path, size=BUFFER_SIZE):
+    """Yield the content of a text file as lines, a chunk at a time.
+
+    Each chunk holds the whole lines read so far, without the trailing
+    newline, so that :func:`write_lines` writes back the very same content
+    without holding the file in memory.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    size : int, optional
+        Number of characters read at once, by default ``BUFFER_SIZE``.
+
+    Yields
+    ------
+    str
+        input file data lines.
+    """
+    rest = ""
+    with open(path, "r") as f:
+        while True:
+            data = f.read(size)
+            if not data:
+                break
+            data = rest + data
+            end = data.rfind("\n")
+            if end < 0:
+                rest = data
+                continue
+            yield data[:end]
+            rest = data[end + 1 :]
+    yield rest
+
+
+def fingerprint(*items):
+    """Return a digest of the given items.
+
+    Parameters
+    ----------
+    items : str | int | float | :class:`numpy.ndarray`
+        Items to digest. Arrays are digested from their raw data.
+
+    Returns
+    -------
+    str
+        Hexadecimal digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for item in items:
+        if isinstance(item, np.ndarray):
+            digest.update("{}{}".format(item.dtype, item.shape).encode())
+            digest.update(np.ascontiguousarray(item).data)
+        else:
+            digest.update(repr(item).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def write_sections(fileobj, sections, previous=None, source=None):
+    """Write the sections to a file object, reusing the unchanged ones.
+
+    A section is copied from `source` when its fingerprint matches the one
+    recorded in `previous`, otherwise it is rendered. Sections without
+    fingerprint are always rendered and are not recorded.
+
+    Parameters
+    ----------
+    fileobj : file
+        Text file object opened for writing.
+    sections : Iterable[tuple]
+        ``(name, fingerprint, lines)`` of each section.
+    previous : dict, optional
+        {name: [fingerprint, offset, length]} of the sections of `source`.
+    source : file, optional
+        Binary file object of the previous input file.
+
+    Returns
+    -------
+    dict
+        {name: [fingerprint, offset, length]} of the written sections.
+    """
+    manifest = {}
+    previous = previous if source else {}
+    first = True
+    for name, section_fingerprint, lines in sections:
+        if not first:
+            fileobj.write("\n")
+        first = False
+        if section_fingerprint is None:
+            write_lines(fileobj, lines())
+            continue
+        digest = section_fingerprint()
+        fileobj.flush()
+        offset = fileobj.tell()
+        cached = previous.get(name)
+        if cached and cached[0] == digest:
+            source.seek(cached[1])
+            _copy(source, fileobj.buffer, cached[2])
+        else:
+            write_lines(fileobj, lines())
+        fileobj.flush()
+        manifest[name] = [digest, offset, fileobj.tell() - offset]
+    return manifest
+
+
+def _copy(source, target, length):
+    """Copy `length` bytes from the current position of `source` to `target`."""
+    while length > 0:
+        data = source.read(min(length, BUFFER_SIZE))
+        if not data:
+            raise EOFError("The previous input file is shorter than expected.")
+        target.write(data)
+        length -= len(data)
+
+
+def read_manifest(manifest_path, file_path):
+    """Read the sections manifest of an input file.
+
+    Parameters
+    ----------
+    manifest_path : str
+        Path to the manifest.
+    file_path : str
+        Path to the input file described by the manifest.
+
+    Returns
+    -------
+    dict | None
+        {name: [fingerprint, offset, length]} of the sections, or ``None`` if
+        the manifest is missing, or if the input file changed since the
+        manifest was written.
+    """
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        stat = os.stat(file_path)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    if (manifest.get("size"), manifest.get("mtime")) != (stat.st_size, stat.st_mtime_ns):
+        return None
+    return manifest["sections"]
+
+
+def write_manifest(manifest_path, file_path, sections):
+    """Write the sections manifest of an input file.
+
+    Parameters
+    ----------
+    manifest_path : str
+        Path to the manifest.
+    file_path : str
+        Path to the input file described by the manifest.
+    sections : dict
+        {name: [fingerprint, offset, length]} of the sections.
+
+    Returns
+    -------
+    None
+    """
+    stat = os.stat(file_path)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "sections": sections,
+    }
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
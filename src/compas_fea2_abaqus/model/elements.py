@@ -1,3 +1,4 @@
+import numpy as np
 from compas_fea2.model import MassElement
 from compas_fea2.model import BeamElement
 from compas_fea2.model import TrussElement
@@ -33,6 +34,64 @@ def _jobdata(element):
     return "{0}, {1}".format(element.key, ", ".join(str(node.key) for node in element.nodes))
 
 
+# Number of elements formatted at once by the bulk writer.
+CHUNK_SIZE = 100000
+
+
+def is_bulk_writable(element):
+    """Check if the elements of the class and implementation of an element
+    can be written in bulk by :func:`iter_elements_jobdata`.
+
+    The `jobdata` of the element is generated, so that the checks of its
+    implementation run (e.g. unsupported beam, shell or solid models raise
+    an error), and compared with the plain connectivity line of
+    :func:`_jobdata`. Classes writing something else, such as the mass
+    elements, must be written element by element with their own `jobdata`.
+
+    Parameters
+    ----------
+    element : :class:`compas_fea2.model._Element`
+        A representative element of its class and implementation.
+
+    Returns
+    -------
+    bool
+        ``True`` if the data line of the element is its plain connectivity.
+    """
+    return element.jobdata == _jobdata(element)
+
+
+def iter_elements_jobdata(keys, connectivity, chunk_size=CHUNK_SIZE):
+    """Generates the data lines of an `*Element` block in bulk.
+
+    The elements are formatted a chunk at a time with a single string
+    formatting operation, which avoids the per-element overhead of
+    :func:`_jobdata` while producing the same lines.
+
+    Parameters
+    ----------
+    keys : array_like
+        (N,) element keys.
+    connectivity : array_like
+        (N, M) keys of the nodes of each element.
+    chunk_size : int, optional
+        Number of elements in each yielded chunk, by default ``CHUNK_SIZE``.
+
+    Yields
+    ------
+    str
+        input file data lines of up to `chunk_size` elements.
+    """
+    keys = np.asarray(keys, dtype=np.int64).reshape(-1, 1)
+    if not len(keys):
+        return
+    connectivity = np.asarray(connectivity, dtype=np.int64).reshape(len(keys), -1)
+    line = ", ".join(["%d"] * (connectivity.shape[1] + 1))
+    for start in range(0, len(keys), chunk_size):
+        values = np.hstack((keys[start : start + chunk_size], connectivity[start : start + chunk_size]))
+        yield "\n".join([line] * len(values)) % tuple(values.ravel().tolist())
+
+
 # ==============================================================================
 # 0D elements
 # ==============================================================================
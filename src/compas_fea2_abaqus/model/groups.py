@@ -3,10 +3,17 @@ from compas_fea2.model import ElementsGroup
 from compas_fea2.model.groups import EdgesGroup
 from compas_fea2.model.groups import FacesGroup
 from compas_fea2.model.groups import MaterialsGroup
-from itertools import groupby
+from itertools import islice
+
+import numpy as np
 
 from compas_fea2.units import no_units
 
+from ..job.streaming import fingerprint
+
+# Minimum number of consecutive keys written as a `generate` range in the sets.
+GENERATE_MIN_LENGTH = 3
+
 
 @no_units
 def jobdata(self, instance, assembly=False):
@@ -23,30 +30,117 @@ def jobdata(self, instance, assembly=False):
     -------
     input file data line (str).
     """
-    data_section = []
+    return "\n".join(iter_jobdata(self, instance, assembly=assembly))
+
+
+@no_units
+def iter_jobdata(self, instance, assembly=False):
+    """Yields the common information for the input file for all the groups
+    line by line.
+
+    Parameters
+    ----------
+    instance: bool
+        if ``True`` the set is generated at the instance level, otherwise only
+        at the part level
+
+    Yields
+    ------
+    input file data line (str).
+    """
     name = self.name if not instance else f"{self.name}_i"
     line = "*{0}, {0}={1}".format(self._set_type, name)
     if instance:
-        for part, members in groupby(self._members, key=lambda x: x.part):
-            data_section.append(line + f", instance={part.name + '-1'}")
-            data = [str(member.key) for member in members]
-            chunks = [data[x : x + 15] for x in range(0, len(data), 15)]  # split data for readibility
-            for chunk in chunks:
-                data_section.append(", ".join(chunk))
+        for part, members in _partition(self).items():
+            yield from _iter_keys(line + f", instance={part.name + '-1'}", [member.key for member in members])
     elif assembly:
-        data_section.append(line)
-        data = [str(member.part.name)+str(-1.)+str(member.key) for member in self._members]
-        chunks = [data[x : x + 15] for x in range(0, len(data), 15)]  # split data for readibility
-        for chunk in chunks:
-            data_section.append(", ".join(chunk))
-
+        yield line
+        yield from _iter_chunks(str(member.part.name) + str(-1.0) + str(member.key) for member in self._members)
     else:
-        data_section.append(line)
-        data = [str(member.key) for member in self._members]
-        chunks = [data[x : x + 15] for x in range(0, len(data), 15)]  # split data for readibility
-        for chunk in chunks:
-            data_section.append(", ".join(chunk))
-    return "\n".join(data_section)
+        yield from _iter_keys(line, [member.key for member in self._members])
+
+
+def _partition(self):
+    """Bucket the members of the group by part in a single pass.
+
+    Returns
+    -------
+    dict
+        {part: [members]}, with the parts sorted by name.
+    """
+    partition = {}
+    for member in self._members:
+        partition.setdefault(member.part, []).append(member)
+    return dict(sorted(partition.items(), key=lambda item: item[0].name))
+
+
+def _fingerprint(self):
+    """Return a digest of the definition of the group.
+
+    Returns
+    -------
+    str
+        Hexadecimal digest.
+    """
+    items = [type(self).__name__, self.name, self._set_type]
+    for part, members in _partition(self).items():
+        keys = np.fromiter((member.key for member in members), dtype=np.int64, count=len(members))
+        items.extend([part.name, np.unique(keys)])
+    return fingerprint(*items)
+
+
+def _iter_chunks(data, size=15):
+    """Split the data in lines of `size` entries for readibility."""
+    data = iter(data)
+    while chunk := list(islice(data, size)):
+        yield ", ".join(chunk)
+
+
+def _split_ranges(keys, min_length=GENERATE_MIN_LENGTH):
+    """Split the keys in ranges of consecutive keys and isolated keys.
+
+    Parameters
+    ----------
+    keys : array_like
+        Keys of the members of the set.
+    min_length : int, optional
+        Minimum number of consecutive keys to form a range, by default
+        ``GENERATE_MIN_LENGTH``.
+
+    Returns
+    -------
+    ranges : :class:`numpy.ndarray`
+        (R, 2) first and last key of each range.
+    isolated : :class:`numpy.ndarray`
+        Sorted keys not belonging to any range.
+    """
+    keys = np.unique(np.asarray(keys, dtype=np.int64))
+    breaks = np.flatnonzero(np.diff(keys) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    stops = np.concatenate((breaks, [len(keys)]))
+    lengths = stops - starts
+    is_range = lengths >= min_length
+    ranges = np.column_stack((keys[starts[is_range]], keys[stops[is_range] - 1]))
+    isolated = keys[np.repeat(~is_range, lengths)]
+    return ranges, isolated
+
+
+def _iter_keys(line, keys):
+    """Yield the set definition, using `generate` for the ranges of
+    consecutive keys and listing the remaining keys explicitly.
+
+    Note
+    ----
+    Abaqus adds the members of repeated set definitions with the same name to
+    the same set.
+    """
+    ranges, isolated = _split_ranges(keys)
+    if len(isolated) or not len(ranges):
+        yield line
+        yield from _iter_chunks(str(key) for key in isolated.tolist())
+    if len(ranges):
+        yield line + ", generate"
+        yield "\n".join("{}, {}, 1".format(first, last) for first, last in ranges.tolist())
 
 
 class AbaqusNodesGroup(NodesGroup):
@@ -69,6 +163,13 @@ class AbaqusNodesGroup(NodesGroup):
     def jobdata(self, instance=None, **kwargs):
         return jobdata(self, instance, **kwargs)
 
+    @no_units
+    def iter_jobdata(self, instance=None, **kwargs):
+        return iter_jobdata(self, instance, **kwargs)
+
+    def _fingerprint(self):
+        return _fingerprint(self)
+
 
 class AbaqusElementsGroup(ElementsGroup):
     """Abaqus implementation of :class:`ElementsGroup`
@@ -90,6 +191,13 @@ class AbaqusElementsGroup(ElementsGroup):
     def jobdata(self, instance=None, **kwargs):
         return jobdata(self, instance, **kwargs)
 
+    @no_units
+    def iter_jobdata(self, instance=None, **kwargs):
+        return iter_jobdata(self, instance, **kwargs)
+
+    def _fingerprint(self):
+        return _fingerprint(self)
+
 
 class AbaqusEdgesGroup(EdgesGroup):
     """Abaqus implementation of :class:`FacesGroup`
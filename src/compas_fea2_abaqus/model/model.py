@@ -1,3 +1,7 @@
+import os
+from functools import partial
+from itertools import chain
+
 from compas_fea2.model import Model, RigidPart
 from compas_fea2.model import ElementsGroup, NodesGroup
 from compas_fea2.model import _Constraint
@@ -6,6 +10,10 @@ from compas_fea2.model.interfaces import PartPartInterface
 
 from compas_fea2.units import no_units
 
+from ..job.streaming import fingerprint
+from ..job.streaming import iter_lines
+from .nodes import coordinates_format
+
 
 class AbaqusModel(Model):
     """Abaqus implementation of :class:`Model`.
@@ -18,10 +26,34 @@ class AbaqusModel(Model):
 
     __doc__ = __doc__ or ""
     __doc__ += Model.__doc__ or ""
+    __doc__ += """
+    Additional Parameters
+    ---------------------
+    float_format : str, optional
+        Format of the node coordinates in the input file, by default ``"fixed"``.
+        See :attr:`float_format`.
+
+    """
 
-    def __init__(self, name=None, description=None, author=None, **kwargs):
+    def __init__(self, name=None, description=None, author=None, float_format="fixed", **kwargs):
         super(AbaqusModel, self).__init__(name=name, description=description, author=author, **kwargs)
         self._starting_key = 1
+        self.float_format = float_format
+
+    @property
+    def float_format(self):
+        """str : Format of the node coordinates in the input file.
+
+        Either one of the named policies ``"fixed"`` (3 decimals, the default),
+        ``"general"`` (12 significant digits) and ``"repr"`` (shortest lossless
+        representation), or a printf-style float format such as ``"%.6f"``.
+        """
+        return self._float_format
+
+    @float_format.setter
+    def float_format(self, value):
+        coordinates_format(value)
+        self._float_format = value
 
     @classmethod
     def from_cae(cls, filepath):
@@ -50,38 +82,178 @@ class AbaqusModel(Model):
     @property
     @no_units
     def jobdata(self):
+        return "\n".join(self.iter_jobdata()) + "\n"
+
+    @no_units
+    def iter_jobdata(self):
+        """Yield the model data for the input file line by line.
+
+        Parameters
+        ----------
+        None
+
+        Yields
+        ------
+        str
+            input file data line.
+        """
+        for _, _, lines in self.iter_sections():
+            yield from lines()
+
+    @no_units
+    def iter_sections(self, part_section=None, renderer=None):
+        """Yield the sections of the model data for the input file.
+
+        The parts and the corresponding instances in the assembly come with a
+        fingerprint, so that they can be reused when the input file is written
+        again (see :func:`compas_fea2_abaqus.job.streaming.write_sections`).
+
+        Parameters
+        ----------
+        part_section : callable, optional
+            Function returning the ``(fingerprint, lines)`` of the section of a
+            part, by default ``None``, which writes the part data in place.
+        renderer : :class:`compas_fea2_abaqus.model.parts.PartsRenderer`, optional
+            Open pool of processes rendering the parts in parallel, by default
+            ``None``, which renders them in the current process. The parts are
+            written in the same order in any case. Not used with
+            `part_section`, see :meth:`_write_part_includes`.
+
+        Yields
+        ------
+        tuple
+            ``(name, fingerprint, lines)`` of each section.
+        """
         self.assign_keys(restart=True)
-        return f"""**
-** PARTS
-**
-{self._generate_part_section() or "**"}
-**
-** ASSEMBLY
-**
-{self._generate_assembly_section() or "**"}
-**
-**AMPLITUDES
-**
-{self._generate_amplitude_section() or "**"}
-**
-** MATERIALS
-**
-{self.materials.jobdata or "**"}
-**
-** INTERACTIONS
-**
-{self._generate_interactions_section() or "**"}
-**
-** INTERFACES
-**
-{self._generate_interfaces_section() or "**"}
-**
-** INITIAL and BOUNDARY CONDITIONS
-**
-{self._generate_bcs_section() or "**"}
-**
-{self._generate_ics_section() or "**"}
-"""
+        yield "parts", None, lambda: ["**", "** PARTS", "**"]
+        if renderer and not part_section:
+            yield from self._iter_parallel_part_sections(renderer)
+        else:
+            for part in self.parts:
+                self._add_rigid_part_groups(part)
+                if part_section:
+                    yield (f"part:{part.name}", *part_section(part))
+                else:
+                    yield f"part:{part.name}", part._fingerprint, part.iter_jobdata
+        if not self.parts:
+            yield "no parts", None, lambda: ["**"]
+        yield "assembly", None, lambda: chain(["**", "** ASSEMBLY", "**"], self._iter_assembly_header())
+        for part in self._parts:
+            yield (
+                f"instance:{part.name}",
+                partial(self._fingerprint_instance, part),
+                partial(self._iter_instance_section, part),
+            )
+        yield "assembly end", None, self._iter_assembly_footer
+        yield "properties", None, self._iter_properties_section
+
+    @no_units
+    def _iter_parallel_part_sections(self, renderer):
+        """Yield the sections of the parts, rendered by a pool of processes.
+
+        The data of each part is collected in the current process as picklable
+        blocks (see :func:`compas_fea2_abaqus.model.parts.render_to_file`),
+        while the formatting of the nodes and of the elements, which takes most
+        of the time, is done by the workers, each one streaming a part to a
+        temporary file. The lines of a section are streamed back from its file.
+
+        Parameters
+        ----------
+        renderer : :class:`compas_fea2_abaqus.model.parts.PartsRenderer`
+            Open pool of processes.
+
+        Yields
+        ------
+        tuple
+            ``(name, fingerprint, lines)`` of each section.
+        """
+        parts = list(self.parts)
+        for part in parts:
+            self._add_rigid_part_groups(part)
+        for part in parts:
+            yield f"part:{part.name}", part._fingerprint, partial(renderer.iter_lines, renderer.schedule(part))
+
+    @no_units
+    def _write_part_includes(self, folder, renderer):
+        """Write the missing include files of the parts with a pool of
+        processes.
+
+        The include files are then reused by the `part_section` of
+        :meth:`iter_sections` (see
+        :meth:`compas_fea2_abaqus.model.AbaqusPart._write_include`).
+
+        Parameters
+        ----------
+        folder : str
+            Folder of the include files.
+        renderer : :class:`compas_fea2_abaqus.model.parts.PartsRenderer`
+            Open pool of processes.
+
+        Returns
+        -------
+        None
+        """
+        self.assign_keys(restart=True)
+        tasks = []
+        for part in self.parts:
+            self._add_rigid_part_groups(part)
+            file_path = part._include_path(folder)
+            if not os.path.exists(file_path):
+                # keyword files end with a newline
+                tasks.append(renderer.schedule(part, file_path, end="\n"))
+        for task in tasks:
+            renderer.result(task)
+
+    @no_units
+    def _iter_properties_section(self):
+        """Yield the amplitudes, materials, interactions, interfaces and initial
+        and boundary conditions sections for the input file line by line.
+
+        Parameters
+        ----------
+        None
+
+        Yields
+        ------
+        str
+            input file data line.
+        """
+        yield "**"
+        yield "**AMPLITUDES"
+        yield "**"
+        yield self._generate_amplitude_section() or "**"
+        yield "**"
+        yield "** MATERIALS"
+        yield "**"
+        yield self.materials.jobdata or "**"
+        yield "**"
+        yield "** INTERACTIONS"
+        yield "**"
+        yield self._generate_interactions_section() or "**"
+        yield "**"
+        yield "** INTERFACES"
+        yield "**"
+        yield self._generate_interfaces_section() or "**"
+        yield "**"
+        yield "** INITIAL and BOUNDARY CONDITIONS"
+        yield "**"
+        yield self._generate_bcs_section() or "**"
+        yield "**"
+        yield self._generate_ics_section() or "**"
+
+    def _add_rigid_part_groups(self, part):
+        """Add to a rigid part the groups referenced by the `*Rigid Body` definition.
+
+        The groups are added only once, so that writing the input file again
+        does not change the part (and its fingerprint).
+        """
+        if not isinstance(part, RigidPart):
+            return
+        names = set(group.name for group in part.groups)
+        if f"all_elements_{part.name}" not in names:
+            part.add_group(ElementsGroup(members=list(part.elements), name=f"all_elements_{part.name}"))
+        if f"ref_point_{part.name}" not in names:
+            part.add_group(NodesGroup(members=[part.reference_node], name=f"ref_point_{part.name}"))
 
     @no_units
     def _generate_part_section(self):
@@ -97,13 +269,25 @@ class AbaqusModel(Model):
         str
             text section for the input file.
         """
-        data_section = []
+        return "\n".join(self._iter_part_section())
+
+    @no_units
+    def _iter_part_section(self):
+        """Yield the content relatitive the each DeformablePart for the input
+        file line by line.
+
+        Parameters
+        ----------
+        None
+
+        Yields
+        ------
+        str
+            input file data line.
+        """
         for part in self.parts:
-            if isinstance(part, RigidPart):
-                part.add_group(ElementsGroup(members=list(part.elements), name=f"all_elements_{part.name}"))
-                part.add_group(NodesGroup(members=[part.reference_node], name=f"ref_point_{part.name}"))
-            data_section.append(part.jobdata)
-        return "\n".join(data_section)
+            self._add_rigid_part_groups(part)
+            yield from iter_lines(part)
 
     @no_units
     def _generate_assembly_section(self):
@@ -118,46 +302,84 @@ class AbaqusModel(Model):
         str
             text section for the input file.
         """
+        return "\n".join(self._iter_assembly_section())
+
+    @no_units
+    def _iter_assembly_section(self):
+        """Yield the content of the assembly for the input file line by line.
 
+        Parameters
+        ----------
+        None
+
+        Yields
+        ------
+        str
+            input file data line.
+        """
+        yield from self._iter_assembly_header()
+        for part in self._parts:
+            yield from self._iter_instance_section(part)
+        yield from self._iter_assembly_footer()
+
+    @no_units
+    def _iter_assembly_header(self):
         # Header
-        data_section = ["*Assembly, name={}".format(self.name)]
+        yield "*Assembly, name={}".format(self.name)
 
         # Nodes and elements
-        data_section.append(f"*NSET,NSET=Nall,GENERATE\n{self._starting_key},{len(self.nodes)}")
-        data_section.append(f"*ELSET,ELSET=Eall,GENERATE\n{self._starting_key},{len(self.elements)}")
-        "\n".join(data_section)
+        yield f"*NSET,NSET=Nall,GENERATE\n{self._starting_key},{len(self.nodes)}"
+        yield f"*ELSET,ELSET=Eall,GENERATE\n{self._starting_key},{len(self.elements)}"
 
+    @no_units
+    def _iter_instance_section(self, part):
         # Groups/sets defined at the part level
-        for part in self._parts:
-            data_section.append(part._generate_instance_jobdata)
-            # if isinstance(part, RigidPart):
-            #     data_section.append(part._generate_instance_jobdata)
-            for group in part.groups:
-                data_section.append(group.jobdata(instance=True))
+        yield part._generate_instance_jobdata
+        # if isinstance(part, RigidPart):
+        #     yield part._generate_instance_jobdata
+        for group in part.groups:
+            yield from group.iter_jobdata(instance=True)
 
+    @no_units
+    def _fingerprint_instance(self, part):
+        """Return a digest of everything the instance of a part in the assembly
+        depends on.
+
+        Parameters
+        ----------
+        part : :class:`compas_fea2_abaqus.model.AbaqusPart`
+            The part.
+
+        Returns
+        -------
+        str
+            Hexadecimal digest.
+        """
+        return fingerprint(part.name, part._generate_instance_jobdata, *[group._fingerprint() for group in part.groups])
+
+    @no_units
+    def _iter_assembly_footer(self):
         # Connectors
-        data_section.append("**\n** CONNECTORS\n**")
+        yield "**\n** CONNECTORS\n**"
         for connector in self.connectors:
-            data_section.append(connector.jobdata)
-        data_section.append("**\n** INTERFACES\n**")
+            yield connector.jobdata
+        yield "**\n** INTERFACES\n**"
         interface_groups = set()
         for interface in self.interfaces:
             interface_groups.add(interface.master)
             if isinstance(interface, PartPartInterface):
                 interface_groups.add(interface.slave)
         for interface_group in interface_groups:
-            data_section.append(interface_group.jobdata)
-        data_section.append("**\n** CONSTRAINTS\n**")
+            yield interface_group.jobdata
+        yield "**\n** CONSTRAINTS\n**"
         for interface in filter(lambda i: isinstance(i.behavior, _Constraint), self.interfaces):
-            data_section.append(interface.jobdata)
+            yield interface.jobdata
         for part in self.parts:
             if isinstance(part, RigidPart):
-                data_section.append(part._generate_rigid_body_jobdata)
+                yield part._generate_rigid_body_jobdata
         # for group in self.partgroups:
-        #     data_section.append(group.jobdata(instance=True))
-        data_section.append("*End Assembly")
-
-        return "\n".join(data_section)
+        #     yield from group.iter_jobdata(instance=True)
+        yield "*End Assembly"
 
     @no_units
     def _generate_amplitude_section(self):
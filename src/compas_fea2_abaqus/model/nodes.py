@@ -1,7 +1,54 @@
+import re
+
+import numpy as np
 from compas_fea2.model import Node
 
 from compas_fea2.units import no_units
 
+# Number of nodes formatted at once by the bulk writer.
+CHUNK_SIZE = 100000
+
+# Named policies for the format of the node coordinates.
+# - fixed: fixed point with 3 decimals, padded to 10 characters (legacy format).
+# - general: 12 significant digits, no padding.
+# - repr: shortest representation that round-trips to the same float (lossless).
+FLOAT_FORMATS = {
+    "fixed": "%10.3f",
+    "general": "%.12g",
+    "repr": "%r",
+}
+
+# printf-style conversion of a single float: flags, width, precision and one
+# of the float conversion types (or `r` for the lossless repr).
+FLOAT_FORMAT_PATTERN = re.compile(r"%[-+ #0]*\d*(\.\d+)?[eEfFgGr]")
+
+
+def coordinates_format(policy):
+    """Return the printf-style format of the node coordinates for a policy.
+
+    Parameters
+    ----------
+    policy : str
+        One of the names in ``FLOAT_FORMATS`` or a printf-style float format
+        such as ``"%.6f"`` or ``"%.8g"``.
+
+    Returns
+    -------
+    str
+        printf-style format string.
+
+    Raises
+    ------
+    ValueError
+        If the policy is not a valid float format, e.g. an integer (``"%d"``)
+        or string (``"%s"``) conversion.
+    """
+    fmt = FLOAT_FORMATS.get(policy, policy)
+    if not isinstance(fmt, str) or not FLOAT_FORMAT_PATTERN.fullmatch(fmt):
+        raise ValueError("{!r} is not a valid float format.".format(policy))
+    return fmt
+
+
 # =============================================================================
 # General
 # =============================================================================
@@ -29,5 +76,37 @@ class AbaqusNode(Node):
         -------
         input file data line (str).
         """
-        x, y, z = self.xyz
-        return "{:>10}, {:>10.3f}, {:>10.3f}, {:>10.3f}".format(self.key, x, y, z)
+        policy = self.model.float_format if self.model else "fixed"
+        return next(iter_nodes_jobdata([self.key], [self.xyz], policy=policy))
+
+
+def iter_nodes_jobdata(keys, xyz, policy="fixed", chunk_size=CHUNK_SIZE):
+    """Generates the data lines of a `*Node` block in bulk.
+
+    The nodes are formatted a chunk at a time with a single string formatting
+    operation, which avoids the per-node overhead of :attr:`AbaqusNode.jobdata`
+    while producing the same column format.
+
+    Parameters
+    ----------
+    keys : array_like
+        (N,) node keys.
+    xyz : array_like
+        (N, 3) node coordinates.
+    policy : str, optional
+        Format of the coordinates, see :func:`coordinates_format`, by default
+        ``"fixed"``.
+    chunk_size : int, optional
+        Number of nodes in each yielded chunk, by default ``CHUNK_SIZE``.
+
+    Yields
+    ------
+    str
+        input file data lines of up to `chunk_size` nodes.
+    """
+    keys = np.asarray(keys, dtype=float).reshape(-1, 1)
+    xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+    line = "%10d, " + ", ".join([coordinates_format(policy)] * 3)
+    for start in range(0, len(keys), chunk_size):
+        values = np.hstack((keys[start : start + chunk_size], xyz[start : start + chunk_size]))
+        yield "\n".join([line] * len(values)) % tuple(values.ravel().tolist())
@@ -1,8 +1,23 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
 from compas_fea2.model import Part, RigidPart
-from collections import defaultdict
 
 from compas_fea2.units import no_units
 
+from ..job.streaming import BUFFER_SIZE
+from ..job.streaming import fingerprint
+from ..job.streaming import or_comment
+from ..job.streaming import read_lines
+from ..job.streaming import write_lines
+from .elements import is_bulk_writable
+from .elements import iter_elements_jobdata
+from .nodes import iter_nodes_jobdata
+
 
 @no_units
 def jobdata(obj):
@@ -17,63 +32,318 @@ def jobdata(obj):
     str
         input file data lines.
     """
-    return f"""**
-*Part, name={obj.name}
-**
-** - Nodes
-**   -----
-{_generate_nodes_section(obj) or "**"}
-**
-** - Elements
-**   --------
-{_generate_elements_section(obj) or "**"}
-**
-** - Sets
-**   ----
-{_generate_sets_section(obj) or "**"}
-**
-** - Releases
-**   --------
-{_generate_releases_section(obj) or "**"}
-**
-*End Part"""
+    return "\n".join(iter_jobdata(obj))
+
+
+@no_units
+def iter_jobdata(obj):
+    """Yield the information for the input file line by line.
+
+    Parameters
+    ----------
+    None
+
+    Yields
+    ------
+    str
+        input file data line.
+    """
+    yield from iter_render(_iter_blocks(obj))
+
+
+@no_units
+def _iter_blocks(obj):
+    """Yield the information for the input file as lines, or as
+    ``(function, args)`` blocks deferring the formatting of the arrays of the
+    nodes and of the elements.
+
+    The blocks can be pickled, so that they can be rendered by another process
+    (see :func:`render_to_file`).
+
+    Parameters
+    ----------
+    None
+
+    Yields
+    ------
+    str | tuple
+        input file data line, or block.
+    """
+    yield "**"
+    yield f"*Part, name={obj.name}"
+    yield "**"
+    yield "** - Nodes"
+    yield "**   -----"
+    yield from or_comment(_iter_nodes_blocks(obj))
+    yield "**"
+    yield "** - Elements"
+    yield "**   --------"
+    yield from or_comment(_iter_elements_blocks(obj))
+    yield "**"
+    yield "** - Sets"
+    yield "**   ----"
+    yield from or_comment(_iter_sets_section(obj))
+    yield "**"
+    yield "** - Releases"
+    yield "**   --------"
+    yield _generate_releases_section(obj) or "**"
+    yield "**"
+    yield "*End Part"
+
+
+def iter_render(blocks):
+    """Render the blocks yielded by ``_iter_blocks``.
+
+    Parameters
+    ----------
+    blocks : Iterable[str | tuple]
+        input file data lines, or ``(function, args)`` blocks.
+
+    Yields
+    ------
+    str
+        input file data line.
+    """
+    for block in blocks:
+        if isinstance(block, str):
+            yield block
+        else:
+            function, args = block
+            yield from function(*args)
+
+
+def render_to_file(blocks, path, end=""):
+    """Render the blocks yielded by ``_iter_blocks`` to a file.
+
+    This is the function executed by the worker processes when the parts are
+    rendered in parallel. The lines are streamed to the file, which is
+    written under a temporary name, so that a partial file is never read.
+
+    Parameters
+    ----------
+    blocks : Iterable[str | tuple]
+        input file data lines, or ``(function, args)`` blocks.
+    path : str
+        Path to the file.
+    end : str, optional
+        Text written after the last line, by default ``""``.
+
+    Returns
+    -------
+    str
+        Path to the file.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", buffering=BUFFER_SIZE) as f:
+        write_lines(f, iter_render(blocks))
+        f.write(end)
+    os.replace(temp_path, path)
+    return path
+
+
+class PartsRenderer:
+    """Pool of processes rendering the parts to files.
+
+    Each worker streams a part to its own file (see :func:`render_to_file`),
+    which is then streamed back by the current process, so that neither of
+    them holds a whole rendered part in memory. The parts are submitted in
+    the order in which they are written, at most `workers` ahead of the one
+    being written.
+
+    The pool and the folder of the temporary files live as long as the
+    renderer is open, i.e. within its ``with`` block.
+
+    Parameters
+    ----------
+    workers : int
+        Number of processes.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = None
+        self.folder = None
+        self._tasks = []
+        self._futures = {}
+
+    def __enter__(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.folder = tempfile.mkdtemp(prefix="compas_fea2_abaqus-")
+        return self
+
+    def __exit__(self, *args):
+        for future in self._futures.values():
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        shutil.rmtree(self.folder, ignore_errors=True)
+        self._tasks = []
+        self._futures = {}
+
+    def schedule(self, part, path=None, end=""):
+        """Schedule the rendering of a part.
+
+        Parameters
+        ----------
+        part : :class:`compas_fea2_abaqus.model.AbaqusPart`
+            The part.
+        path : str, optional
+            Path to the rendered file, by default a temporary file.
+        end : str, optional
+            Text written after the last line, see :func:`render_to_file`.
+
+        Returns
+        -------
+        int
+            Index of the task, see :meth:`result`.
+        """
+        task = len(self._tasks)
+        self._tasks.append((part, path or os.path.join(self.folder, f"{task}.inp"), end))
+        return task
+
+    def result(self, task):
+        """Wait for the file of a task, submitting the next ones.
+
+        Parameters
+        ----------
+        task : int
+            Index of the task.
+
+        Returns
+        -------
+        str
+            Path to the rendered file.
+        """
+        for index in [index for index in self._futures if index < task]:
+            # the previous tasks were skipped, e.g. copied from the previous input
+            # file; their files, if any, are removed with the folder
+            self._futures.pop(index).cancel()
+        for index in range(task, min(task + self.workers, len(self._tasks))):
+            if index not in self._futures:
+                part, path, end = self._tasks[index]
+                self._futures[index] = self.executor.submit(render_to_file, list(part._iter_blocks()), path, end)
+        return self._futures.pop(task).result()
+
+    def iter_lines(self, task):
+        """Yield the lines of the file of a task, then delete it.
+
+        Parameters
+        ----------
+        task : int
+            Index of the task.
+
+        Yields
+        ------
+        str
+            input file data lines.
+        """
+        path = self.result(task)
+        try:
+            yield from read_lines(path)
+        finally:
+            os.remove(path)
+
+
+def parts_renderer(workers=None):
+    """Return a :class:`PartsRenderer` with the given number of workers, or
+    an empty context if the parts are rendered in the current process
+    (`workers` is ``None`` or smaller than 2)."""
+    return PartsRenderer(workers) if workers and workers > 1 else nullcontext()
 
 
 @no_units
 def _generate_nodes_section(obj):
-    return "\n".join(["*Node"] + [node.jobdata for node in obj.nodes.sorted])
+    return "\n".join(_iter_nodes_section(obj))
+
+
+@no_units
+def _iter_nodes_section(obj):
+    yield from iter_render(_iter_nodes_blocks(obj))
+
+
+@no_units
+def _iter_nodes_blocks(obj):
+    yield "*Node"
+    keys, xyz = _node_arrays(obj)
+    yield iter_nodes_jobdata, (keys, xyz, _float_format(obj))
+
+
+def _float_format(obj):
+    """Return the format of the node coordinates of the model of the part,
+    or the default one if the part is not in a model."""
+    model = getattr(obj, "model", None)
+    return getattr(model, "float_format", None) or "fixed"
+
+
+@no_units
+def _node_arrays(obj):
+    """Return the keys and the coordinates of the nodes, sorted by key."""
+    nodes = list(obj.nodes)
+    keys = np.fromiter((node.key for node in nodes), dtype=np.int64, count=len(nodes))
+    xyz = np.array([node.xyz for node in nodes], dtype=float).reshape(-1, 3)
+    order = np.argsort(keys, kind="stable")
+    return keys[order], xyz[order]
 
 
 @no_units
 def _generate_elements_section(obj):
-    part_data = []
+    return "\n".join(_iter_elements_section(obj))
+
+
+@no_units
+def _iter_elements_section(obj):
+    yield from iter_render(_iter_elements_blocks(obj))
+
+
+@no_units
+def _iter_elements_blocks(obj):
     # Write elements, elsets and sections
+    for implementation, elset_name, section_data, keys, connectivity, lines in _iter_element_blocks(obj):
+        yield "*Element, type={}, elset={}".format(implementation, elset_name)
+        if lines is None:
+            yield iter_elements_jobdata, (keys, connectivity)
+        else:
+            yield from lines
+        # if not isinstance(obj, RigidPart):
+        yield section_data
+
+
+@no_units
+def _iter_element_blocks(obj):
+    """Yield the `*Element` blocks of the part as
+    ``(implementation, elset_name, section_data, keys, connectivity, lines)``,
+    see :func:`_group_elements`."""
     # this check is needed for rigid parts ->ugly, change!
     grouped_elements = obj._group_elements()
     for implementation, sections in grouped_elements.items():
         for section, orientations in sections.items():
-            for orientation, elements in orientations.items():
-                # Write elements
+            for orientation, (keys, connectivity, lines) in orientations.items():
                 elset_name = (
                     "aux_{}_{}".format(implementation, section.name)
                     if not isinstance(obj, RigidPart)
                     else "all_elements"
                 )
                 if orientation:
-                    elset_name += "_{}".format(orientation.replace(".", "").replace("-", ""))
+                    # the signs and the decimal points are kept, so that each
+                    # orientation has its own set
+                    elset_name += "_{}".format(orientation.replace("-", "m").replace(".", "p"))
                     orientation = orientation.split("_")
-                part_data.append("*Element, type={}, elset={}".format(implementation, elset_name))
-                for element in sorted(elements, key=lambda x: x.key):
-                    part_data.append(element.jobdata)
-                # if not isinstance(obj, RigidPart):
-                part_data.append(section.jobdata(elset_name, orientation=orientation))
-    return "\n".join(part_data)
+                section_data = section.jobdata(elset_name, orientation=orientation)
+                yield implementation, elset_name, section_data, keys, connectivity, lines
 
 
 @no_units
 def _generate_sets_section(obj):
     # return "**"
-    return "\n".join([group.jobdata() for group in obj.groups])
+    return "\n".join(_iter_sets_section(obj))
+
+
+@no_units
+def _iter_sets_section(obj):
+    for group in obj.groups:
+        if hasattr(group, "iter_jobdata"):
+            yield from group.iter_jobdata()
+        else:
+            yield group.jobdata()
 
 
 @no_units
@@ -81,6 +351,72 @@ def _generate_releases_section(obj):
     return "\n".join(release_field.jobdata for release_field in obj.releases_fields) if obj.releases_fields else "**"
 
 
+@no_units
+def _fingerprint(obj):
+    """Return a digest of everything the part data in the input file depends on.
+
+    The digest is computed from the arrays of the nodes and of the elements,
+    which is much cheaper than formatting them.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    str
+        Hexadecimal digest.
+    """
+    items = [type(obj).__name__, obj.name, _float_format(obj), *_node_arrays(obj)]
+    for block in _iter_element_blocks(obj):
+        items.extend(block)
+    for group in obj.groups:
+        items.append(group._fingerprint() if hasattr(group, "_fingerprint") else group.jobdata())
+    items.append(_generate_releases_section(obj))
+    return fingerprint(*items)
+
+
+@no_units
+def _include_path(obj, folder):
+    """Return the path to the content-addressed include file of the part.
+
+    Parameters
+    ----------
+    folder : str
+        Folder of the include file.
+
+    Returns
+    -------
+    str
+        Path to the include file, named after the part and its fingerprint.
+    """
+    return os.path.join(folder, f"{obj.name}-{_fingerprint(obj)}.inp")
+
+
+@no_units
+def _write_include(obj, folder):
+    """Write the part to a content-addressed include file.
+
+    The name of the file contains the fingerprint of the part, so an existing
+    file is reused as it is, e.g. by other problems sharing the same part.
+
+    Parameters
+    ----------
+    folder : str
+        Folder where the include file is saved.
+
+    Returns
+    -------
+    str
+        Path to the include file.
+    """
+    file_path = _include_path(obj, folder)
+    if not os.path.exists(file_path):
+        # keyword files end with a newline
+        render_to_file(_iter_blocks(obj), file_path, end="\n")
+    return file_path
+
+
 @no_units
 def _generate_instance_jobdata(obj):
     """Generates the string information for the input file.
@@ -112,6 +448,51 @@ def _generate_instance_jobdata(obj):
     )
 
 
+def _orientation_components(element):
+    """Return the orientation of an element as 6 components.
+
+    Beam elements store their orientation as the 3 components of a vector, 2D
+    and 3D elements as a frame, whose x and y axes give the 6 components.
+    Undefined components are set to NaN.
+    """
+    orientation = getattr(element, "_orientation", None)
+    if orientation is None:
+        return [np.nan] * 6
+    if element.ndim == 1:
+        return [orientation[0], orientation[1], orientation[2]] + [np.nan] * 3
+    if element.ndim in (2, 3):
+        xaxis, yaxis = orientation.xaxis, orientation.yaxis
+        return [xaxis.x, xaxis.y, xaxis.z, yaxis.x, yaxis.y, yaxis.z]
+    return [np.nan] * 6
+
+
+def _orientation_buckets(components, decimals=2):
+    """Bucket the elements with the same orientation.
+
+    Parameters
+    ----------
+    components : array_like
+        (N, 6) orientation components of the elements, NaN where undefined.
+    decimals : int, optional
+        Number of decimals used to compare the orientations, by default 2.
+
+    Returns
+    -------
+    labels : list
+        Label of each bucket (the rounded components joined by ``"_"``), or
+        ``None`` for the elements without orientation.
+    inverse : :class:`numpy.ndarray`
+        (N,) index of the bucket of each element.
+    """
+    components = np.asarray(components, dtype=float).reshape(-1, 6)
+    defined = ~np.isnan(components)
+    # adding 0.0 turns -0.0 into 0.0, so that they fall in the same bucket
+    rounded = np.round(np.where(defined, components, 0.0), decimals) + 0.0
+    unique, inverse = np.unique(np.column_stack((defined.sum(axis=1), rounded)), axis=0, return_inverse=True)
+    labels = ["_".join(str(c) for c in row[1 : 1 + int(row[0])]) or None for row in unique.tolist()]
+    return labels, inverse.reshape(-1)
+
+
 def _group_elements(obj):
     """Group the elements. This is used internally to generate the input
     file.
@@ -123,43 +504,62 @@ def _group_elements(obj):
     Returns
     -------
     dict
-        {implementation:{section:{orientation: [elements]},},}
+        {implementation:{section:{orientation: (keys, connectivity, lines)},},}
+        where `keys` is the (N,) array of the element keys and `connectivity`
+        the (N, M) array of the keys of their nodes, both sorted by element key.
+        `lines` is ``None`` if the elements are written in bulk from the
+        arrays, otherwise the data lines generated by the `jobdata` of each
+        element, for the classes writing more than their connectivity (see
+        :func:`is_bulk_writable`).
     """
+    grouped_elements = {}
+    elements = list(obj.elements)
+    if not elements:
+        return grouped_elements
+
+    # Encode implementation and section of each element as an integer
+    types = {}
+    type_ids = np.fromiter(
+        (types.setdefault((el._implementation, el.section), len(types)) for el in elements),
+        dtype=np.int64,
+        count=len(elements),
+    )
+    types = list(types)
+    # the implementation of each class is checked once, on its first element
+    classes = {}
+    class_ids = np.fromiter(
+        (classes.setdefault((type(el), el._implementation), (len(classes), el))[0] for el in elements),
+        dtype=np.int64,
+        count=len(elements),
+    )
+    bulk = np.array([is_bulk_writable(el) for _, el in classes.values()], dtype=bool)
+    orientations, orientation_ids = _orientation_buckets([_orientation_components(el) for el in elements])
 
-    # Group elements by implementation
-    grouped_elements = defaultdict(lambda: defaultdict(lambda: defaultdict(set)))
-
-    for el in obj.elements:
-        implementation = el._implementation
-        section = el.section
+    # Group elements by implementation, section and orientation
+    buckets, first, bucket_ids = np.unique(
+        np.column_stack((type_ids, orientation_ids)), axis=0, return_index=True, return_inverse=True
+    )
+    bucket_ids = bucket_ids.reshape(-1)
+    keys = np.fromiter((el.key for el in elements), dtype=np.int64, count=len(elements))
+    order = np.argsort(keys, kind="stable")
+    order = order[np.argsort(bucket_ids[order], kind="stable")]
+    members = np.split(order, np.cumsum(np.bincount(bucket_ids))[:-1])
+
+    # The buckets are written in the order in which they first appear
+    for bucket in np.argsort(first):
+        type_id, orientation_id = buckets[bucket]
+        implementation, section = types[type_id]
+        indices = members[bucket]
         try:
-            if el.ndim == 1:
-                orientation = "_".join(
-                    [
-                        str(round(el._orientation[0], 2)),
-                        str(round(el._orientation[1], 2)),
-                        str(round(el._orientation[2], 2)),
-                    ]
-                )
-            if el.ndim == 2 or el.ndim == 3:
-                orientation = "_".join(
-                    [
-                        str(round(el._orientation.xaxis.x, 2)),
-                        str(round(el._orientation.xaxis.y, 2)),
-                        str(round(el._orientation.xaxis.z, 2)),
-                    ]
-                )
-                +"_"
-                +"_".join(
-                    str(round(el._orientation.yaxis.x, 2)),
-                    str(round(el._orientation.yaxis.y, 2)),
-                    str(round(el._orientation.yaxis.z, 2)),
-                )
-
-        except:  # noqa: E722
-            orientation = None
-
-        grouped_elements[implementation][section][orientation].add(el)
+            connectivity = np.array([[node.key for node in elements[i].nodes] for i in indices], dtype=np.int64)
+        except ValueError:
+            raise ValueError("Elements of type {} have a different number of nodes.".format(implementation))
+        lines = None if bulk[class_ids[indices]].all() else [elements[i].jobdata for i in indices]
+        grouped_elements.setdefault(implementation, {}).setdefault(section, {})[orientations[orientation_id]] = (
+            keys[indices],
+            connectivity.reshape(len(indices), -1),
+            lines,
+        )
 
     return grouped_elements
 
@@ -184,6 +584,22 @@ class AbaqusPart(Part):
     def jobdata(self):
         return jobdata(self)
 
+    @no_units
+    def iter_jobdata(self):
+        return iter_jobdata(self)
+
+    def _iter_blocks(self):
+        return _iter_blocks(self)
+
+    def _fingerprint(self):
+        return _fingerprint(self)
+
+    def _include_path(self, folder):
+        return _include_path(self, folder)
+
+    def _write_include(self, folder):
+        return _write_include(self, folder)
+
     @property
     @no_units
     def _generate_instance_jobdata(self):
@@ -203,7 +619,12 @@ class AbaqusRigidPart(RigidPart):
     #     from compas_fea2.model import ShellElement
 
     #     mesh = self.discretized_boundary_mesh
-    #     vertex_node = {vertex: self.find_closest_nodes_to_point(point=mesh.vertex_coordinates(vertex), distance=0.1, number_of_nodes=1)[0] for vertex in mesh.vertices()}
+    #     vertex_node = {
+    #         vertex: self.find_closest_nodes_to_point(
+    #             point=mesh.vertex_coordinates(vertex), distance=0.1, number_of_nodes=1
+    #         )[0]
+    #         for vertex in mesh.vertices()
+    #     }
     #     rigid_faces = []
     #     for k, face in enumerate(mesh.faces()):
     #         nodes = [vertex_node[vertex] for vertex in mesh.face_vertices(face)]
@@ -225,6 +646,22 @@ class AbaqusRigidPart(RigidPart):
     def jobdata(self):
         return jobdata(self)
 
+    @no_units
+    def iter_jobdata(self):
+        return iter_jobdata(self)
+
+    def _iter_blocks(self):
+        return _iter_blocks(self)
+
+    def _fingerprint(self):
+        return _fingerprint(self)
+
+    def _include_path(self, folder):
+        return _include_path(self, folder)
+
+    def _write_include(self, folder):
+        return _write_include(self, folder)
+
     @property
     @no_units
     def _generate_rigid_body_jobdata(self):
@@ -454,7 +454,8 @@ class AbaqusShellSection(ShellSection):
         """
         jobdata = []
         if orientation:
-            jobdata.append(f"*Orientation, name=Ori_{self.material.name}")
+            # the orientation is named after the set, as each set has its own
+            jobdata.append(f"*Orientation, name=Ori_{set_name}")
             # In Abaqus, the *Orientation option define a local (x, y, z) frame of the section
             # Then, the orthonormal local frame (1,2,3) of the element is defined such as :
             # the normal is parallel to z-axis and has the same direction
@@ -481,7 +482,7 @@ class AbaqusShellSection(ShellSection):
         else:
             jobdata.append(f"*Shell Section, elset={set_name}, material={self.material.name}")
         if orientation:
-            jobdata[-1] += f", orientation=Ori_{self.material.name}"
+            jobdata[-1] += f", orientation=Ori_{set_name}"
         jobdata.append(f"{self.t}, {self.int_points}")
         return "\n".join(jobdata)
 
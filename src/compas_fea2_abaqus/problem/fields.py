@@ -77,30 +77,26 @@ class AbaqusForceField(ForceField):
         -------
         input file data line (str).
         """
-        data_section = [
-            "** Name: {} Type: Concentrated Force".format(self.name),
-            "*Cload{}{}".format(self._modify, self._follow),
-        ]
+        return "\n".join(self.iter_jobdata())
 
-        for node, load in self.node_load:
-            for comp, dof in enumerate(dofs, 1):
-                if getattr(load, dof):
-                    data_section.append(f"{node.part.name}-1.{node.key}, {comp}, {getattr(load, dof)}")
-        return "\n".join(data_section) or "**"
-
-        # class AbaqusPrescribedTemperatureField(PrescribedTemperatureField):
-        #     """Abaqus implementation of :class:`PrescribedTemperatureField`.\n"""
+    @no_units
+    def iter_jobdata(self):
+        """Yields the information for the input file line by line.
 
-        data_section = [
-            "** Name: {} Type: Concentrated Force".format(self.name),
-            "*Cload{}{}".format(self._modify, self._follow),
-        ]
+        Parameters
+        ----------
+        None
 
+        Yields
+        ------
+        input file data line (str).
+        """
+        yield "** Name: {} Type: Concentrated Force".format(self.name)
+        yield "*Cload{}{}".format(self._modify, self._follow)
         for node, load in self.node_load:
             for comp, dof in enumerate(dofs, 1):
                 if getattr(load, dof):
-                    data_section.append(f"{node.part.name}-1.{node.key}, {comp}, {getattr(load, dof)}")
-        return "\n".join(data_section) or "**"
+                    yield f"{node.part.name}-1.{node.key}, {comp}, {getattr(load, dof)}"
 
 
 class AbaqusGravityLoadField(GravityLoadField):
@@ -1,4 +1,6 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from compas_fea2.problem import Problem
 
@@ -7,10 +9,88 @@ from compas_fea2.utilities._devtools import launch_process
 
 from ..results import results_to_sql
 from ..job.input_file import _AbaqusRestartInputFile
+from ..job.streaming import iter_lines
 
 from compas_fea2.units import no_units
 
 
+def _field_request(
+    field, invariants=None, frames=None, regions=None, reduction=None, dtype="float64", compression=None
+):
+    """Return the request of a field in the extraction manifest.
+
+    Parameters
+    ----------
+    field : :class:`compas_fea2.results.FieldResults`
+        Output field to extract.
+    invariants : bool | list, optional
+        Invariants to compute, see :meth:`AbaqusProblem.extract_results`.
+    frames : str | list, optional
+        Frames to extract, see :meth:`AbaqusProblem.extract_results`.
+    regions : list, optional
+        Groups the results are restricted to.
+    reduction : str, optional
+        Reduction of the values at the integration points.
+    dtype : str, optional
+        Precision of the stored values.
+    compression : str, optional
+        Compression of the stored values.
+
+    Returns
+    -------
+    dict
+        The request, see :func:`results_to_sql.field_request`.
+    """
+    if reduction and reduction not in results_to_sql.REDUCTIONS:
+        raise ValueError(f"Unknown reduction: {reduction}. Use one of {list(results_to_sql.REDUCTIONS)}.")
+    if dtype not in results_to_sql.DTYPES:
+        raise ValueError(f"Unknown dtype: {dtype}. Use one of {list(results_to_sql.DTYPES)}.")
+    if compression and compression not in results_to_sql.COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}. Use one of {list(results_to_sql.COMPRESSIONS)}.")
+    if frames is not None and not isinstance(frames, str):
+        frames = [int(index) for index in frames]
+    return results_to_sql.field_request(
+        field.field_name,
+        field.abaqus_field_names,
+        [(abaq_comp, compas_comp) for compas_comp, abaq_comp in field.compas_to_abaqus_component_names.items()],
+        invariants=[
+            (abaq_inv, compas_inv)
+            for compas_inv, abaq_inv in getattr(field, "compas_to_abaqus_invariant_names", {}).items()
+            if invariants is True or (invariants and compas_inv in invariants)
+        ],
+        frames=frames,
+        regions=_region_names(regions or []),
+        reduction=reduction,
+        dtype=dtype,
+        compression=compression,
+    )
+
+
+def _region_names(regions):
+    """Return the names of the sets of the groups the results are restricted
+    to.
+
+    Parameters
+    ----------
+    regions : list
+        Nodes and elements groups of the parts.
+
+    Returns
+    -------
+    list[str]
+        ``nset:<name>`` or ``elset:<name>`` of the set of each group at the
+        assembly level.
+    """
+    names = []
+    for group in regions:
+        set_type = getattr(group, "_set_type", None)
+        if set_type not in ("nset", "elset"):
+            raise TypeError(f"{group!r} is not a nodes or elements group.")
+        # the groups of the parts are defined in the assembly as `<name>_i`
+        names.append(f"{set_type}:{group.name}_i")
+    return names
+
+
 class AbaqusProblem(Problem):
     """Abaqus implementation of :class:`Problem`.\n"""
 
@@ -209,7 +289,24 @@ class AbaqusProblem(Problem):
     # Extract results
     # ==========================================================================
     @timer(message="Data extracted from Abaqus .odb file in")
-    def extract_results(self, database_path=None, database_name=None, fields=None, **kwargs):
+    def extract_results(
+        self,
+        database_path=None,
+        database_name=None,
+        fields=None,
+        pragmas=None,
+        frames=None,
+        workers=None,
+        format="db",
+        reduction=None,
+        invariants=None,
+        append=False,
+        regions=None,
+        field_options=None,
+        dtype="float64",
+        compression=None,
+        **kwargs,
+    ):
         """Extract data from the Abaqus .odb file and store into a SQLite database.
 
         Parameters
@@ -217,44 +314,154 @@ class AbaqusProblem(Problem):
         fields : list
             Output fields to extract, by default 'None'. If `None` all available
             fields will be extracted, which might require considerable time.
+        pragmas : dict, optional
+            SQLite pragmas used while loading the results, by default ``None``.
+            They override the defaults of the extraction script
+            (``journal_mode=OFF`` and ``synchronous=OFF``), e.g.
+            ``{"journal_mode": "WAL", "synchronous": "NORMAL"}``.
+        frames : str | list[int], optional
+            Frames to extract from each step, by default ``None``, which
+            extracts only the last frame. Either ``"last"``, ``"all"``,
+            ``"every:N"`` (every N-th frame), ``"time:start:end"`` (the frames
+            within a time window, either bound can be omitted) or a list of
+            frame indices (negative indices count from the last frame). The
+            results tables store the index and the time of each frame in the
+            `frame` and `time` columns.
+        workers : int, optional
+            Number of extraction processes running at the same time, by
+            default ``None``, which extracts everything in a single process.
+            Each (step, field) pair is then extracted by its own process into a
+            shard database, and the shards are merged at the end.
+        format : str, optional
+            Format of the results, either ``"db"`` (default) for the SQLite
+            database `<database_name>-results.db`, or ``"npy"`` for the
+            columnar store `<database_name>-results`, a folder with one `.npy`
+            array per component and per block of results (field, step, frame,
+            part) described by a `manifest.json`, which can be memory-mapped
+            with ``numpy.load(path, mmap_mode="r")``.
+        reduction : str, optional
+            Reduction of the element results at the integration points and
+            section points, by default ``None``, which stores every value with
+            its integration point and section point in the `ip` and `sp`
+            columns. Either ``"mean"`` or ``"max"`` of each component over the
+            points of each element, whose invariants are computed from the
+            reduced components, or ``"centroid"`` for the values interpolated
+            at the centroid of the elements by Abaqus.
+        invariants : bool | list[str], optional
+            Invariants stored as additional columns of the results, by default
+            ``None``. If ``True``, all the invariants of each field (see
+            `compas_to_abaqus_invariant_names`, e.g. ``"magnitude"`` or
+            ``"von_mises"``), otherwise the names of the invariants to store.
+            They are read from the odb when available, or computed from the
+            components, and are declared in the `fields` table.
+        append : bool, optional
+            If ``True``, the existing results are kept and only the fields and
+            frames missing from them are extracted, by default ``False``,
+            which extracts everything again. Nothing is extracted if the odb
+            (size and modification time) and the request did not change since
+            the previous extraction. Not supported with `workers`.
+        regions : list, optional
+            Groups of the parts the results are restricted to, i.e.
+            :class:`compas_fea2_abaqus.model.AbaqusNodesGroup` and
+            :class:`compas_fea2_abaqus.model.AbaqusElementsGroup`, by default
+            ``None``, which extracts the results of the whole model. The
+            nodal results are restricted to the nodes groups and the element
+            results to the elements groups, the results without a group of
+            their kind are not restricted.
+        field_options : dict, optional
+            Options of single fields, overriding `frames`, `reduction`,
+            `invariants`, `regions`, `dtype` and `compression`, by default
+            ``None``, e.g.
+            ``{"s": {"frames": "all", "reduction": "mean"}}``, where the keys
+            are the names of the fields (`field_name`).
+        dtype : str, optional
+            Precision of the stored results, by default ``"float64"``. Either
+            ``"float32"`` or ``"float16"`` to reduce the size of the results,
+            Abaqus writing most of the outputs in single precision.
+        compression : str, optional
+            Compression of the stored results, by default ``None``. Either
+            ``"zlib"``, or ``"zstd"`` and ``"lz4"`` if the `zstandard` and
+            `lz4` packages are available to the Python of Abaqus. In the
+            SQLite database, the results of the fields with a lower precision
+            or compressed are stored in `<field>_blocks` tables, with the keys,
+            the points and the values of each (step, frame, part, position)
+            block packed in blobs, see `results_to_sql.unpack_array`.
 
         Returns
         -------
-        None
+        list[:class:`pathlib.Path`]
+            Path to the results, which can be read as NumPy arrays with
+            :class:`compas_fea2_abaqus.results.AbaqusResultsReader`.
+
+        Notes
+        -----
+        The request is written to `<database_name>-extraction.json` in
+        `database_path`, a versioned manifest with the options of each field,
+        which is passed to the extraction script.
 
         """
         print("\nExtracting data from Abaqus .odb file...")
+        if format not in results_to_sql.WRITERS:
+            raise ValueError(f"Unknown results format: {format}. Use one of {list(results_to_sql.WRITERS)}.")
+        extension = results_to_sql.WRITERS[format].extension
         database_path = database_path or self.path
         database_name = database_name or self.name
+        database = Path(database_path).joinpath(f"{database_name}-results{extension}")
         if not fields:
             fields = self.steps[-1].field_outputs
-        field_input = ".".join(
-            [
-                field.field_name
-                + "/"
-                + ",".join(field.abaqus_field_names)  # compas_field_name/abaqus_fields_names
-                + "-"
-                + ",".join(
-                    [
-                        abaq_comp + "/" + compas_comp
-                        for compas_comp, abaq_comp in field.compas_to_abaqus_component_names.items()  # abaqus_component/compas_component
-                    ]
-                )
-                for field in fields
-            ]
+        if append and workers and workers > 1:
+            raise ValueError("The append mode is not supported with parallel extraction.")
+        options = dict(
+            frames=frames,
+            reduction=reduction,
+            invariants=invariants,
+            regions=regions,
+            dtype=dtype,
+            compression=compression,
         )
-        args = [
+        field_options = field_options or {}
+        requests = [
+            _field_request(field, **dict(options, **field_options.get(field.field_name, {}))) for field in fields
+        ]
+        script = [
             os.path.join(kwargs.get("exe", None) or "C:/SIMULIA/Commands", "abaqus"),
             "python",
             Path(results_to_sql.__file__),
-            field_input,
-            database_path,
-            database_name,
         ]
-        for line in launch_process(cmd_args=args, cwd=database_path, verbose=True):
-            print(line)
-
-        return [Path(database_path).joinpath(f"{database_name}-results.db")]
+        settings = dict(pragmas=pragmas or {}, format=format, append=append)
+
+        def manifest(path, requests, **extra):
+            return results_to_sql.write_extraction_manifest(
+                str(path), str(database_path), database_name, requests, **dict(settings, **extra)
+            )
+
+        if not workers or workers < 2:
+            path = manifest(Path(database_path).joinpath(f"{database_name}-extraction.json"), requests)
+            for line in launch_process(cmd_args=script + [path], cwd=database_path, verbose=True):
+                print(line)
+            return [database]
+
+        # the odb is opened read-only by each process, so they can run concurrently
+        tasks = [(index, request) for index in range(len(self.steps)) for request in requests]
+        shards = [Path(database_path).joinpath(f"{database_name}-results-{i}{extension}") for i in range(len(tasks))]
+
+        def extract(i):
+            index, request = tasks[i]
+            path = Path(database_path).joinpath(f"{database_name}-extraction-{i}.json")
+            path = manifest(path, [request], steps=[index], output=str(shards[i]))
+            lines = list(launch_process(cmd_args=script + [path], cwd=database_path, verbose=True))
+            os.remove(path)
+            return lines
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for lines in executor.map(extract, range(len(tasks))):
+                for line in lines:
+                    print(line)
+        if format == "db":
+            results_to_sql.merge_databases(str(database), [str(shard) for shard in shards], pragmas=pragmas)
+        else:
+            results_to_sql.merge_stores(str(database), [str(shard) for shard in shards])
+        return [database]
 
     # =============================================================================
     #                               Job data
@@ -273,4 +480,36 @@ class AbaqusProblem(Problem):
         -------
         input file data line (str).
         """
-        return "\n".join([step.jobdata for step in self.steps])
+        return "\n".join(self.iter_jobdata())
+
+    @no_units
+    def iter_jobdata(self):
+        """Yields the information for the input file line by line.
+
+        Parameters
+        ----------
+        None
+
+        Yields
+        ------
+        input file data line (str).
+        """
+        for _, _, lines in self.iter_sections():
+            yield from lines()
+
+    @no_units
+    def iter_sections(self):
+        """Yields the sections of the problem data for the input file, one for
+        each step.
+
+        Parameters
+        ----------
+        None
+
+        Yields
+        ------
+        tuple
+            ``(name, fingerprint, lines)`` of each section.
+        """
+        for step in self.steps:
+            yield f"step:{step.name}", None, partial(iter_lines, step)
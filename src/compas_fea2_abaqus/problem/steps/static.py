@@ -3,6 +3,9 @@ from compas_fea2.problem.steps import StaticRiksStep
 
 from compas_fea2.units import no_units
 
+from ...job.streaming import iter_lines
+from ...job.streaming import or_comment
+
 
 class AbaqusStaticStep(StaticStep):
     """"""
@@ -64,54 +67,48 @@ class AbaqusStaticStep(StaticStep):
         -------
         input file data line (str).
         """
-        return f"""**
-** STEP: {self._name}
-*Step, name={self.name}, nlgeom={"YES" if self._nlgeom else "NO"}, inc={
-            self._max_increments
-        }
-*{self._stype}
-{self._initial_inc_size}, {self._time}, {self._min_inc_size}, {self._time}
-**
-** - Imposed Displacements
-**   ---------------------
-{
-            "\n".join(
-                [force_field.jobdata for force_field in self.displacements]
-                if self.displacements
-                else ["**"]
-            )
-        }
-**
-** - Loads
-**   -----
-{
-            "\n".join(
-                [force_field.jobdata for force_field in self.effective_fields]
-                if self.effective_fields
-                else ["**"]
-            )
-        }
-**
-** - Predefined Fields
-**   -----------------
-**
-{self._generate_prescribed_field_section()}
-** - Output Requests
-**   ---------------
-{
-            "\n".join(
-                ["*Restart, write, frequency=0", "**", "*Output, field"]
-                + [
-                    output.jobdata
-                    for output in self._field_outputs
-                    if self._field_outputs
-                ]
-                or ["**"]
-            )
-        }
-**
-*End Step
-"""
+        return "\n".join(self.iter_jobdata())
+
+    @no_units
+    def iter_jobdata(self):
+        """Yields the information for the input file line by line.
+
+        Parameters
+        ----------
+        None
+
+        Yields
+        ------
+        input file data line (str).
+        """
+        yield "**"
+        yield f"** STEP: {self._name}"
+        yield f"*Step, name={self.name}, nlgeom={'YES' if self._nlgeom else 'NO'}, inc={self._max_increments}"
+        yield f"*{self._stype}"
+        yield f"{self._initial_inc_size}, {self._time}, {self._min_inc_size}, {self._time}"
+        yield "**"
+        yield "** - Imposed Displacements"
+        yield "**   ---------------------"
+        yield from or_comment(line for field in self.displacements for line in iter_lines(field))
+        yield "**"
+        yield "** - Loads"
+        yield "**   -----"
+        yield from or_comment(line for field in self.effective_fields for line in iter_lines(field))
+        yield "**"
+        yield "** - Predefined Fields"
+        yield "**   -----------------"
+        yield "**"
+        yield self._generate_prescribed_field_section()
+        yield "** - Output Requests"
+        yield "**   ---------------"
+        yield "*Restart, write, frequency=0"
+        yield "**"
+        yield "*Output, field"
+        for output in self._field_outputs:
+            yield output.jobdata
+        yield "**"
+        yield "*End Step"
+        yield ""
 
     # # {self._generate_output_section()}
     # @no_units
@@ -202,7 +199,9 @@ class AbaqusStaticStep(StaticStep):
         """
         return "**"
         return "\n".join([ic.jobdata(nodes) for ic, nodes in self.prescribed_fields.items()]) or "**"
-        # return "\n".join([ic.jobdata() if isinstance(ic, InitialTemperatureField) else "" for ic, nodes in self.model.ics.items()]) or "**"
+        # return "\n".join(
+        #     [ic.jobdata() if isinstance(ic, InitialTemperatureField) else "" for ic, nodes in self.model.ics.items()]
+        # ) or "**"
 
     def _generate_prescribed_field_section(self):
         """
@@ -218,7 +217,9 @@ class AbaqusStaticStep(StaticStep):
         """
         return "**"
         return "\n".join([ic.jobdata(nodes) for ic, nodes in self.prescribed_fields.items()]) or "**"
-        # return "\n".join([ic.jobdata() if isinstance(ic, InitialTemperatureField) else "" for ic, nodes in self.model.ics.items()]) or "**"
+        # return "\n".join(
+        #     [ic.jobdata() if isinstance(ic, InitialTemperatureField) else "" for ic, nodes in self.model.ics.items()]
+        # ) or "**"
 
 
 class AbaqusStaticRiksStep(StaticRiksStep):
@@ -15,3 +15,5 @@ from .fields import (  # noqa: F401 F403
     AbaqusContactFieldResults,
     AbaqusTemperatureFieldResults,
 )
+
+from .reader import AbaqusResultsReader  # noqa: F401
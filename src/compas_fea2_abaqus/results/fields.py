@@ -20,6 +20,9 @@ class AbaqusDisplacementFieldResults(DisplacementFieldResults):
         "yy": "UR2",
         "zz": "UR3",
     }
+    compas_to_abaqus_invariant_names = {
+        "magnitude": "MAGNITUDE",
+    }
 
     __doc__ = __doc__ or ""
     __doc__ += DisplacementFieldResults.__doc__ or ""
@@ -47,6 +50,9 @@ class AbaqusReactionFieldResults(ReactionFieldResults):
         "yy": "RM2",
         "zz": "RM3",
     }
+    compas_to_abaqus_invariant_names = {
+        "magnitude": "MAGNITUDE",
+    }
 
     __doc__ = __doc__ or ""
     __doc__ += ReactionFieldResults.__doc__ or ""
@@ -107,6 +113,15 @@ class AbaqusStressFieldResults(StressFieldResults):
         "s13": "S13",
         "s23": "S23",
     }
+    compas_to_abaqus_invariant_names = {
+        "von_mises": "MISES",
+        "max_principal": "MAX_PRINCIPAL",
+        "mid_principal": "MID_PRINCIPAL",
+        "min_principal": "MIN_PRINCIPAL",
+        "tresca": "TRESCA",
+        "pressure": "PRESS",
+        "inv3": "INV3",
+    }
 
     __doc__ = __doc__ or ""
     __doc__ += StressFieldResults.__doc__ or ""
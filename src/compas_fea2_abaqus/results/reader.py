@@ -0,0 +1,551 @@
+import sqlite3
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from . import results_to_sql
+
+
+class AbaqusResultsReader:
+    """Read the results extracted from the odb as NumPy arrays.
+
+    The results are read from the SQLite database (``format="db"``) or from
+    the columnar store (``format="npy"``) written by
+    :meth:`compas_fea2_abaqus.problem.AbaqusProblem.extract_results`. The store
+    is opened at the first access, and the results of a (field, step, part,
+    frame) are read only when requested. The uncompressed arrays of the
+    columnar store are memory-mapped, so that the columns returned by
+    :meth:`column` are views of the files.
+
+    Parameters
+    ----------
+    path : str | :class:`pathlib.Path`
+        Path to the SQLite database (`<name>-results.db`) or to the folder of
+        the columnar store (`<name>-results`).
+    cache_size : int, optional
+        Number of entries kept by the LRU caches of the lookups (frames and
+        key indices), by default 128.
+    cache_bytes : int, optional
+        Maximum size in bytes of the results read from the database or
+        decompressed that are kept in memory, by default 256 MiB. The least
+        recently used results are dropped first. The memory-mapped arrays do
+        not count, as they are not held in memory.
+    mmap_mode : str, optional
+        Memory-mapping mode of the arrays of the columnar store, by default
+        ``"r"``, see :func:`numpy.load`. If ``None``, the arrays are loaded in
+        memory.
+
+    Examples
+    --------
+    >>> with AbaqusResultsReader(problem.extract_results(fields=fields)[0]) as reader:  # doctest: +SKIP
+    ...     displacements = reader.values("u", "step-1", "PART-1", keys=[1, 2, 3])
+    """
+
+    def __init__(self, path, cache_size=128, cache_bytes=2**28, mmap_mode="r"):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"No results at {self.path}")
+        self.format = "npy" if self.path.is_dir() else "db"
+        self.mmap_mode = mmap_mode
+        self.cache_bytes = cache_bytes
+        self._conn = None
+        self._manifest = None
+        self._blocks = None
+        # the caches belong to the reader, so that they are released with it
+        self._results = OrderedDict()
+        self._results_bytes = 0
+        self._key_index = lru_cache(maxsize=cache_size)(self._build_key_index)
+        self._frames = lru_cache(maxsize=cache_size)(self._read_frames)
+        self._ids = lru_cache(maxsize=None)(self._read_ids)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the store and clear the caches."""
+        for cache in (self._key_index, self._frames, self._ids):
+            cache.cache_clear()
+        self._results.clear()
+        self._results_bytes = 0
+        if self._conn:
+            self._conn.close()
+        self._conn = None
+        self._manifest = None
+        self._blocks = None
+
+    # ==========================================================================
+    # Store
+    # ==========================================================================
+
+    @property
+    def conn(self):
+        """Read-only connection to the SQLite database, opened at the first
+        access."""
+        if self.format != "db":
+            raise TypeError("The columnar store has no database connection.")
+        if self._conn is None:
+            self._conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        return self._conn
+
+    @property
+    def manifest(self):
+        """Manifest of the columnar store, read at the first access, see
+        :class:`results_to_sql.NpyWriter`."""
+        if self.format != "npy":
+            raise TypeError("The SQLite database has no manifest.")
+        if self._manifest is None:
+            self._manifest = results_to_sql.read_store_manifest(str(self.path))
+            # index of the blocks of each (field, step, frame, part)
+            self._blocks = {}
+            for block in self._manifest["blocks"]:
+                key = (block["field"], block["step"], block["frame"], block["part"])
+                self._blocks.setdefault(key, []).append(block)
+            for blocks in self._blocks.values():
+                blocks.sort(key=lambda block: (block["type"], block["position"]))
+        return self._manifest
+
+    @property
+    def fields(self):
+        """list[str] : Names of the fields."""
+        if self.format == "npy":
+            return list(self.manifest["fields"])
+        return [field for (field,) in self.conn.execute("SELECT field FROM fields")]
+
+    @property
+    def steps(self):
+        """list[str] : Names of the steps, in the order of the analysis."""
+        if self.format == "npy":
+            return list(dict.fromkeys(block["step"] for block in self.manifest["blocks"]))
+        return list(self._ids("steps"))
+
+    @property
+    def parts(self):
+        """list[str] : Names of the parts."""
+        if self.format == "npy":
+            return list(dict.fromkeys(block["part"] for block in self.manifest["blocks"]))
+        return list(self._ids("parts"))
+
+    def components(self, field):
+        """Return the names of the components and of the invariants of a field.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field.
+
+        Returns
+        -------
+        list[str]
+            The names, in the order of the columns of :meth:`values`.
+        """
+        return list(self._field(field)["names"])
+
+    def frames(self, field, step):
+        """Return the frames of a step extracted for a field.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field.
+        step : str
+            Name of the step.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            (F,) indices of the frames in the step, sorted.
+        """
+        return self._frames(field, step)[0].copy()
+
+    def times(self, field, step):
+        """Return the times of the frames of a step extracted for a field.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field.
+        step : str
+            Name of the step.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            (F,) times of the frames returned by :meth:`frames`.
+        """
+        return self._frames(field, step)[1].copy()
+
+    # ==========================================================================
+    # Results
+    # ==========================================================================
+
+    def keys(self, field, step, part, frame=None):
+        """Return the keys of the nodes or of the elements of the results.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field.
+        step : str
+            Name of the step.
+        part : str
+            Name of the part.
+        frame : int, optional
+            Index of the frame in the step, by default ``None``, which reads
+            the last extracted frame.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            (N,) keys of the rows of the results. The keys are repeated for
+            the results at several integration points or section points.
+        """
+        return self._read(field, step, part, self._frame(field, step, frame))[0]
+
+    def points(self, field, step, part, frame=None):
+        """Return the integration point and section point of the rows of the
+        results.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field.
+        step : str
+            Name of the step.
+        part : str
+            Name of the part.
+        frame : int, optional
+            Index of the frame in the step, by default the last one.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            (N, 2) integration point and section point of each row, 0 when not
+            defined, or ``None`` if they are not defined for any row. The
+            values at the nodes of the elements have the key of the node as
+            integration point.
+        """
+        return self._read(field, step, part, self._frame(field, step, frame))[1]
+
+    def column(self, field, name, step, part, frame=None):
+        """Return the values of a component or of an invariant.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field.
+        name : str
+            Name of the component or of the invariant.
+        step : str
+            Name of the step.
+        part : str
+            Name of the part.
+        frame : int, optional
+            Index of the frame in the step, by default the last one.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            (N,) values, in the order of :meth:`keys`. Read-only view of the
+            file for the uncompressed columnar store, not to be modified.
+        """
+        columns = self._read(field, step, part, self._frame(field, step, frame))[2]
+        if name not in columns:
+            raise KeyError(f"The field {field} has no component {name}. Use one of {self.components(field)}.")
+        return columns[name]
+
+    def values(self, field, step, part, frame=None, keys=None, components=None):
+        """Return the values of the components and of the invariants.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field.
+        step : str
+            Name of the step.
+        part : str
+            Name of the part.
+        frame : int, optional
+            Index of the frame in the step, by default the last one.
+        keys : list[int] | :class:`numpy.ndarray`, optional
+            Keys of the nodes or of the elements, by default ``None``, which
+            returns the results of all the keys. The rows of each key are
+            found with the index of :meth:`rows`.
+        components : list[str], optional
+            Names of the components and of the invariants, by default all of
+            them, see :meth:`components`.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            (N, C) values, in the order of :meth:`keys` or of `keys`.
+        """
+        frame = self._frame(field, step, frame)
+        names = self.components(field) if components is None else list(components)
+        rows = slice(None) if keys is None else self.rows(field, step, part, keys, frame)
+        columns = [self.column(field, name, step, part, frame) for name in names]
+        if not columns:
+            return np.empty((len(self.keys(field, step, part, frame)[rows]), 0))
+        return np.stack([column[rows] for column in columns], axis=1)
+
+    def rows(self, field, step, part, keys, frame=None):
+        """Return the rows of the results of the given keys.
+
+        The index from the keys to the rows is computed at the first call for
+        a (field, step, part, frame) and kept in the LRU cache.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field.
+        step : str
+            Name of the step.
+        part : str
+            Name of the part.
+        keys : list[int] | :class:`numpy.ndarray`
+            Keys of the nodes or of the elements.
+        frame : int, optional
+            Index of the frame in the step, by default the last one.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Indices of the rows of each key, in the order of `keys`. The keys
+            with results at several points have several consecutive rows.
+
+        Raises
+        ------
+        KeyError
+            If some of the keys have no results.
+        """
+        order, sorted_keys = self._key_index(field, step, part, self._frame(field, step, frame))
+        keys = np.asarray(keys, dtype=sorted_keys.dtype).ravel()
+        start = np.searchsorted(sorted_keys, keys, side="left")
+        counts = np.searchsorted(sorted_keys, keys, side="right") - start
+        if not counts.all():
+            raise KeyError(f"No results of {field} in {part} for the keys {keys[counts == 0].tolist()}")
+        if (counts == 1).all():
+            return order[start]
+        # the rows of each key are consecutive in the sorted keys
+        first = np.repeat(start, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return order[first + offsets]
+
+    # ==========================================================================
+    # Lookups
+    # ==========================================================================
+
+    def _field(self, field):
+        """Return the description of a field: its component names, dtype and
+        compression."""
+        if self.format == "npy":
+            if field not in self.manifest["fields"]:
+                raise KeyError(f"Unknown field: {field}. Use one of {self.fields}.")
+            description = self.manifest["fields"][field]
+            return {
+                "names": description["components"] + description["invariants"],
+                "dtype": description.get("dtype") or "float64",
+                "compression": description.get("compression"),
+            }
+        sql = "SELECT description, components, invariants FROM fields WHERE field = ?"
+        row = self.conn.execute(sql, (field,)).fetchone()
+        if not row:
+            raise KeyError(f"Unknown field: {field}. Use one of {self.fields}.")
+        dtype, compression = results_to_sql.field_storage(row[0])
+        return {"names": row[1].split() + row[2].split(), "dtype": dtype, "compression": compression}
+
+    def _read_ids(self, table):
+        """Return the {name: id} of the entries of a dimension table."""
+        return dict((name, id) for id, name in self.conn.execute(f"SELECT id, name FROM {table} ORDER BY id"))
+
+    def _id(self, table, name):
+        ids = self._ids(table)
+        if name not in ids:
+            raise KeyError(f"Unknown {table[:-1]}: {name}. Use one of {list(ids)}.")
+        return ids[name]
+
+    def _read_frames(self, field, step):
+        """Return the indices and the times of the frames of a step extracted
+        for a field."""
+        self._field(field)
+        if self.format == "npy":
+            if step not in self.steps:
+                raise KeyError(f"Unknown step: {step}. Use one of {self.steps}.")
+            extracted = set()
+            for name, step_name, frame in self.manifest["extracted"]:
+                if name == field and step_name == step:
+                    extracted.add(frame)
+            times = {}
+            for block in self.manifest["blocks"]:
+                if (block["field"], block["step"]) == (field, step):
+                    times[block["frame"]] = block["time"]
+            frames = sorted(extracted | set(times))
+            return np.array(frames, dtype=int), np.array([times.get(frame, np.nan) for frame in frames])
+        sql = (
+            "SELECT e.frame, frames.time FROM extracted AS e LEFT JOIN frames "
+            "ON frames.step_id = e.step_id AND frames.frame = e.frame "
+            "WHERE e.field = ? AND e.step_id = ? ORDER BY e.frame"
+        )
+        rows = self.conn.execute(sql, (field, self._id("steps", step))).fetchall()
+        frames = np.array([frame for frame, _ in rows], dtype=int)
+        return frames, np.array([np.nan if time is None else time for _, time in rows], dtype=float)
+
+    def _frame(self, field, step, frame):
+        """Return the index of the requested frame, checking that it was
+        extracted."""
+        frames = self._frames(field, step)[0]
+        if not len(frames):
+            raise KeyError(f"No frames of {field} extracted in {step}.")
+        if frame is None:
+            return int(frames[-1])
+        if frame not in frames:
+            raise KeyError(f"The frame {frame} of {step} was not extracted for {field}. Use one of {frames.tolist()}.")
+        return int(frame)
+
+    def _build_key_index(self, field, step, part, frame):
+        """Return the stable order of the keys and the sorted keys."""
+        keys = np.asarray(self._read(field, step, part, frame)[0])
+        order = np.argsort(keys, kind="stable")
+        return order, keys[order]
+
+    # ==========================================================================
+    # Reading
+    # ==========================================================================
+
+    def _read(self, field, step, part, frame):
+        """Return the results of a (field, step, part, frame), from the cache
+        if possible, see `cache_bytes`."""
+        key = (field, step, part, frame)
+        if key in self._results:
+            self._results.move_to_end(key)
+            return self._results[key][0]
+        results = self._read_results(field, step, part, frame)
+        keys, points, columns = results
+        size = sum(_nbytes(array) for array in [keys, points, *columns.values()])
+        if size <= self.cache_bytes:
+            self._results[key] = (results, size)
+            self._results_bytes += size
+            while self._results_bytes > self.cache_bytes:
+                _, (_, dropped) = self._results.popitem(last=False)
+                self._results_bytes -= dropped
+        return results
+
+    def _read_results(self, field, step, part, frame):
+        """Read the results of a (field, step, part, frame).
+
+        Returns
+        -------
+        tuple
+            ``(keys, points, columns)``, where `columns` is a {name: (N,)
+            array} of the components and of the invariants.
+        """
+        description = self._field(field)
+        if self.format == "npy":
+            return self._read_store(field, step, part, frame, description)
+        if part not in self._ids("parts"):
+            raise KeyError(f"Unknown part: {part}. Use one of {self.parts}.")
+        if results_to_sql.is_packed(description["dtype"], description["compression"]):
+            return self._read_packed(field, step, part, frame, description)
+        return self._read_rows(field, step, part, frame, description)
+
+    def _read_rows(self, field, step, part, frame, description):
+        """Read the results stored one value per row in the database."""
+        names = description["names"]
+        sql = (
+            f"SELECT key, ip, sp{''.join(', ' + name for name in names)} FROM {field}_data "
+            "WHERE step_id = ? AND part_id = ? AND frame = ? ORDER BY key, ip, sp"
+        )
+        rows = self.conn.execute(sql, (self._id("steps", step), self._id("parts", part), frame)).fetchall()
+        data = np.array(rows, dtype=float).reshape(-1, 3 + len(names))
+        points = data[:, 1:3].astype(int)
+        columns = dict((name, data[:, 3 + i]) for i, name in enumerate(names))
+        return data[:, 0].astype(np.int64), points if points.any() else None, columns
+
+    def _read_packed(self, field, step, part, frame, description):
+        """Read the results packed by block in the database."""
+        names, compression = description["names"], description["compression"]
+        sql = (
+            f"SELECT rows, keys, points, data FROM {field}_blocks "
+            "WHERE step_id = ? AND part_id = ? AND frame = ? ORDER BY position_id"
+        )
+        blocks = []
+        params = (self._id("steps", step), self._id("parts", part), frame)
+        for rows, keys, points, data in self.conn.execute(sql, params):
+            blocks.append(
+                (
+                    results_to_sql.unpack_array(keys, compression),
+                    None if points is None else results_to_sql.unpack_array(points, compression),
+                    results_to_sql.unpack_array(data, compression).reshape(rows, len(names)),
+                )
+            )
+        keys, points = _concatenate_points([keys for keys, _, _ in blocks], [points for _, points, _ in blocks])
+        if blocks:
+            data = np.concatenate([data for _, _, data in blocks]) if len(blocks) > 1 else blocks[0][2]
+        else:
+            data = np.empty((0, len(names)), dtype=description["dtype"])
+        return keys, points, dict((name, data[:, i]) for i, name in enumerate(names))
+
+    def _read_store(self, field, step, part, frame, description):
+        """Read the results of the columnar store, memory-mapping the
+        uncompressed arrays."""
+        if part not in self.parts:
+            raise KeyError(f"Unknown part: {part}. Use one of {self.parts}.")
+        blocks = self._blocks.get((field, step, frame, part), [])
+        path, compression = str(self.path), description["compression"]
+
+        def load(block, name):
+            return results_to_sql.load_store_array(path, block, name, compression, self.mmap_mode)
+
+        keys = [load(block, "keys") for block in blocks]
+        points = []
+        for block in blocks:
+            ip, sp = load(block, "ip"), load(block, "sp")
+            points.append(None if ip is None else np.stack([ip, sp], axis=1))
+        keys, points = _concatenate_points(keys, points)
+        columns = {}
+        for name in description["names"]:
+            arrays = [load(block, name) for block in blocks]
+            if len(arrays) == 1:
+                columns[name] = arrays[0]
+            else:
+                columns[name] = np.concatenate(arrays) if arrays else np.empty(0, dtype=description["dtype"])
+        return keys, points, columns
+
+
+def _nbytes(array):
+    """Return the size in memory of an array, 0 if memory-mapped or ``None``."""
+    if array is None or isinstance(array, np.memmap):
+        return 0
+    return array.nbytes
+
+
+def _concatenate_points(keys, points):
+    """Concatenate the keys and the points of the blocks of results.
+
+    Parameters
+    ----------
+    keys : list[:class:`numpy.ndarray`]
+        (N,) keys of each block.
+    points : list[:class:`numpy.ndarray`]
+        (N, 2) points of each block, or ``None`` if not defined.
+
+    Returns
+    -------
+    tuple
+        The (N,) keys and the (N, 2) points, or ``None`` if not defined for
+        any block.
+    """
+    if len(keys) == 1:
+        return keys[0], points[0]
+    if not keys:
+        return np.empty(0, dtype=np.int64), None
+    if all(block is None for block in points):
+        return np.concatenate(keys), None
+    points = [
+        np.zeros((len(block_keys), 2), dtype=int) if block is None else block for block_keys, block in zip(keys, points)
+    ]
+    return np.concatenate(keys), np.concatenate(points)
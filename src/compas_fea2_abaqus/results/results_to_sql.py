@@ -2,10 +2,12 @@
 Note
 ----
 to debug run from terminal:
-abaqus python path_to_\compas_fea2_abaqus\results\odb_extract.py None path_to_odb odb_file_name
+abaqus python path_to_\compas_fea2_abaqus\results\results_to_sql.py path_to_extraction_manifest.json
+(see `write_extraction_manifest`)
 """
 
 from sqlite3 import Error
+from itertools import chain
 import sqlite3
 
 try:
@@ -16,9 +18,14 @@ except Exception as e:
     print(e)
     pass
 
+import io
+import json
 import os
+import shutil
 import sys
 
+import numpy as np
+
 # from collections.abc import Iterable
 
 # conversion between Field Value names and FieldValue attribute names
@@ -63,6 +70,31 @@ invariants_dict = {
 
 # TODO Extend with:https://abaqus-docs.mit.edu/2017/English/SIMACAEOUTRefMap/simaout-c-std-nodalvariables.htm
 
+# SQLite pragmas used during the bulk load of the results. The database is
+# created from scratch at each extraction, so there is no need for a journal or
+# for syncing the file to disk after each transaction.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+}
+
+# Tables clustered on their primary key (requires SQLite 3.8.2).
+WITHOUT_ROWID = " WITHOUT ROWID" if sqlite3.sqlite_version_info >= (3, 8, 2) else ""
+
+# Version of the layout of the columnar results store.
+STORE_VERSION = 1
+
+# Version of the extraction manifest.
+MANIFEST_VERSION = 1
+
+# Precisions of the stored values. float16 is meant for visualisation only,
+# the values beyond 65504 overflow.
+DTYPES = ("float64", "float32", "float16")
+
+# Compressions of the stored arrays. zstd and lz4 require the `zstandard` and
+# `lz4` packages, which are not shipped with Abaqus.
+COMPRESSIONS = ("zlib", "zstd", "lz4")
+
 
 def create_connection(db_file=None):
     """Create a database connection to the SQLite database specified by db_file.
@@ -86,6 +118,23 @@ def create_connection(db_file=None):
     return conn
 
 
+def set_pragmas(conn, pragmas):
+    """Set the pragmas of the database connection.
+
+    Parameters
+    ----------
+    conn : :class:`sqlite3.Connection`
+        Connection to the database.
+    pragmas : dict
+        {name: value} of the pragmas, e.g. ``{"journal_mode": "WAL"}``.
+
+    """
+    for name, value in pragmas.items():
+        if not (name.replace("_", "").isalnum() and str(value).replace("-", "").replace("_", "").isalnum()):
+            raise ValueError("Invalid pragma: {}={}".format(name, value))
+        conn.execute("PRAGMA {}={}".format(name, value))
+
+
 def _create_table(conn, sql):
     """Create a table from the create_table_sql statement.
 
@@ -121,26 +170,109 @@ def create_info_table(conn):
         _create_table(conn, sql)
 
 
+def create_extracted_table(conn):
+    """Create the table recording the (field, step, frame) already extracted.
+
+    Parameters
+    ----------
+    conn : obj
+        Connection to the databse.
+    """
+    with conn:
+        sql = (
+            "CREATE TABLE IF NOT EXISTS extracted "
+            "(field text, step_id integer, frame integer, PRIMARY KEY (field, step_id, frame) );"
+        )
+        _create_table(conn, sql)
+
+
 def create_field_description_table(conn):
     with conn:
-        sql = """CREATE TABLE IF NOT EXISTS fields (field text, description text, components text, invariants text, UNIQUE(field) );"""
+        sql = (
+            "CREATE TABLE IF NOT EXISTS fields "
+            "(field text, description text, components text, invariants text, UNIQUE(field) );"
+        )
         _create_table(conn, sql)
 
 
 def insert_field_description(conn, field, description, components_names, invariants_names):
-    sql = """ INSERT OR IGNORE INTO fields VALUES ('{}', '{}', '{}', '{}')""".format(
-        field,
-        description,
-        components_names,
-        invariants_names,
+    sql = """ INSERT OR IGNORE INTO fields VALUES (?, ?, ?, ?)"""
+    try:
+        c = conn.execute(sql, (field, description, components_names, invariants_names))
+    except Error as e:
+        print(e)
+        print(sql)
+        exit()
+    return c.lastrowid
+
+
+def create_dimension_tables(conn):
+    """Create the dimension tables of the steps, frames, parts and positions.
+
+    The results tables refer to the entries of the dimension tables by their
+    integer id, instead of repeating their names in every row.
+
+    Parameters
+    ----------
+    conn : obj
+        Connection to the databse.
+    """
+    with conn:
+        _create_table(conn, """CREATE TABLE IF NOT EXISTS steps (id integer PRIMARY KEY, name text, UNIQUE(name) );""")
+        _create_table(
+            conn,
+            "CREATE TABLE IF NOT EXISTS frames "
+            "(step_id integer, frame integer, time float, PRIMARY KEY (step_id, frame) );",
+        )
+        _create_table(conn, """CREATE TABLE IF NOT EXISTS parts (id integer PRIMARY KEY, name text, UNIQUE(name) );""")
+        _create_table(
+            conn,
+            "CREATE TABLE IF NOT EXISTS positions "
+            "(id integer PRIMARY KEY, type text, name text, UNIQUE(type, name) );",
+        )
+
+
+def get_dimension_id(conn, table, values):
+    """Return the id of an entry of a dimension table, inserting it if missing.
+
+    Parameters
+    ----------
+    conn : obj
+        Connection to the databse.
+    table : str
+        Name of the dimension table.
+    values : dict
+        {column: value} of the entry, e.g. ``{"name": "step-1"}``.
+
+    Return
+    ------
+    int
+        Id of the entry.
+    """
+    columns = sorted(values)
+    params = [values[column] for column in columns]
+    sql = """INSERT OR IGNORE INTO {} ({}) VALUES ({})""".format(
+        table, ", ".join(columns), ", ".join(["?"] * len(columns))
     )
+    conn.execute(sql, params)
+    sql = """SELECT id FROM {} WHERE {}""".format(table, " AND ".join("{} = ?".format(column) for column in columns))
+    return conn.execute(sql, params).fetchone()[0]
+
 
-    return _insert_entry(conn, sql)
+def insert_frame(conn, step_id, frame, time):
+    """Insert a frame of a step in the frames table, if missing."""
+    conn.execute("""INSERT OR IGNORE INTO frames VALUES (?, ?, ?)""", (step_id, frame, time))
 
 
 def create_field_table(conn, field, components_names, invariants_names):
     """Create the results table for the given field.
 
+    The results are stored in the `<field>_data` table, whose primary key is
+    ``(step_id, part_id, key, frame, ip, sp)``, and are exposed with the names
+    of the steps, parts and positions by the `<field>` view. The integration
+    point `ip` and the section point `sp` are 0 when not defined. The values
+    at the nodes of the elements have the key of the node as `ip`.
+
     Parameters
     ----------
     conn : obj
@@ -152,16 +284,218 @@ def create_field_table(conn, field, components_names, invariants_names):
     invariants_names : Iterable
         Output field invariants names.
     """
-    # FOREIGN KEY (step) REFERENCES analysis_results (step_name),
+    names = list(components_names) + list(invariants_names)
     with conn:
-        sql = """CREATE TABLE IF NOT EXISTS {} (step text, part text, type text, position text, key integer, {});""".format(
+        sql = (
+            "CREATE TABLE IF NOT EXISTS {}_data "
+            "(step_id integer, frame integer, part_id integer, key integer, ip integer, sp integer, "
+            "position_id integer, {}, PRIMARY KEY (step_id, part_id, key, frame, ip, sp) ){};"
+        ).format(
+            field,
+            ", ".join(["{} float".format(c) for c in names]),
+            WITHOUT_ROWID,
+        )
+        _create_table(conn, sql)
+        sql = (
+            "CREATE VIEW IF NOT EXISTS {0} AS SELECT steps.name AS step, d.frame AS frame, frames.time AS time, "
+            "parts.name AS part, positions.type AS type, positions.name AS position, "
+            "d.key AS key, d.ip AS ip, d.sp AS sp, {1} FROM {0}_data AS d "
+            "JOIN steps ON steps.id = d.step_id JOIN frames ON frames.step_id = d.step_id AND frames.frame = d.frame "
+            "JOIN parts ON parts.id = d.part_id JOIN positions ON positions.id = d.position_id;"
+        ).format(
             field,
-            ", ".join(["{} float".format(c) for c in components_names + invariants_names]),
+            ", ".join(["d.{0} AS {0}".format(c) for c in names]),
         )
         _create_table(conn, sql)
 
 
-def insert_field_results(conn, field, components_data, invariants_data, step, part, key_type, position, key):
+def create_field_indexes(conn, field):
+    """Create the indexes of the results table of the given field.
+
+    The indexes are created after the bulk load of the results, which is
+    faster than updating them at each insert.
+
+    Parameters
+    ----------
+    conn : obj
+        Connection to the databse.
+    field : str
+        Name of the output field.
+    """
+    with conn:
+        _create_table(conn, """CREATE INDEX IF NOT EXISTS {0}_part_key ON {0}_data (part_id, key);""".format(field))
+
+
+def field_storage(description):
+    """Return the storage of the values of a field from its description.
+
+    Parameters
+    ----------
+    description : str
+        Description of the field in the `fields` table, see
+        :func:`extract_odb_data`.
+
+    Returns
+    -------
+    dtype : str
+        Precision of the values, see `DTYPES`.
+    compression : str
+        Compression of the values, see `COMPRESSIONS`, or ``None``.
+    """
+    options = json.loads(description) if description else {}
+    return options.get("dtype") or "float64", options.get("compression")
+
+
+def is_packed(dtype, compression):
+    """Check if the results of a field are stored in packed blocks in the
+    SQLite database, i.e. with a precision lower than float64 or compressed."""
+    return dtype != "float64" or bool(compression)
+
+
+def create_packed_field_table(conn, field):
+    """Create the table of the packed results of the given field.
+
+    The results are stored in the `<field>_blocks` table, with one row per
+    step, frame, part and position, whose `keys`, `points` (the integration
+    point and section point of each key, ``NULL`` if not defined) and `data`
+    (the components and the invariants) are arrays packed with
+    :func:`pack_array`.
+
+    Parameters
+    ----------
+    conn : obj
+        Connection to the databse.
+    field : str
+        Name of the output field.
+    """
+    with conn:
+        sql = (
+            "CREATE TABLE IF NOT EXISTS {}_blocks "
+            "(step_id integer, frame integer, part_id integer, position_id integer, rows integer, "
+            "keys blob, points blob, data blob, PRIMARY KEY (step_id, part_id, frame, position_id) );"
+        ).format(field)
+        _create_table(conn, sql)
+
+
+def read_packed_field(conn, field, compression=None):
+    """Read the packed results of a field.
+
+    Parameters
+    ----------
+    conn : obj
+        Connection to the databse.
+    field : str
+        Name of the output field.
+    compression : str, optional
+        Compression of the arrays, see :func:`field_storage`.
+
+    Yields
+    ------
+    tuple
+        ``(step, frame, time, part, type, position, keys, points, data)`` of
+        each block, where `points` is ``None`` if not defined.
+    """
+    sql = (
+        "SELECT steps.name, b.frame, frames.time, parts.name, positions.type, positions.name, b.keys, b.points, b.data "
+        "FROM {}_blocks AS b JOIN steps ON steps.id = b.step_id "
+        "JOIN frames ON frames.step_id = b.step_id AND frames.frame = b.frame "
+        "JOIN parts ON parts.id = b.part_id JOIN positions ON positions.id = b.position_id "
+        "ORDER BY b.step_id, b.frame, b.part_id, b.position_id".format(field)
+    )
+    for row in conn.execute(sql):
+        keys, points, data = [unpack_array(blob, compression) if blob is not None else None for blob in row[6:]]
+        yield tuple(row[:6]) + (keys, points, data)
+
+
+def _compressor(compression):
+    """Return the compress and decompress functions of a compression."""
+    if compression == "zlib":
+        import zlib
+
+        return zlib.compress, zlib.decompress
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress
+    if compression == "lz4":
+        import lz4.frame
+
+        return lz4.frame.compress, lz4.frame.decompress
+    raise ValueError("Unknown compression: {}".format(compression))
+
+
+def pack_array(array, compression=None):
+    """Pack an array in bytes, in the `.npy` format.
+
+    Parameters
+    ----------
+    array : :class:`numpy.ndarray`
+        The array.
+    compression : str, optional
+        Compression of the bytes, see `COMPRESSIONS`.
+
+    Returns
+    -------
+    bytes
+        The packed array.
+    """
+    stream = io.BytesIO()
+    np.save(stream, np.ascontiguousarray(array))
+    data = stream.getvalue()
+    if compression:
+        data = _compressor(compression)[0](data)
+    return data
+
+
+def unpack_array(data, compression=None):
+    """Unpack an array packed with :func:`pack_array`.
+
+    Parameters
+    ----------
+    data : bytes
+        The packed array.
+    compression : str, optional
+        Compression of the bytes.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The array.
+    """
+    data = bytes(data)
+    if compression:
+        data = _compressor(compression)[1](data)
+    return np.load(io.BytesIO(data))
+
+
+def group_rows(key_types, positions):
+    """Group the rows of the results of a part by key type and position.
+
+    Parameters
+    ----------
+    key_types : list
+        Key type of each row.
+    positions : list
+        Position of each row.
+
+    Returns
+    -------
+    list
+        ``((key_type, position), rows)`` of each group, sorted, where `rows`
+        are the indices of the rows of the group, or a slice if the group has
+        all the rows.
+    """
+    groups = {}
+    for row, group in enumerate(zip(key_types, positions)):
+        groups.setdefault(group, []).append(row)
+    return [
+        (group, rows if len(rows) < len(key_types) else slice(None)) for group, rows in sorted(groups.items())
+    ]
+
+
+def insert_field_results(
+    conn, field, components_data, invariants_data, step, part, key_type, position, key, frame=0, time=None, ip=0, sp=0
+):
     """Insert the results of the analysis at a node.
 
     Parameters
@@ -184,26 +518,639 @@ def insert_field_results(conn, field, components_data, invariants_data, step, pa
         'NODAL' or 'INTERGRATION POINT'
     key : int
         Key of the node/element.
+    frame : int, optional
+        Index of the frame in the step, by default 0.
+    time : float, optional
+        Time of the frame.
+    ip : int, optional
+        Integration point, by default 0.
+    sp : int, optional
+        Section point, by default 0.
 
     Return
     ------
     int
-        Index of the inserted item.
+        Number of inserted rows.
     """
+    step_id = get_dimension_id(conn, "steps", {"name": step})
+    insert_frame(conn, step_id, frame, time)
+    part_id = get_dimension_id(conn, "parts", {"name": part})
+    position_id = get_dimension_id(conn, "positions", {"type": key_type, "name": position})
+    row = [step_id, frame, part_id, int(key), ip, sp, position_id] + list(components_data) + list(invariants_data)
+    return insert_field_rows(conn, field, [row])
 
-    sql = """ INSERT INTO {} VALUES ('{}', '{}', '{}', '{}', {}, {})""".format(
-        field,
-        step,
-        part,
-        key_type,
-        position,
-        int(key),
-        ", ".join([str(c) for c in components_data + invariants_data]),
-    )
-    return _insert_entry(conn, sql)
+
+def insert_field_rows(conn, field, rows):
+    """Insert the results of the analysis in bulk.
+
+    The rows are inserted with a single parameterised statement. The caller is
+    responsible for the transaction, so that all the rows of a field and of a
+    frame are committed at once.
+
+    Parameters
+    ----------
+    conn : obj
+        Connection to the databse.
+    field : str
+        Name of the output field.
+    rows : Iterable
+        ``[step_id, frame, part_id, key, ip, sp, position_id, components...,
+        invariants...]`` of each row, see :func:`get_dimension_id`.
+
+    Return
+    ------
+    int
+        Number of inserted rows.
+    """
+    rows = iter(rows)
+    try:
+        first = next(rows)
+    except StopIteration:
+        return 0
+    sql = """ INSERT INTO {}_data VALUES ({})""".format(field, ", ".join(["?"] * len(first)))
+    try:
+        c = conn.executemany(sql, chain([first], rows))
+    except Error as e:
+        print(e)
+        print(sql)
+        exit()
+    return c.rowcount
 
 
-def extract_odb_data(database_path, database_name, field):
+def select_frames(frames, selection=None):
+    """Select the frames of a step to extract.
+
+    Parameters
+    ----------
+    frames : list
+        Frames of the step.
+    selection : str | list, optional
+        One of:
+
+        - ``"last"`` (default): the last frame;
+        - ``"all"``: all the frames;
+        - ``"every:N"``: every N-th frame, starting from the first one;
+        - ``"time:start:end"``: the frames whose time is within the window,
+          bounds included, either bound can be left empty;
+        - a list of indices, e.g. ``[0, 10, -1]``, or a comma-separated
+          string of indices, e.g. ``"0,10,-1"``.
+
+    Yields
+    ------
+    tuple
+        ``(index, frame)`` of each selected frame, in increasing order. The
+        frames are accessed one at a time.
+    """
+    count = len(frames)
+    selection = selection or "last"
+    if isinstance(selection, list):
+        selection = ",".join(str(index) for index in selection)
+    if selection == "last":
+        indices = [count - 1] if count else []
+    elif selection == "all":
+        indices = range(count)
+    elif selection.startswith("every:"):
+        indices = range(0, count, int(selection.split(":")[1]))
+    elif selection.startswith("time:"):
+        start, end = [float(bound) if bound else None for bound in selection.split(":")[1:3]]
+        for index in range(count):
+            frame = frames[index]
+            if (start is None or frame.frameValue >= start) and (end is None or frame.frameValue <= end):
+                yield index, frame
+        return
+    else:
+        indices = sorted(set(int(index) % count for index in selection.split(",") if -count <= int(index) < count))
+    for index in indices:
+        yield index, frames[index]
+
+
+def iter_bulk_blocks(field_output, invariants=None):
+    """Read the values of a field output as arrays, one bulk data block at a time.
+
+    Parameters
+    ----------
+    field_output : :class:`odbAccess.FieldOutput`
+        Abaqus field output.
+    invariants : list, optional
+        Names of the invariants to append to the components, see
+        :func:`block_invariants`.
+
+    Yields
+    ------
+    tuple
+        ``(part, key_type, position, labels, points, data)`` of each block,
+        where `labels` are the (N,) keys of the nodes or of the elements,
+        `points` the (N, 2) integration point and section point of each value
+        (0 if not defined) and `data` the (N, C) values of the components,
+        followed by the invariants. The values at the nodes of the elements
+        (e.g. ``ELEMENT_NODAL``) are keyed by element, with the key of the node
+        in place of the integration point.
+    """
+    for block in field_output.bulkDataBlocks:
+        node_labels = block.nodeLabels
+        if node_labels is not None and not len(node_labels):
+            node_labels = None
+        labels, key_type = block.elementLabels, "element"
+        if labels is None or not len(labels):
+            labels, key_type, node_labels = node_labels, "node", None
+        if labels is None:
+            continue
+        labels = np.asarray(labels, dtype=np.int64)
+        points = np.zeros((len(labels), 2), dtype=np.int64)
+        integration_points = getattr(block, "integrationPoints", None)
+        if node_labels is not None:
+            # the elements sharing a node have their own value at the node
+            points[:, 0] = node_labels
+        elif integration_points is not None and len(integration_points):
+            points[:, 0] = integration_points
+        section_point = getattr(block, "sectionPoint", None)
+        if section_point is not None:
+            points[:, 1] = section_point.number
+        data = np.asarray(block.data, dtype=float).reshape(len(labels), -1)
+        if invariants:
+            data = np.column_stack((data, block_invariants(block, field_output.componentLabels, data, invariants)))
+        yield block.instance.name[:-2], key_type, block.position.name, labels, points, data
+
+
+def block_invariants(block, components_labels, data, names):
+    """Return the invariants of the values of a bulk data block.
+
+    The invariants computed by Abaqus are read from the block, the others are
+    computed from the components (see :func:`compute_invariants`).
+
+    Parameters
+    ----------
+    block : :class:`odbAccess.FieldBulkData`
+        Bulk data block.
+    components_labels : list
+        Abaqus names of the components.
+    data : :class:`numpy.ndarray`
+        (N, C) values of the components.
+    names : list
+        Abaqus names of the invariants, see `invariants_dict`.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        (N, I) values of the invariants.
+    """
+    available = {}
+    for name in names:
+        values = getattr(block, invariants_dict.get(name, ""), None)
+        if values is not None and len(values) == len(data):
+            available[name] = np.asarray(values, dtype=float).reshape(-1)
+    missing = [name for name in names if name not in available]
+    if missing:
+        available.update(compute_invariants(components_labels, data, missing))
+    return np.column_stack([available[name] for name in names])
+
+
+def compute_invariants(components_labels, data, names):
+    """Compute the invariants of vectors or of symmetric tensors from their
+    components.
+
+    Parameters
+    ----------
+    components_labels : list
+        Abaqus names of the components, e.g. ``["U1", "U2", "U3"]`` or
+        ``["S11", "S22", "S33", "S12", "S13", "S23"]``. Missing tensor
+        components are 0.
+    data : :class:`numpy.ndarray`
+        (N, C) values of the components.
+    names : list
+        Abaqus names of the invariants, see `invariants_dict`.
+
+    Returns
+    -------
+    dict
+        {name: (N,) values} of the invariants.
+    """
+    labels = list(components_labels)
+    results = {}
+    if "MAGNITUDE" in names:
+        results["MAGNITUDE"] = np.sqrt((data**2).sum(axis=1))
+    if set(names) - set(results):
+        # symmetric tensor, the labels are the name of the field and the indices
+        prefix = labels[0][:-2]
+
+        def component(i, j):
+            for label in ("{}{}{}".format(prefix, i, j), "{}{}{}".format(prefix, j, i)):
+                if label in labels:
+                    return data[:, labels.index(label)]
+            return np.zeros(len(data))
+
+        tensor = np.zeros((len(data), 3, 3))
+        for i in range(3):
+            for j in range(i, 3):
+                tensor[:, i, j] = tensor[:, j, i] = component(i + 1, j + 1)
+        pressure = -np.trace(tensor, axis1=1, axis2=2) / 3.0
+        deviator = tensor + pressure[:, None, None] * np.eye(3)
+        determinant = 13.5 * np.linalg.det(deviator)
+        principals = np.linalg.eigvalsh(tensor)
+        center = (tensor[:, 0, 0] + tensor[:, 1, 1]) / 2.0
+        radius = np.sqrt(((tensor[:, 0, 0] - tensor[:, 1, 1]) / 2.0) ** 2 + tensor[:, 0, 1] ** 2)
+        results.update(
+            {
+                "MISES": np.sqrt(1.5 * (deviator**2).sum(axis=(1, 2))),
+                "PRESS": pressure,
+                "INV3": np.sign(determinant) * np.abs(determinant) ** (1.0 / 3.0),
+                "MIN_PRINCIPAL": principals[:, 0],
+                "MID_PRINCIPAL": principals[:, 1],
+                "MAX_PRINCIPAL": principals[:, 2],
+                "TRESCA": principals[:, 2] - principals[:, 0],
+                "MAX_INPLANE_PRINCIPAL": center + radius,
+                "MIN_INPLANE_PRINCIPAL": center - radius,
+                "OUTOFPLANE_PRINCIPAL": tensor[:, 2, 2],
+            }
+        )
+    unknown = set(names) - set(results)
+    if unknown:
+        raise ValueError("Unknown invariants: {}".format(", ".join(sorted(unknown))))
+    return dict((name, results[name]) for name in names)
+
+
+def reduce_points(labels, data, reduction):
+    """Reduce the values at the integration and section points of each key.
+
+    Parameters
+    ----------
+    labels : :class:`numpy.ndarray`
+        (N,) keys of the values.
+    data : :class:`numpy.ndarray`
+        (N, C) values of the components.
+    reduction : str
+        ``"mean"`` for the mean of each component, or ``"max"`` for the
+        maximum of each component.
+
+    Returns
+    -------
+    labels : :class:`numpy.ndarray`
+        (K,) sorted keys.
+    points : :class:`numpy.ndarray`
+        (K, 2) zeros, the reduced values are not at a specific point.
+    data : :class:`numpy.ndarray`
+        (K, C) reduced values.
+    """
+    order = np.argsort(labels, kind="mergesort")
+    labels, data = labels[order], data[order]
+    starts = np.flatnonzero(np.concatenate(([True], labels[1:] != labels[:-1])))
+    if reduction == "mean":
+        data = np.add.reduceat(data, starts, axis=0) / np.diff(np.append(starts, len(labels)))[:, None]
+    elif reduction == "max":
+        data = np.maximum.reduceat(data, starts, axis=0)
+    else:
+        raise ValueError("Unknown reduction: {}".format(reduction))
+    return labels[starts], np.zeros((len(starts), 2), dtype=np.int64), data
+
+
+def reduce_blocks(blocks, reduction, components_labels=(), invariants=()):
+    """Reduce the values of the blocks of a field output at the integration
+    points and section points.
+
+    The values at the section points of an element are in different blocks,
+    so the blocks of each part and key type are reduced together. Nodal
+    blocks are left unchanged. Only the components are reduced, the
+    invariants are then computed from the reduced components (e.g. the Mises
+    stress of the mean stress, not the mean of the Mises stresses).
+
+    Parameters
+    ----------
+    blocks : Iterable
+        ``(part, key_type, position, labels, points, data)`` of each block,
+        see :func:`iter_bulk_blocks`.
+    reduction : str
+        ``"mean"`` or ``"max"``, see :func:`reduce_points`.
+    components_labels : list, optional
+        Abaqus names of the components, the first columns of the data.
+    invariants : list, optional
+        Abaqus names of the invariants following the components in the data,
+        see :func:`compute_invariants`.
+
+    Returns
+    -------
+    list
+        ``(part, key_type, position, labels, points, data)`` of each block,
+        with the name of the reduction as position of the reduced blocks.
+    """
+    reduced = []
+    groups = {}
+    for block in blocks:
+        if block[2] == "NODAL":
+            reduced.append(block)
+        else:
+            groups.setdefault(block[:2], []).append(block)
+    count = len(components_labels) if invariants else None
+    for (part, key_type), group in groups.items():
+        labels, points, data = reduce_points(
+            np.concatenate([block[3] for block in group]),
+            np.concatenate([block[5][:, :count] for block in group]),
+            reduction,
+        )
+        if invariants:
+            values = compute_invariants(components_labels, data, invariants)
+            data = np.column_stack([data] + [values[name] for name in invariants])
+        reduced.append((part, key_type, reduction.upper(), labels, points, data))
+    return reduced
+
+
+def _at_integration_points(field_output):
+    """Check if the field output is written at the integration points."""
+    return any(location.position == odbAccess.INTEGRATION_POINT for location in field_output.locations)
+
+
+def _at_nodes(field_output):
+    """Check if the field output is written at the nodes."""
+    return any(location.position == odbAccess.NODAL for location in field_output.locations)
+
+
+def get_regions(odb, regions):
+    """Find the sets of the assembly of the odb to extract the results from.
+
+    Parameters
+    ----------
+    odb : :class:`odbAccess.Odb`
+        The odb.
+    regions : list
+        ``"nset:<name>"`` or ``"elset:<name>"`` of each set. The names are
+        case insensitive.
+
+    Returns
+    -------
+    dict
+        {"nset": [sets], "elset": [sets]}.
+    """
+    sets = {"nset": [], "elset": []}
+    repositories = {"nset": odb.rootAssembly.nodeSets, "elset": odb.rootAssembly.elementSets}
+    for region in regions or []:
+        set_type, _, name = region.partition(":")
+        if set_type not in repositories:
+            raise ValueError("Unknown type of set: {}".format(region))
+        if name.upper() not in repositories[set_type].keys():
+            raise KeyError("The set {} is not in the odb.".format(name))
+        sets[set_type].append(repositories[set_type][name.upper()])
+    return sets
+
+
+def region_subsets(field_output, regions):
+    """Restrict a field output to the regions of its type.
+
+    The nodal field outputs are restricted to the node sets and the element
+    field outputs to the element sets, a field output is not restricted if
+    there is no region of its type.
+
+    Parameters
+    ----------
+    field_output : :class:`odbAccess.FieldOutput`
+        Abaqus field output.
+    regions : dict
+        {"nset": [sets], "elset": [sets]}, see :func:`get_regions`.
+
+    Returns
+    -------
+    list
+        The subsets of the field output.
+    """
+    sets = regions.get("nset" if _at_nodes(field_output) else "elset") if regions else None
+    if not sets:
+        return [field_output]
+    return [field_output.getSubset(region=region) for region in sets]
+
+
+def merge_bulk_blocks(blocks, components_count):
+    """Merge the blocks of the abaqus fields composing a compas field by part.
+
+    The values are identified by their key, integration point and section
+    point. Components missing for a value are set to 0. When a value appears
+    more than once, the last one is kept.
+
+    Parameters
+    ----------
+    blocks : list
+        ``(part, key_type, position, labels, points, data, columns)`` of each
+        block, where `columns` are the ``(abaqus_index, compas_index)`` pairs
+        of the components.
+    components_count : int
+        Number of components of the compas field.
+
+    Yields
+    ------
+    tuple
+        ``(part, key_types, positions, keys, points, values)`` of each part,
+        sorted by key, integration point and section point.
+    """
+    parts = []
+    for block in blocks:
+        if block[0] not in parts:
+            parts.append(block[0])
+    for part in parts:
+        part_blocks = [block for block in blocks if block[0] == part]
+        rows = np.concatenate([np.column_stack((block[3], block[4])) for block in part_blocks])
+        # the rows are sorted by key, integration point and section point (or
+        # node of the element) to find the unique ones
+        order = np.lexsort((rows[:, 2], rows[:, 1], rows[:, 0]))
+        rows = rows[order]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = (rows[1:] != rows[:-1]).any(axis=1)
+        inverse = np.empty(len(rows), dtype=np.int64)
+        inverse[order] = np.cumsum(first) - 1
+        unique = rows[first]
+        values = np.zeros((len(unique), components_count))
+        key_types = np.empty(len(unique), dtype=object)
+        positions = np.empty(len(unique), dtype=object)
+        offset = 0
+        for _, key_type, position, labels, _, data, columns in part_blocks:
+            index = inverse[offset : offset + len(labels)]
+            offset += len(labels)
+            # index of the last occurrence of each value
+            _, last = np.unique(index[::-1], return_index=True)
+            last = len(index) - 1 - last
+            targets = index[last]
+            key_types[targets] = key_type
+            positions[targets] = position
+            for abaqus_index, compas_index in columns:
+                values[targets, compas_index] = data[last, abaqus_index]
+        keys = unique[:, 0]
+        points = unique[:, 1:]
+        yield part, key_types.tolist(), positions.tolist(), keys, points, values
+
+
+# Reductions of the values at the integration points and section points.
+REDUCTIONS = ("mean", "max", "centroid")
+
+
+def odb_fingerprint(path):
+    """Return the fingerprint of an odb file, from its size and modification
+    time.
+
+    Parameters
+    ----------
+    path : str
+        Path to the odb file.
+
+    Returns
+    -------
+    str
+        ``"<size>:<mtime>"``, or an empty string if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return ""
+    stat = os.stat(path)
+    return "{}:{:.6f}".format(stat.st_size, stat.st_mtime)
+
+
+def field_request(
+    name,
+    abaqus_fields,
+    components,
+    invariants=(),
+    frames=None,
+    regions=(),
+    reduction=None,
+    dtype="float64",
+    compression=None,
+):
+    """Return the request of a field in the extraction manifest.
+
+    Parameters
+    ----------
+    name : str
+        Name of the compas field, i.e. of its table.
+    abaqus_fields : list
+        Names of the abaqus field outputs composing the field, e.g.
+        ``["U", "UR"]``.
+    components : list
+        ``[abaqus_component, compas_component]`` of each component.
+    invariants : list, optional
+        ``[abaqus_invariant, compas_invariant]`` of each invariant, see
+        `invariants_dict`. The invariants are those of the first abaqus field.
+    frames : str | list, optional
+        Frames to extract from each step, see :func:`select_frames`. By
+        default only the last frame.
+    regions : list, optional
+        Sets of the assembly the results are restricted to, as
+        ``"nset:<name>"`` or ``"elset:<name>"``, by default the whole model.
+        The nodal results are restricted to the node sets and the element
+        results to the element sets (see :func:`region_subsets`).
+    reduction : str, optional
+        Reduction of the element values at the integration points and section
+        points, by default ``None``, which stores every value with its
+        integration point (`ip`) and section point (`sp`). Either ``"mean"``
+        or ``"max"`` of each component over the points of each element, whose
+        invariants are computed from the reduced components, or
+        ``"centroid"`` for the values interpolated at the centroid by Abaqus.
+    dtype : str, optional
+        Precision of the stored values, ``"float64"`` (default),
+        ``"float32"`` or ``"float16"``.
+    compression : str, optional
+        Compression of the stored values, ``"zlib"``, ``"zstd"`` or
+        ``"lz4"``, by default ``None``. In the SQLite database, the values of
+        the fields with a precision lower than float64 or compressed are
+        packed by block (see :func:`create_packed_field_table`).
+
+    Returns
+    -------
+    dict
+        The request.
+    """
+    if reduction and reduction not in REDUCTIONS:
+        raise ValueError("Unknown reduction: {}".format(reduction))
+    if dtype not in DTYPES:
+        raise ValueError("Unknown dtype: {}".format(dtype))
+    if compression and compression not in COMPRESSIONS:
+        raise ValueError("Unknown compression: {}".format(compression))
+    return {
+        "name": name,
+        "abaqus_fields": list(abaqus_fields),
+        "components": [list(component) for component in components],
+        "invariants": [list(invariant) for invariant in invariants],
+        "frames": frames or "last",
+        "regions": list(regions or []),
+        "reduction": reduction,
+        "dtype": dtype,
+        "compression": compression,
+    }
+
+
+def write_extraction_manifest(path, database_path, database_name, fields, **options):
+    """Write the manifest of an extraction, read by the extraction script.
+
+    The manifest is a JSON file::
+
+        {
+            "version": 1,
+            "database_path": ..., "database_name": ...,
+            "fields": [request],
+            "pragmas": {}, "steps": [...], "output": ..., "format": "db",
+            "append": false
+        }
+
+    with the request of each field (see :func:`field_request`) and the
+    options of :func:`extract_odb_data`.
+
+    Parameters
+    ----------
+    path : str
+        Path to the manifest.
+    database_path : str
+        Folder path containing the analysis .odb file.
+    database_name : str
+        Name of the database.
+    fields : list
+        Requests of the fields.
+    options : dict
+        Options of :func:`extract_odb_data`.
+
+    Returns
+    -------
+    str
+        Path to the manifest.
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "database_path": database_path,
+        "database_name": database_name,
+        "fields": fields,
+    }
+    manifest.update(options)
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    return path
+
+
+def read_extraction_manifest(path):
+    """Read the manifest of an extraction.
+
+    Parameters
+    ----------
+    path : str
+        Path to the manifest, see :func:`write_extraction_manifest`.
+
+    Returns
+    -------
+    dict
+        The arguments of :func:`extract_odb_data`.
+    """
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    if manifest.pop("version", None) != MANIFEST_VERSION:
+        raise ValueError("Unsupported version of the extraction manifest: {}".format(path))
+    # the missing options of the requests take their default value
+    manifest["fields"] = [field_request(**request) for request in manifest["fields"]]
+    if "format" in manifest:
+        manifest["file_format"] = manifest.pop("format")
+    return dict((str(name), value) for name, value in manifest.items())
+
+
+def extract_odb_data(
+    database_path,
+    database_name,
+    fields,
+    pragmas=None,
+    steps=None,
+    output=None,
+    file_format="db",
+    append=False,
+):
     """Extracts data from the .odb file for the requested steps and fields.
 
     Parameters
@@ -212,10 +1159,27 @@ def extract_odb_data(database_path, database_name, field):
         Folder path containing the analysis .odb file.
     database_name : str
         Name of the database.
-    requested_fields : list
-        Data field requests.
-    file_format : str
-        'db', 'json' or 'pkl'
+    fields : list
+        Requests of the fields, see :func:`field_request`.
+    pragmas : dict, optional
+        SQLite pragmas overriding the `DEFAULT_PRAGMAS` during the bulk load.
+    steps : list, optional
+        Indices of the steps to extract, by default all of them.
+    output : str, optional
+        Path to the database, by default `<database_name>-results.db` (or the
+        folder `<database_name>-results` for the ``"npy"`` format) in
+        `database_path`. Used to write the shards of a parallel extraction.
+    file_format : str, optional
+        ``"db"`` (default) for a SQLite database, or ``"npy"`` for a columnar
+        store of `.npy` arrays (see :class:`NpyWriter`).
+    append : bool, optional
+        If ``True``, the existing results are kept and only the (field, step,
+        frame) not extracted yet are added, by default ``False``, which
+        replaces the existing results. The results are extracted again from
+        scratch if the fingerprint of the odb (see :func:`odb_fingerprint`)
+        changed, and the results of a field are replaced if its components,
+        invariants, regions, reduction, dtype or compression changed. Nothing is extracted if the
+        odb and the request did not change since the previous extraction.
 
     Returns
     -------
@@ -225,103 +1189,749 @@ def extract_odb_data(database_path, database_name, field):
     ----
     Developers should consult the official guidelines on how to speed up the
     script: http://130.149.89.49:2080/v2016/books/cmd/default.htm?startat=pt05ch09s05.html
+    The values are read through the `bulkDataBlocks` of the field outputs,
+    which return the labels and the data of each block as arrays.
+    The frames are extracted one at a time, so that the memory used does not
+    depend on the number of frames.
 
     """
+    odb_path = os.path.join(database_path, "{}.odb".format(database_name))
+    writer = WRITERS[file_format]
+    database = output or os.path.join(database_path, "{}-results{}".format(database_name, writer.extension))
+    writer = writer(database, pragmas=pragmas, append=append)
+    fingerprint = odb_fingerprint(odb_path)
+    request = json.dumps({"fields": fields, "steps": steps}, sort_keys=True)
+    if writer.info.get("odb") != fingerprint:
+        # the existing results are out of date
+        writer.clear()
+    elif writer.info.get("request") == request:
+        print("The results are up to date.")
+        writer.close()
+        return
+    writer.info["odb"] = fingerprint
 
-    # create from the field argument, the correspondence table between abaqus results fields and requested compas results fields
-    field_name_comp_abaq = {}
-    field_component_abaq_comp = {}
-    if field:
-        for field_data in field.split("."):
-            field_name_data = field_data.split("-")[0]
-            field_component_data = field_data.split("-")[1]
-            field_name_comp_abaq[field_name_data.split("/")[0]] = field_name_data.split("/")[1].split(",")
-            field_component_abaq_comp[field_name_data.split("/")[0]] = {
-                field_component.split("/")[0]: field_component.split("/")[1]
-                for field_component in field_component_data.split(",")
-            }
+    # initialization of the tables of the compas fields, the options changing
+    # the values are in the description of the field
+    for field in fields:
+        options = ("reduction", "regions", "dtype", "compression")
+        description = json.dumps(dict((name, field[name]) for name in options), sort_keys=True)
+        components_names = [compas_name for _, compas_name in field["components"]]
+        invariants_names = [compas_name for _, compas_name in field["invariants"]]
+        writer.add_field(
+            field["name"], components_names, invariants_names, description, field["dtype"], field["compression"]
+        )
 
     # open the odb file
-    odb = odbAccess.openOdb(os.path.join(database_path, "{}.odb".format(database_name)))
-    steps = odb.steps
-    database = os.path.join(database_path, "{}-results.db".format(database_name))
-    if os.path.exists(database):
-        os.remove(database)
-
-    with create_connection(database) as conn:
-        create_field_description_table(conn)
-        for step_name, step in steps.items():
-            frame = step.frames[-1]  # TODO maybe loop through the frames
-            default_fields = frame.fieldOutputs
-
-            # loop through all the requested compas field
-            for compas_field_name, abaqus_fields_names in field_name_comp_abaq.items():
-                invariants_names = []  # invariants are, for now, not integrated in the table
-
-                # initialization of sql table of compas field
-                insert_field_description(
-                    conn,
-                    compas_field_name,
-                    "",
-                    " ".join(field_component_abaq_comp[compas_field_name].values()),
-                    " ".join(invariants_names),
+    odb = odbAccess.openOdb(odb_path, readOnly=True)
+    regions = [get_regions(odb, field["regions"]) for field in fields]
+    selected_steps = [item for index, item in enumerate(odb.steps.items()) if steps is None or index in steps]
+    for step_name, step in selected_steps:
+        # the frames selected by any of the fields are read once
+        selections = [set(index for index, _ in select_frames(step.frames, field["frames"])) for field in fields]
+        for frame_index in sorted(set().union(*selections)):
+            frame_fields = [
+                (field, field_regions)
+                for field, field_regions, selection in zip(fields, regions, selections)
+                if frame_index in selection and (field["name"], step_name, frame_index) not in writer.extracted
+            ]
+            if frame_fields:
+                extract_frame_data(writer, step_name, frame_index, step.frames[frame_index], frame_fields)
+    # the request is recorded once all its results are written
+    writer.info["request"] = request
+    writer.close()
+
+
+def plan_frame_reads(fields, available):
+    """Plan the reads of the abaqus field outputs of a frame.
+
+    Each abaqus field output is read once for all the compas fields composed
+    of it, with the same regions and the same position (the centroid or the
+    points of the elements).
+
+    Parameters
+    ----------
+    fields : list
+        ``(request, regions)`` of each field, see :func:`extract_frame_data`.
+    available : list
+        Names of the field outputs of the frame.
+
+    Returns
+    -------
+    dict
+        {(abaqus_field, regions, centroid): read} with the `regions` of the
+        read, the `invariants` to read with it (those requested by the fields
+        of which it is the first abaqus field) and its number of `uses`.
+    """
+    reads = {}
+    for field, regions in fields:
+        for index, abaqus_field in enumerate(field["abaqus_fields"]):
+            if abaqus_field not in available:
+                continue
+            key = (abaqus_field, tuple(field["regions"]), field["reduction"] == "centroid")
+            read = reads.setdefault(key, {"regions": regions, "invariants": [], "uses": 0})
+            read["uses"] += 1
+            if index == 0:
+                read["invariants"] += [name for name, _ in field["invariants"] if name not in read["invariants"]]
+    return reads
+
+
+def read_field_output(field_output, regions, centroid, invariants):
+    """Read the values of a field output, restricted to the regions.
+
+    Parameters
+    ----------
+    field_output : :class:`odbAccess.FieldOutput`
+        Abaqus field output.
+    regions : dict
+        Sets of the odb the values are restricted to, see
+        :func:`region_subsets`.
+    centroid : bool
+        If ``True``, the values at the integration points are read at the
+        centroid of the elements.
+    invariants : list
+        Names of the invariants to append to the components.
+
+    Returns
+    -------
+    list
+        ``(part, key_type, position, labels, points, data)`` of each block,
+        see :func:`iter_bulk_blocks`.
+    """
+    blocks = []
+    # the values of the overlapping regions are merged by key
+    for field_subset in region_subsets(field_output, regions):
+        if centroid and _at_integration_points(field_subset):
+            field_subset = field_subset.getSubset(position=odbAccess.CENTROID)
+        blocks.extend(iter_bulk_blocks(field_subset, invariants=invariants))
+    return blocks
+
+
+def extract_frame_data(writer, step_name, frame_index, frame, fields):
+    """Extract the requested fields of a frame and write them.
+
+    The field outputs are read once for all the fields (see
+    :func:`plan_frame_reads`), and the results of all the fields are written
+    in a single batch.
+
+    Parameters
+    ----------
+    writer : :class:`SqliteWriter` | :class:`NpyWriter`
+        Writer of the results.
+    step_name : str
+        Name of the analysis step.
+    frame_index : int
+        Index of the frame in the step.
+    frame : :class:`odbAccess.OdbFrame`
+        The frame.
+    fields : list
+        ``(request, regions)`` of each field, with the request of the field
+        (see :func:`field_request`) and the sets of the odb its results are
+        restricted to (see :func:`get_regions`).
+
+    Returns
+    -------
+    None
+    """
+    default_fields = frame.fieldOutputs
+    reads = plan_frame_reads(fields, list(default_fields.keys()))
+    cache = {}
+
+    batch = []
+    for field, _ in fields:
+        # the data from the different abaqus fields composing the compas field
+        # are merged by part
+        components = dict(field["components"])
+        components_names = [compas_name for _, compas_name in field["components"]]
+        invariants_names = [abaqus_name for abaqus_name, _ in field["invariants"]]
+        reduction = field["reduction"]
+        blocks = []
+        for index, abaqus_field in enumerate(field["abaqus_fields"]):
+            key = (abaqus_field, tuple(field["regions"]), reduction == "centroid")
+            if key not in reads:
+                continue
+            read = reads[key]
+            field_data = default_fields[abaqus_field]
+            if key not in cache:
+                cache[key] = read_field_output(field_data, read["regions"], key[2], read["invariants"])
+            field_blocks = cache[key]
+            # the values are released after their last use
+            read["uses"] -= 1
+            if not read["uses"]:
+                del cache[key]
+            # columns of the abaqus components in the compas field table
+            columns = [
+                (i, components_names.index(components[name]))
+                for i, name in enumerate(field_data.componentLabels)
+                if name in components
+            ]
+            # the invariants follow the components
+            if index == 0:
+                columns += [
+                    (len(field_data.componentLabels) + read["invariants"].index(name), len(components_names) + i)
+                    for i, name in enumerate(invariants_names)
+                ]
+            if reduction in ("mean", "max"):
+                field_blocks = reduce_blocks(field_blocks, reduction, field_data.componentLabels, read["invariants"])
+            for part, key_type, position, labels, points, data in field_blocks:
+                blocks.append((part, key_type, position, labels, points, data, columns))
+        batch.append((field["name"], merge_bulk_blocks(blocks, len(components_names) + len(invariants_names))))
+
+    writer.write_frame(step_name, frame_index, frame.frameValue, batch)
+
+
+class SqliteWriter(object):
+    """Write the results to a SQLite database, with one table per field.
+
+    The results are stored one value per row (see :func:`create_field_table`),
+    or packed by block (see :func:`create_packed_field_table`) for the fields
+    with a precision lower than float64 or compressed.
+
+    Parameters
+    ----------
+    path : str
+        Path to the database.
+    pragmas : dict, optional
+        SQLite pragmas overriding the `DEFAULT_PRAGMAS` during the bulk load.
+    append : bool, optional
+        If ``True``, the results are added to an existing database, by default
+        ``False``, which replaces it.
+
+    Attributes
+    ----------
+    info : dict
+        {property: description} of the `info` table, written when closing.
+    extracted : set
+        ``(field, step, frame)`` already written.
+    """
+
+    extension = ".db"
+
+    def __init__(self, path, pragmas=None, append=False):
+        if os.path.exists(path) and not append:
+            os.remove(path)
+        self.path = path
+        self.pragmas = pragmas
+        self._open()
+
+    def _open(self):
+        options = dict(DEFAULT_PRAGMAS)
+        options.update(self.pragmas or {})
+        self.conn = create_connection(self.path)
+        set_pragmas(self.conn, options)
+        create_info_table(self.conn)
+        create_field_description_table(self.conn)
+        create_dimension_tables(self.conn)
+        create_extracted_table(self.conn)
+        self.fields = [row[0] for row in self.conn.execute("SELECT field FROM fields")]
+        self.info = dict(self.conn.execute("SELECT property, description FROM info"))
+        self.extracted = set(
+            self.conn.execute(
+                "SELECT e.field, steps.name, e.frame FROM extracted AS e JOIN steps ON steps.id = e.step_id"
+            )
+        )
+        self.storage = {}
+        self._ids = {}
+
+    def clear(self):
+        """Remove all the results."""
+        self.conn.close()
+        os.remove(self.path)
+        self._open()
+
+    def add_field(self, field, components_names, invariants_names, description="", dtype="float64", compression=None):
+        self.storage[field] = (dtype, compression)
+        description = (description, " ".join(components_names), " ".join(invariants_names))
+        if field in self.fields:
+            sql = "SELECT description, components, invariants FROM fields WHERE field = ?"
+            if tuple(self.conn.execute(sql, (field,)).fetchone()) == description:
+                return
+            self.remove_field(field)
+        insert_field_description(self.conn, field, *description)
+        if is_packed(dtype, compression):
+            create_packed_field_table(self.conn, field)
+        else:
+            create_field_table(self.conn, field, components_names, invariants_names)
+        self.fields.append(field)
+
+    def remove_field(self, field):
+        """Remove the results of a field."""
+        with self.conn:
+            self.conn.execute("DROP VIEW IF EXISTS {}".format(field))
+            self.conn.execute("DROP TABLE IF EXISTS {}_data".format(field))
+            self.conn.execute("DROP TABLE IF EXISTS {}_blocks".format(field))
+            self.conn.execute("DELETE FROM fields WHERE field = ?", (field,))
+            self.conn.execute("DELETE FROM extracted WHERE field = ?", (field,))
+        self.fields.remove(field)
+        self.extracted = set(item for item in self.extracted if item[0] != field)
+
+    def _id(self, table, **values):
+        key = (table,) + tuple(sorted(values.items()))
+        if key not in self._ids:
+            self._ids[key] = get_dimension_id(self.conn, table, values)
+        return self._ids[key]
+
+    def write(self, field, step, frame, time, parts):
+        """Write the results of a field in a frame, in a single transaction.
+
+        Parameters
+        ----------
+        field : str
+            Name of the compas field.
+        step : str
+            Name of the step.
+        frame : int
+            Index of the frame in the step.
+        time : float
+            Time of the frame.
+        parts : Iterable
+            ``(part, key_types, positions, keys, points, values)`` of each
+            part, see :func:`merge_bulk_blocks`.
+        """
+        self.write_frame(step, frame, time, [(field, parts)])
+
+    def write_frame(self, step, frame, time, fields):
+        """Write the results of several fields in a frame, in a single
+        transaction.
+
+        Parameters
+        ----------
+        step : str
+            Name of the step.
+        frame : int
+            Index of the frame in the step.
+        time : float
+            Time of the frame.
+        fields : Iterable
+            ``(field, parts)`` of each field, see :meth:`write`.
+        """
+        written = []
+        with self.conn:
+            step_id = self._id("steps", name=step)
+            insert_frame(self.conn, step_id, frame, time)
+            for field, parts in fields:
+                self.conn.execute("INSERT OR IGNORE INTO extracted VALUES (?, ?, ?)", (field, step_id, frame))
+                dtype, compression = self.storage[field]
+                if is_packed(dtype, compression):
+                    self._write_packed(field, step_id, frame, parts, dtype, compression)
+                    written.append((field, step, frame))
+                    continue
+                for part, key_types, positions, keys, points, values in parts:
+                    part_id = self._id("parts", name=part)
+                    position_ids = [self._id("positions", type=t, name=p) for t, p in zip(key_types, positions)]
+                    rows = (
+                        [step_id, frame, part_id, key, ip, sp, position_id] + components
+                        for position_id, key, (ip, sp), components in zip(
+                            position_ids, keys.tolist(), points.tolist(), values.tolist()
+                        )
+                    )
+                    insert_field_rows(self.conn, field, rows)
+                written.append((field, step, frame))
+        self.extracted.update(written)
+
+    def _write_packed(self, field, step_id, frame, parts, dtype, compression):
+        """Write the results of a field in a frame as packed blocks."""
+        for part, key_types, positions, keys, points, values in parts:
+            part_id = self._id("parts", name=part)
+            for (key_type, position), rows in group_rows(key_types, positions):
+                block_points = points[rows]
+                self.conn.execute(
+                    "INSERT INTO {}_blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?)".format(field),
+                    (
+                        step_id,
+                        frame,
+                        part_id,
+                        self._id("positions", type=key_type, name=position),
+                        len(block_points),
+                        sqlite3.Binary(pack_array(keys[rows], compression)),
+                        sqlite3.Binary(pack_array(block_points, compression)) if block_points.any() else None,
+                        sqlite3.Binary(pack_array(values[rows].astype(dtype), compression)),
+                    ),
                 )
-                create_field_table(
-                    conn,
-                    compas_field_name,
-                    list(field_component_abaq_comp[compas_field_name].values()),
-                    invariants_names,
+
+    def close(self):
+        sql = "SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?"
+        for field in self.fields:
+            if self.conn.execute(sql, (field + "_data",)).fetchone():
+                create_field_indexes(self.conn, field)
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO info VALUES (?, ?)", sorted(self.info.items()))
+        self.conn.close()
+
+
+class NpyWriter(object):
+    """Write the results to a columnar store.
+
+    The store is a folder with one `.npy` array per component of each block of
+    results, i.e. of each field, step, frame, part, key type and position, and
+    a `manifest.json` describing the fields and the blocks::
+
+        {
+            "version": 1,
+            "fields": {
+                field: {"components": [...], "invariants": [...], "description",
+                        "dtype", "compression"}
+            },
+            "blocks": [
+                {"field", "step", "frame", "time", "part", "type", "position",
+                 "rows", "path"}
+            ],
+            "extracted": [[field, step, frame]],
+            "info": {property: description}
+        }
+
+    The arrays of a block are `keys.npy` and `<component>.npy` in the folder
+    `path` of the block, plus `ip.npy` and `sp.npy` with the integration
+    point and section point of each row if any of them is defined. They can
+    be memory-mapped with ``numpy.load(path, mmap_mode="r")``. The components
+    are stored with the `dtype` of the field. The arrays of the compressed
+    fields are `<name>.npy.<compression>` files, see :func:`load_store_array`.
+
+    Parameters
+    ----------
+    path : str
+        Path to the folder of the store.
+    append : bool, optional
+        If ``True``, the results are added to an existing store, by default
+        ``False``, which replaces it.
+
+    Attributes
+    ----------
+    info : dict
+        {property: description} of the store, written when closing.
+    extracted : set
+        ``(field, step, frame)`` already written.
+    """
+
+    extension = ""
+
+    def __init__(self, path, append=False, **kwargs):
+        self.path = path
+        if append and os.path.exists(os.path.join(path, "manifest.json")):
+            manifest = read_store_manifest(path)
+            self.fields = manifest["fields"]
+            self.blocks = manifest["blocks"]
+            self.info = manifest["info"]
+            self.extracted = set(tuple(item) for item in manifest["extracted"])
+            # index of the next block, the paths of the existing blocks are kept
+            self._count = 1 + max([int(block["path"].split("/")[-1]) for block in self.blocks] or [-1])
+        else:
+            self.clear()
+
+    def clear(self):
+        """Remove all the results."""
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+        os.makedirs(self.path)
+        self.fields = {}
+        self.blocks = []
+        self.info = {}
+        self.extracted = set()
+        self._count = 0
+
+    def add_field(self, field, components_names, invariants_names, description="", dtype="float64", compression=None):
+        description = {
+            "components": list(components_names),
+            "invariants": list(invariants_names),
+            "description": description,
+            "dtype": dtype,
+            "compression": compression,
+        }
+        if self.fields.get(field, description) != description:
+            self.remove_field(field)
+        self.fields[field] = description
+
+    def remove_field(self, field):
+        """Remove the results of a field."""
+        if os.path.exists(os.path.join(self.path, field)):
+            shutil.rmtree(os.path.join(self.path, field))
+        del self.fields[field]
+        self.blocks = [block for block in self.blocks if block["field"] != field]
+        self.extracted = set(item for item in self.extracted if item[0] != field)
+
+    def write(self, field, step, frame, time, parts):
+        """Write the results of a field in a frame.
+
+        Parameters
+        ----------
+        field : str
+            Name of the compas field.
+        step : str
+            Name of the step.
+        frame : int
+            Index of the frame in the step.
+        time : float
+            Time of the frame.
+        parts : Iterable
+            ``(part, key_types, positions, keys, points, values)`` of each
+            part, see :func:`merge_bulk_blocks`.
+        """
+        names = self.fields[field]["components"] + self.fields[field]["invariants"]
+        dtype, compression = self.fields[field]["dtype"], self.fields[field]["compression"]
+        for part, key_types, positions, keys, points, values in parts:
+            # the rows with the same key type and position form a block
+            for (key_type, position), rows in group_rows(key_types, positions):
+                block = {
+                    "field": field,
+                    "step": step,
+                    "frame": frame,
+                    "time": time,
+                    "part": part,
+                    "type": key_type,
+                    "position": position,
+                    "rows": len(keys[rows]),
+                    "path": "{}/{}".format(field, self._count),
+                }
+                self._save(block["path"], "keys", keys[rows], compression)
+                if points[rows].any():
+                    self._save(block["path"], "ip", points[rows, 0], compression)
+                    self._save(block["path"], "sp", points[rows, 1], compression)
+                for i, name in enumerate(names):
+                    self._save(block["path"], name, values[rows, i].astype(dtype), compression)
+                self.blocks.append(block)
+                self._count += 1
+        self.extracted.add((field, step, frame))
+
+    def write_frame(self, step, frame, time, fields):
+        """Write the results of several fields in a frame.
+
+        Parameters
+        ----------
+        step : str
+            Name of the step.
+        frame : int
+            Index of the frame in the step.
+        time : float
+            Time of the frame.
+        fields : Iterable
+            ``(field, parts)`` of each field, see :meth:`write`.
+        """
+        for field, parts in fields:
+            self.write(field, step, frame, time, parts)
+
+    def _save(self, path, name, array, compression=None):
+        folder = os.path.join(self.path, path)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        if compression:
+            with open(os.path.join(folder, "{}.npy.{}".format(name, compression)), "wb") as f:
+                f.write(pack_array(array, compression))
+        else:
+            np.save(os.path.join(folder, name + ".npy"), np.ascontiguousarray(array))
+
+    def close(self):
+        write_store_manifest(self.path, self.fields, self.blocks, self.extracted, self.info)
+
+
+def write_store_manifest(path, fields, blocks, extracted=(), info=None):
+    """Write the manifest of a columnar store.
+
+    Parameters
+    ----------
+    path : str
+        Path to the folder of the store.
+    fields : dict
+        {field: {"components": [...], "invariants": [...], "description": str}}.
+    blocks : list
+        Description of each block, see :class:`NpyWriter`.
+    extracted : Iterable, optional
+        ``(field, step, frame)`` written to the store.
+    info : dict, optional
+        {property: description} of the store.
+
+    Returns
+    -------
+    None
+    """
+    manifest = {
+        "version": STORE_VERSION,
+        "fields": fields,
+        "blocks": blocks,
+        "extracted": sorted(list(item) for item in extracted),
+        "info": info or {},
+    }
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+
+def read_store_manifest(path):
+    """Read the manifest of a columnar store.
+
+    Parameters
+    ----------
+    path : str
+        Path to the folder of the store.
+
+    Returns
+    -------
+    dict
+        The manifest, see :class:`NpyWriter`.
+    """
+    with open(os.path.join(path, "manifest.json"), "r") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != STORE_VERSION:
+        raise ValueError("Unsupported version of the results store: {}".format(manifest.get("version")))
+    manifest.setdefault("extracted", [])
+    manifest.setdefault("info", {})
+    return manifest
+
+
+def load_store_array(path, block, name, compression=None, mmap_mode=None):
+    """Load an array of a block of a columnar store.
+
+    Parameters
+    ----------
+    path : str
+        Path to the folder of the store.
+    block : dict
+        Description of the block, see :class:`NpyWriter`.
+    name : str
+        Name of the array, i.e. ``"keys"``, ``"ip"``, ``"sp"`` or the name of
+        a component or of an invariant.
+    compression : str, optional
+        Compression of the arrays of the field of the block.
+    mmap_mode : str, optional
+        Memory-mapping mode of the uncompressed arrays, e.g. ``"r"``, see
+        :func:`numpy.load`.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The array, or ``None`` if the block does not have it.
+    """
+    file_path = os.path.join(path, block["path"], name + ".npy")
+    if compression:
+        file_path += "." + compression
+    if not os.path.exists(file_path):
+        return None
+    if compression:
+        with open(file_path, "rb") as f:
+            return unpack_array(f.read(), compression)
+    return np.load(file_path, mmap_mode=mmap_mode)
+
+
+def merge_databases(database, shards, pragmas=None):
+    """Merge the shard databases written by parallel extractions.
+
+    The shards are merged in the given order and then deleted. The ids of the
+    steps, parts and positions of each shard are mapped to the ones of the
+    merged database.
+
+    Parameters
+    ----------
+    database : str
+        Path to the merged database. An existing database is replaced.
+    shards : list
+        Paths to the shard databases. Missing shards are skipped.
+    pragmas : dict, optional
+        SQLite pragmas overriding the `DEFAULT_PRAGMAS` during the merge.
+
+    Returns
+    -------
+    None
+    """
+    writer = SqliteWriter(database, pragmas=pragmas)
+    conn = writer.conn
+    for shard in shards:
+        if not os.path.exists(shard):
+            continue
+        conn.execute("ATTACH DATABASE ? AS shard", (shard,))
+        fields = conn.execute("SELECT field, description, components, invariants FROM shard.fields").fetchall()
+        for field, description, components, invariants in fields:
+            if field not in writer.fields:
+                storage = field_storage(description)
+                writer.add_field(field, components.split(), invariants.split(), description, *storage)
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO steps (name) SELECT name FROM shard.steps ORDER BY id")
+            conn.execute("INSERT OR IGNORE INTO parts (name) SELECT name FROM shard.parts ORDER BY id")
+            conn.execute(
+                "INSERT OR IGNORE INTO positions (type, name) SELECT type, name FROM shard.positions ORDER BY id"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO frames SELECT steps.id, f.frame, f.time FROM shard.frames AS f "
+                "JOIN shard.steps AS s ON s.id = f.step_id JOIN steps ON steps.name = s.name"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO extracted SELECT e.field, steps.id, e.frame FROM shard.extracted AS e "
+                "JOIN shard.steps AS s ON s.id = e.step_id JOIN steps ON steps.name = s.name"
+            )
+            # the requests of the shards are not those of the merged database
+            info = conn.execute("SELECT property, description FROM shard.info WHERE property != 'request'")
+            writer.info.update(dict(info))
+            for field, description, components, invariants in fields:
+                if is_packed(*field_storage(description)):
+                    conn.execute(
+                        "INSERT INTO {0}_blocks SELECT steps.id, b.frame, parts.id, positions.id, b.rows, b.keys, "
+                        "b.points, b.data FROM shard.{0}_blocks AS b "
+                        "JOIN shard.steps AS s ON s.id = b.step_id JOIN steps ON steps.name = s.name "
+                        "JOIN shard.parts AS p ON p.id = b.part_id JOIN parts ON parts.name = p.name "
+                        "JOIN shard.positions AS o ON o.id = b.position_id "
+                        "JOIN positions ON positions.type = o.type AND positions.name = o.name".format(field)
+                    )
+                    continue
+                conn.execute(
+                    "INSERT INTO {0}_data SELECT steps.id, d.frame, parts.id, d.key, d.ip, d.sp, positions.id, {1} "
+                    "FROM shard.{0}_data AS d "
+                    "JOIN shard.steps AS s ON s.id = d.step_id JOIN steps ON steps.name = s.name "
+                    "JOIN shard.parts AS p ON p.id = d.part_id JOIN parts ON parts.name = p.name "
+                    "JOIN shard.positions AS o ON o.id = d.position_id "
+                    "JOIN positions ON positions.type = o.type AND positions.name = o.name".format(
+                        field, ", ".join("d." + name for name in (components + " " + invariants).split())
+                    )
                 )
+        conn.execute("DETACH DATABASE shard")
+        os.remove(shard)
+    writer.close()
 
-                # the data from the different abaqus fields composing the compas field
-                # are assembled in a dictionnary
-                component_data_dict = {}
-                for abaqus_field in abaqus_fields_names:
-                    field_data = default_fields[abaqus_field]
-                    abaqus_components_names = list(field_data.componentLabels)
-                    field_data_values = field_data.values
-                    for value in field_data_values:
-                        if getattr(value, "nodeLabel"):
-                            key = value.nodeLabel
-                            key_type = "node"
-                        elif getattr(value, "elementLabel"):
-                            key = value.elementLabel
-                            key_type = "element"
-                        else:
-                            raise AttributeError()
-                        position = value.position.name
-                        part = value.instance.name[:-2]
-                        if part not in component_data_dict.keys():
-                            component_data_dict[part] = {}
-                        if key not in component_data_dict[part].keys():
-                            component_data_dict[part][key] = {
-                                component: 0 for component in field_component_abaq_comp[compas_field_name].values()
-                            }
-                        component_data_dict[part][key]["key_type"] = key_type
-                        for i in range(len(abaqus_components_names)):
-                            abaqus_component_name = abaqus_components_names[i]
-                            compas_component_name = field_component_abaq_comp[compas_field_name][abaqus_component_name]
-                            component_value = value.data[i]
-                            component_data_dict[part][key][compas_component_name] = component_value
-
-                # results are inserted in the sql table
-                for part, key_data in component_data_dict.items():
-                    for key, component_data in key_data.items():
-                        insert_field_results(
-                            conn,
-                            compas_field_name,
-                            [
-                                component_data_dict[part][key][component]
-                                for component in field_component_abaq_comp[compas_field_name].values()
-                            ],
-                            [],
-                            step_name,
-                            part,
-                            component_data["key_type"],
-                            position,
-                            key,
-                        )
-        conn.commit()
+
+def merge_stores(path, shards):
+    """Merge the columnar stores written by parallel extractions.
+
+    The blocks of the shards are moved in the given order, then the shards
+    are deleted.
+
+    Parameters
+    ----------
+    path : str
+        Path to the folder of the merged store. An existing store is replaced.
+    shards : list
+        Paths to the folders of the shard stores. Missing shards are skipped.
+
+    Returns
+    -------
+    None
+    """
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    fields = {}
+    blocks = []
+    extracted = set()
+    info = {}
+    for shard in shards:
+        if not os.path.exists(shard):
+            continue
+        manifest = read_store_manifest(shard)
+        fields.update(manifest["fields"])
+        extracted.update(tuple(item) for item in manifest["extracted"])
+        # the requests of the shards are not those of the merged store
+        info.update((name, value) for name, value in manifest["info"].items() if name != "request")
+        for block in manifest["blocks"]:
+            source = os.path.join(shard, block["path"])
+            block["path"] = "{}/{}".format(block["field"], len(blocks))
+            target = os.path.join(path, block["path"])
+            if not os.path.exists(os.path.dirname(target)):
+                os.makedirs(os.path.dirname(target))
+            os.rename(source, target)
+            blocks.append(block)
+        shutil.rmtree(shard)
+    write_store_manifest(path, fields, blocks, extracted, info)
+
+
+# Writers of the results for each file format.
+WRITERS = {
+    "db": SqliteWriter,
+    "npy": NpyWriter,
+}
 
 
 # ============================================================================
@@ -330,12 +1940,6 @@ def extract_odb_data(database_path, database_name, field):
 # NOTE: this is used while calling the module through abaqus -> !!!DO NOT DELETE!!!
 # NOTE: must be compatible with python 2+.
 if __name__ == "__main__":
-    # NOTE: the arguments are in the order they are passed
-    database_path = sys.argv[-2]
-    database_name = sys.argv[-1]
-    if len(sys.argv) > 3:
-        field_input = sys.argv[-3]
-    else:
-        field_input = None
-
-    extract_odb_data(database_path=database_path, database_name=database_name, field=field_input)
+    # NOTE: the only argument is the path to the extraction manifest, see
+    # `write_extraction_manifest`
+    extract_odb_data(**read_extraction_manifest(sys.argv[-1]))
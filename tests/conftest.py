@@ -0,0 +1,20 @@
+import pytest
+
+import fake_odb
+from compas_fea2_abaqus.results import results_to_sql
+
+
+@pytest.fixture
+def odb(monkeypatch):
+    """Small synthetic odb, returned by `odbAccess.openOdb` during the test."""
+    odb = fake_odb.build(nodes=6, elements=3, integration_points=2, parts=2, steps=2, frames=3)
+    monkeypatch.setattr(fake_odb, "ODB", odb)
+    monkeypatch.setattr(results_to_sql, "odbAccess", fake_odb, raising=False)
+    return odb
+
+
+@pytest.fixture
+def odb_folder(tmp_path, odb):
+    """Folder of the analysis, with the `job.odb` file of the synthetic odb."""
+    (tmp_path / "job.odb").write_bytes(b"odb")
+    return tmp_path
@@ -0,0 +1,341 @@
+"""Pure Python stand-in for the slice of the `odbAccess` API used by
+:mod:`compas_fea2_abaqus.results.results_to_sql`.
+
+The odb is backed by synthetic NumPy data of configurable size, so that the
+extraction can be run and profiled without Abaqus. The data of the field
+outputs is generated when it is accessed, from a seed depending on the step,
+the frame and the field, so that only the frames being read are in memory.
+
+The odb has one instance per part, with a nodal displacement field `U`, a
+stress field `S` at the integration points of the elements and a field of the
+nodal forces of the elements `NFORC` at the nodes of the elements, where each
+element connects two consecutive nodes.
+
+Usage
+-----
+::
+
+    import sys
+    import fake_odb
+
+    sys.modules["odbAccess"] = fake_odb
+    fake_odb.ODB = fake_odb.build(nodes=100000, elements=25000)
+
+    from compas_fea2_abaqus.results import results_to_sql
+
+The odb is returned by :func:`openOdb` whatever the path. In the tests, the
+`odb` fixture (see ``conftest.py``) does the same for a small odb.
+"""
+
+import numpy as np
+
+
+class SymbolicConstant(object):
+    """Symbolic constant, compared by name."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+    def __eq__(self, other):
+        return getattr(other, "name", other) == self.name
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.name)
+
+
+NODAL = SymbolicConstant("NODAL")
+INTEGRATION_POINT = SymbolicConstant("INTEGRATION_POINT")
+CENTROID = SymbolicConstant("CENTROID")
+ELEMENT_NODAL = SymbolicConstant("ELEMENT_NODAL")
+
+
+class OdbInstance(object):
+    def __init__(self, name, nodes, elements):
+        self.name = name
+        self.nodes = nodes
+        self.elements = elements
+
+
+class OdbSet(object):
+    """Set of the assembly.
+
+    Parameters
+    ----------
+    name : str
+        Name of the set.
+    labels : dict
+        {instance name: (N,) labels} of the nodes or of the elements of the
+        set.
+    """
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+
+class SectionPoint(object):
+    def __init__(self, number):
+        self.number = number
+
+
+class FieldLocation(object):
+    def __init__(self, position):
+        self.position = position
+
+
+class FieldBulkData(object):
+    """Block of values of a field output, with the values of an instance at a
+    given position. The blocks at the nodes of the elements have both the
+    labels of the elements and of the nodes."""
+
+    def __init__(
+        self, instance, position, labels, data, integration_points=None, section_point=None, node_labels=None
+    ):
+        self.instance = instance
+        self.position = position
+        nodal = position == NODAL
+        self.nodeLabels = labels if nodal else node_labels
+        self.elementLabels = None if nodal else labels
+        self.integrationPoints = integration_points
+        self.sectionPoint = SectionPoint(section_point) if section_point else None
+        self.data = data
+
+    def subset(self, mask):
+        return FieldBulkData(
+            self.instance,
+            self.position,
+            (self.nodeLabels if self.position == NODAL else self.elementLabels)[mask],
+            self.data[mask],
+            self.integrationPoints[mask] if self.integrationPoints is not None else None,
+            self.sectionPoint.number if self.sectionPoint else None,
+            self.nodeLabels[mask] if self.position != NODAL and self.nodeLabels is not None else None,
+        )
+
+
+class FieldValue(object):
+    def __init__(self, block, index):
+        self.instance = block.instance
+        self.position = block.position
+        self.nodeLabel = int(block.nodeLabels[index]) if block.nodeLabels is not None else None
+        self.elementLabel = int(block.elementLabels[index]) if block.elementLabels is not None else None
+        self.integrationPoint = int(block.integrationPoints[index]) if block.integrationPoints is not None else None
+        self.sectionPoint = block.sectionPoint
+        self.data = tuple(float(value) for value in block.data[index])
+
+
+class FieldOutput(object):
+    """Field output of a frame.
+
+    Parameters
+    ----------
+    name : str
+        Name of the field output, e.g. ``"U"``.
+    components : list
+        Labels of the components.
+    blocks : callable
+        Function returning the bulk data blocks, called at each access.
+    positions : list
+        Positions of the values.
+    invariants : list, optional
+        Valid invariants.
+    """
+
+    def __init__(self, name, components, blocks, positions, invariants=()):
+        self.name = name
+        self.componentLabels = tuple(components)
+        self.validInvariants = tuple(invariants)
+        self.locations = [FieldLocation(position) for position in positions]
+        self._blocks = blocks
+
+    @property
+    def bulkDataBlocks(self):
+        return self._blocks()
+
+    @property
+    def values(self):
+        return [FieldValue(block, index) for block in self.bulkDataBlocks for index in range(len(block.data))]
+
+    def getSubset(self, region=None, position=None, **kwargs):
+        blocks = self._blocks
+        positions = [location.position for location in self.locations]
+        if region is not None:
+            blocks = _region_blocks(blocks, region)
+        if position == CENTROID:
+            blocks = _centroid_blocks(blocks)
+            positions = [CENTROID]
+        elif position is not None:
+            blocks = _position_blocks(blocks, position)
+            positions = [position]
+        return FieldOutput(self.name, self.componentLabels, blocks, positions, self.validInvariants)
+
+
+def _region_blocks(blocks, region):
+    def subset():
+        result = []
+        for block in blocks():
+            labels = region.labels.get(block.instance.name)
+            if labels is None:
+                continue
+            block_labels = block.nodeLabels if block.position == NODAL else block.elementLabels
+            result.append(block.subset(np.isin(block_labels, labels)))
+        return result
+
+    return subset
+
+
+def _position_blocks(blocks, position):
+    return lambda: [block for block in blocks() if block.position == position]
+
+
+def _centroid_blocks(blocks):
+    def centroid():
+        result = []
+        for block in blocks():
+            if block.position != INTEGRATION_POINT:
+                result.append(block)
+                continue
+            labels, inverse = np.unique(block.elementLabels, return_inverse=True)
+            data = np.zeros((len(labels), block.data.shape[1]))
+            np.add.at(data, inverse, block.data)
+            data /= np.bincount(inverse)[:, None]
+            result.append(FieldBulkData(block.instance, CENTROID, labels, data.astype(block.data.dtype)))
+        return result
+
+    return centroid
+
+
+class OdbFrame(object):
+    def __init__(self, frame_id, frame_value, field_outputs):
+        self.frameId = frame_id
+        self.incrementNumber = frame_id
+        self.frameValue = frame_value
+        self.fieldOutputs = field_outputs
+
+
+class OdbStep(object):
+    def __init__(self, name, frames):
+        self.name = name
+        self.frames = frames
+
+
+class OdbAssembly(object):
+    def __init__(self, instances):
+        self.instances = instances
+        self.nodeSets = {}
+        self.elementSets = {}
+
+
+class Odb(object):
+    def __init__(self, steps, instances):
+        self.steps = steps
+        self.rootAssembly = OdbAssembly(instances)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _frame_fields(instances, integration_points, seed):
+    """Return the field outputs of a frame, generated at each access."""
+
+    def displacements():
+        rng = np.random.default_rng(seed)
+        return [
+            FieldBulkData(instance, NODAL, instance.nodes, rng.random((len(instance.nodes), 3), dtype=np.float32))
+            for instance in instances
+        ]
+
+    def stresses():
+        rng = np.random.default_rng(seed + 1)
+        blocks = []
+        for instance in instances:
+            labels = np.repeat(instance.elements, integration_points)
+            points = np.tile(np.arange(1, integration_points + 1, dtype=np.int32), len(instance.elements))
+            data = rng.random((len(labels), 6), dtype=np.float32)
+            blocks.append(FieldBulkData(instance, INTEGRATION_POINT, labels, data, points))
+        return blocks
+
+    def nodal_forces():
+        rng = np.random.default_rng(seed + 2)
+        blocks = []
+        for instance in instances:
+            labels = np.repeat(instance.elements, 2)
+            # the element i connects the nodes i and i + 1
+            first = np.arange(len(instance.elements)) % len(instance.nodes)
+            nodes = instance.nodes[np.column_stack((first, (first + 1) % len(instance.nodes))).ravel()]
+            data = rng.random((len(labels), 3), dtype=np.float32)
+            blocks.append(FieldBulkData(instance, ELEMENT_NODAL, labels, data, node_labels=nodes))
+        return blocks
+
+    return {
+        "U": FieldOutput("U", ["U1", "U2", "U3"], displacements, [NODAL], ["MAGNITUDE"]),
+        "S": FieldOutput(
+            "S",
+            ["S11", "S22", "S33", "S12", "S13", "S23"],
+            stresses,
+            [INTEGRATION_POINT],
+            ["MISES", "MAX_PRINCIPAL", "MID_PRINCIPAL", "MIN_PRINCIPAL", "TRESCA", "PRESS"],
+        ),
+        "NFORC": FieldOutput("NFORC", ["NFORC1", "NFORC2", "NFORC3"], nodal_forces, [ELEMENT_NODAL]),
+    }
+
+
+def build(nodes=1000, elements=250, integration_points=4, parts=2, steps=1, frames=1, seed=0):
+    """Build a synthetic odb.
+
+    Parameters
+    ----------
+    nodes : int, optional
+        Number of nodes of each part.
+    elements : int, optional
+        Number of elements of each part.
+    integration_points : int, optional
+        Number of integration points of each element.
+    parts : int, optional
+        Number of parts, each one with its instance.
+    steps : int, optional
+        Number of steps.
+    frames : int, optional
+        Number of frames of each step.
+    seed : int, optional
+        Seed of the random values.
+
+    Returns
+    -------
+    :class:`Odb`
+        The odb, with ``nodes + elements * integration_points`` values per
+        part in each frame.
+    """
+    instances = {}
+    for index in range(parts):
+        name = "PART{}-1".format(index)
+        node_labels = np.arange(1, nodes + 1, dtype=np.int32) + index * nodes
+        element_labels = np.arange(1, elements + 1, dtype=np.int32) + index * elements
+        instances[name] = OdbInstance(name, node_labels, element_labels)
+    odb_steps = {}
+    for step in range(steps):
+        name = "Step-{}".format(step + 1)
+        odb_frames = []
+        for frame in range(frames):
+            fields = _frame_fields(list(instances.values()), integration_points, seed + 3 * (step * frames + frame))
+            odb_frames.append(OdbFrame(frame, float(frame + 1) / frames, fields))
+        odb_steps[name] = OdbStep(name, odb_frames)
+    return Odb(odb_steps, instances)
+
+
+# Odb returned by `openOdb`.
+ODB = None
+
+
+def openOdb(path, readOnly=True, **kwargs):
+    """Return the synthetic odb, whatever the path."""
+    global ODB
+    if ODB is None:
+        ODB = build()
+    return ODB
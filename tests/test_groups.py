@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from compas_fea2_abaqus.model import groups
+
+
+class Part:
+    def __init__(self, name):
+        self.name = name
+
+
+def make_group(members, name="supports", set_type="nset"):
+    return SimpleNamespace(name=name, _set_type=set_type, _members=members)
+
+
+def make_members(part, keys):
+    return [SimpleNamespace(part=part, key=key) for key in keys]
+
+
+def test_split_ranges():
+    ranges, isolated = groups._split_ranges([10, 1, 2, 3, 4, 7, 8, 12, 13, 14, 3])
+    assert ranges.tolist() == [[1, 4], [12, 14]]
+    assert isolated.tolist() == [7, 8, 10]
+
+
+def test_part_level_set():
+    group = make_group(make_members(None, [5, 1, 2, 3, 10]))
+    assert groups.jobdata(group, False).split("\n") == [
+        "*nset, nset=supports",
+        "5, 10",
+        "*nset, nset=supports, generate",
+        "1, 3, 1",
+    ]
+
+
+def test_instance_level_set_partitions_by_part():
+    beam, column = Part("beam"), Part("column")
+    members = make_members(column, [4]) + make_members(beam, [2, 1]) + make_members(column, [8])
+    group = make_group(members, name="top", set_type="elset")
+    assert groups.jobdata(group, True).split("\n") == [
+        "*elset, elset=top_i, instance=beam-1",
+        "1, 2",
+        "*elset, elset=top_i, instance=column-1",
+        "4, 8",
+    ]
+
+
+def test_partition_follows_direct_changes_of_the_members():
+    part = Part("beam")
+    group = make_group(make_members(part, [1, 2]))
+    before = groups._fingerprint(group)
+    assert [m.key for m in groups._partition(group)[part]] == [1, 2]
+    # members changed without going through the group methods
+    group._members.pop()
+    group._members.append(SimpleNamespace(part=part, key=3))
+    assert [m.key for m in groups._partition(group)[part]] == [1, 3]
+    assert groups._fingerprint(group) != before
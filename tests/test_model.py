@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+from compas_fea2.model import RigidPart
+
+from compas_fea2_abaqus.model.model import AbaqusModel
+
+
+class FakeRigidPart(RigidPart):
+    """Rigid part recording the groups added to it."""
+
+    name = "plate"
+
+    def __init__(self, groups):
+        self._test_groups = list(groups)
+        self.added = []
+
+    @property
+    def groups(self):
+        return self._test_groups
+
+    def add_group(self, group):
+        self.added.append(group)
+        self._test_groups.append(group)
+        return group
+
+
+def test_rigid_part_groups_are_added_once():
+    groups = [SimpleNamespace(name="all_elements_plate"), SimpleNamespace(name="ref_point_plate")]
+    part = FakeRigidPart(groups)
+    AbaqusModel._add_rigid_part_groups(None, part)
+    AbaqusModel._add_rigid_part_groups(None, part)
+    assert part.added == []
+    assert [group.name for group in part.groups] == ["all_elements_plate", "ref_point_plate"]
@@ -0,0 +1,34 @@
+import pytest
+
+from compas_fea2_abaqus.model.nodes import coordinates_format
+from compas_fea2_abaqus.model.nodes import iter_nodes_jobdata
+
+
+@pytest.mark.parametrize("policy", ["fixed", "general", "repr", "%.6f", "%12.4E", "%-10.3g", "%+.8e", "%F"])
+def test_coordinates_format_accepts_float_formats(policy):
+    assert coordinates_format(policy) % 1.5
+
+
+@pytest.mark.parametrize("policy", ["%d", "%10d", "%s", "%i", "%x", "%.3f, %.3f", "x%.3f", "%%", "", "exact", 3])
+def test_coordinates_format_rejects_other_formats(policy):
+    with pytest.raises(ValueError):
+        coordinates_format(policy)
+
+
+def test_iter_nodes_jobdata_fixed():
+    lines = "\n".join(iter_nodes_jobdata([1, 2], [[0.0, 1.0, 2.0], [3.5, -4.25, 1e-4]])).split("\n")
+    assert lines == [
+        "         1,      0.000,      1.000,      2.000",
+        "         2,      3.500,     -4.250,      0.000",
+    ]
+
+
+def test_iter_nodes_jobdata_repr_is_lossless():
+    xyz = [[0.1, 1 / 3, -2.0e-17]]
+    line = next(iter_nodes_jobdata([7], xyz, policy="repr"))
+    assert [float(value) for value in line.split(",")[1:]] == xyz[0]
+
+
+def test_iter_nodes_jobdata_chunks():
+    chunks = list(iter_nodes_jobdata(range(1, 6), [[0.0, 0.0, 0.0]] * 5, chunk_size=2))
+    assert [len(chunk.split("\n")) for chunk in chunks] == [2, 2, 1]
@@ -0,0 +1,189 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from compas_fea2_abaqus.model import parts
+from compas_fea2_abaqus.model.elements import _jobdata
+
+
+class Section:
+    name = "steel"
+
+    def jobdata(self, elset_name, orientation=None):
+        return f"*Solid Section, elset={elset_name}, material=steel"
+
+
+class Element:
+    """Element writing its connectivity, as most of the Abaqus elements."""
+
+    ndim = 3
+    _orientation = None
+
+    def __init__(self, key, nodes, implementation="C3D4", section=None):
+        self.key = key
+        self.nodes = nodes
+        self._implementation = implementation
+        self.section = section
+
+    @property
+    def jobdata(self):
+        return _jobdata(self)
+
+
+class UnsupportedElement(Element):
+    @property
+    def jobdata(self):
+        raise NotImplementedError
+
+
+class MassElement(Element):
+    @property
+    def jobdata(self):
+        return f"*ELEMENT, TYPE=MASS, ELSET=m{self.key}\nm{self.key}, {self.nodes[0].key}"
+
+
+def make_part(name="beam", model=None, elements=()):
+    nodes = [
+        SimpleNamespace(key=2, xyz=[1.0, 0.0, 0.0]),
+        SimpleNamespace(key=1, xyz=[0.0, 0.0, 0.0]),
+    ]
+    part = SimpleNamespace(
+        name=name,
+        model=model,
+        nodes=nodes,
+        elements=list(elements),
+        groups=[],
+        releases_fields=None,
+    )
+    part._group_elements = lambda: parts._group_elements(part)
+    part._iter_blocks = lambda: parts._iter_blocks(part)
+    return part
+
+
+def test_nodes_section_without_model():
+    assert parts._generate_nodes_section(make_part()).split("\n") == [
+        "*Node",
+        "         1,      0.000,      0.000,      0.000",
+        "         2,      1.000,      0.000,      0.000",
+    ]
+
+
+def test_nodes_section_uses_model_float_format():
+    part = make_part(model=SimpleNamespace(float_format="%.2e"))
+    assert parts._generate_nodes_section(part).split("\n")[1] == "         1, 0.00e+00, 0.00e+00, 0.00e+00"
+
+
+def test_write_include(tmp_path):
+    part = make_part()
+    file_path = parts._write_include(part, str(tmp_path))
+    with open(file_path) as f:
+        content = f.read()
+    assert content == parts.jobdata(part) + "\n"
+    assert content.startswith("**\n*Part, name=beam\n")
+    # the file is named after the fingerprint of the part, and reused
+    assert parts._write_include(part, str(tmp_path)) == file_path
+    part.nodes[0].xyz = [2.0, 0.0, 0.0]
+    assert parts._write_include(part, str(tmp_path)) != file_path
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_parts_renderer(tmp_path):
+    beams = [make_part(f"beam{i}") for i in range(3)]
+    with parts.PartsRenderer(workers=2) as renderer:
+        folder = renderer.folder
+        tasks = [renderer.schedule(part) for part in beams]
+        include = renderer.schedule(beams[0], str(tmp_path / "beam0.inp"), end="\n")
+        # the first part is skipped, as if copied from the previous input file
+        assert ["\n".join(renderer.iter_lines(task)) for task in tasks[1:]] == [parts.jobdata(b) for b in beams[1:]]
+        assert renderer.result(include) == str(tmp_path / "beam0.inp")
+    assert (tmp_path / "beam0.inp").read_text() == parts.jobdata(beams[0]) + "\n"
+    assert not os.path.exists(folder)
+
+
+def test_elements_section_in_bulk():
+    section = Section()
+    nodes = [SimpleNamespace(key=key) for key in range(1, 6)]
+    elements = [Element(3, nodes[1:5], section=section), Element(1, nodes[:4], section=section)]
+    assert parts._generate_elements_section(make_part(elements=elements)).split("\n") == [
+        "*Element, type=C3D4, elset=aux_C3D4_steel",
+        "1, 1, 2, 3, 4",
+        "3, 2, 3, 4, 5",
+        "*Solid Section, elset=aux_C3D4_steel, material=steel",
+    ]
+
+
+def test_elements_section_checks_the_implementation():
+    nodes = [SimpleNamespace(key=key) for key in range(1, 3)]
+    part = make_part(elements=[Element(1, nodes, "B31", Section()), UnsupportedElement(2, nodes, "B21", Section())])
+    with pytest.raises(NotImplementedError):
+        parts._generate_elements_section(part)
+
+
+def test_elements_section_writes_custom_elements_with_their_jobdata():
+    section = Section()
+    node = SimpleNamespace(key=1)
+    elements = [MassElement(2, [node], "MASS", section), MassElement(1, [node], "MASS", section)]
+    assert parts._generate_elements_section(make_part(elements=elements)).split("\n") == [
+        "*Element, type=MASS, elset=aux_MASS_steel",
+        "*ELEMENT, TYPE=MASS, ELSET=m1",
+        "m1, 1",
+        "*ELEMENT, TYPE=MASS, ELSET=m2",
+        "m2, 1",
+        "*Solid Section, elset=aux_MASS_steel, material=steel",
+    ]
+
+
+def test_orientation_buckets():
+    labels, inverse = parts._orientation_buckets(
+        [[1, 0, 0, 0, 1, 0], [-1, 0, 0, 0, 1, 0], [1.001, -0.0, 0, 0, 1, 0], [np.nan] * 6, [0, 0, 1] + [np.nan] * 3]
+    )
+    buckets = [labels[i] for i in inverse]
+    assert buckets == [
+        "1.0_0.0_0.0_0.0_1.0_0.0",
+        "-1.0_0.0_0.0_0.0_1.0_0.0",
+        "1.0_0.0_0.0_0.0_1.0_0.0",
+        None,
+        "0.0_0.0_1.0",
+    ]
+
+
+def make_frame(xaxis, yaxis):
+    return SimpleNamespace(
+        xaxis=SimpleNamespace(x=xaxis[0], y=xaxis[1], z=xaxis[2]),
+        yaxis=SimpleNamespace(x=yaxis[0], y=yaxis[1], z=yaxis[2]),
+    )
+
+
+def test_group_elements_by_orientation():
+    nodes = [SimpleNamespace(key=key) for key in range(1, 5)]
+    shell, beam = Section(), Section()
+    shell.name, beam.name = "shell", "beam"
+    shells = []
+    for key, xaxis in [(1, [1, 0, 0]), (2, [-1, 0, 0]), (3, [1, 0, 0])]:
+        element = Element(key, nodes, "S4", shell)
+        element.ndim, element._orientation = 2, make_frame(xaxis, [0, 1, 0])
+        shells.append(element)
+    beams = []
+    for key, orientation in [(4, [0, 0, 1]), (5, [0, 0, -1])]:
+        element = Element(key, nodes[:2], "B31", beam)
+        element.ndim, element._orientation = 1, orientation
+        beams.append(element)
+    grouped = parts._group_elements(make_part(elements=shells + beams))
+    assert {orientation: keys.tolist() for orientation, (keys, _, _) in grouped["S4"][shell].items()} == {
+        "1.0_0.0_0.0_0.0_1.0_0.0": [1, 3],
+        "-1.0_0.0_0.0_0.0_1.0_0.0": [2],
+    }
+    assert {orientation: keys.tolist() for orientation, (keys, _, _) in grouped["B31"][beam].items()} == {
+        "0.0_0.0_1.0": [4],
+        "0.0_0.0_-1.0": [5],
+    }
+    part = make_part(elements=shells + beams)
+    elsets = [block[1] for block in parts._iter_element_blocks(part)]
+    assert elsets == [
+        "aux_S4_shell_1p0_0p0_0p0_0p0_1p0_0p0",
+        "aux_S4_shell_m1p0_0p0_0p0_0p0_1p0_0p0",
+        "aux_B31_beam_0p0_0p0_1p0",
+        "aux_B31_beam_0p0_0p0_m1p0",
+    ]
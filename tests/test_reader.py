@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from compas_fea2_abaqus.results import AbaqusResultsReader
+from compas_fea2_abaqus.results import results_to_sql
+
+COMPONENTS = [["S11", "s11"], ["S22", "s22"], ["S33", "s33"], ["S12", "s12"], ["S13", "s13"], ["S23", "s23"]]
+
+
+def extract(odb_folder, file_format, dtype="float64", compression=None):
+    fields = [
+        results_to_sql.field_request("u", ["U"], [["U1", "x"], ["U2", "y"], ["U3", "z"]], frames="all"),
+        results_to_sql.field_request(
+            "s", ["S"], COMPONENTS, [["MISES", "von_mises"]], frames="all", dtype=dtype, compression=compression
+        ),
+    ]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields, file_format=file_format)
+    return str(odb_folder / ("job-results.db" if file_format == "db" else "job-results"))
+
+
+@pytest.mark.parametrize("dtype, compression", [("float64", None), ("float32", None), ("float32", "zlib")])
+@pytest.mark.parametrize("file_format", ["db", "npy"])
+def test_reader(odb, odb_folder, file_format, dtype, compression):
+    with AbaqusResultsReader(extract(odb_folder, file_format, dtype, compression)) as reader:
+        assert sorted(reader.fields) == ["s", "u"]
+        assert reader.steps == ["Step-1", "Step-2"]
+        assert reader.parts == ["PART0", "PART1"]
+        assert reader.components("s") == ["s11", "s22", "s33", "s12", "s13", "s23", "von_mises"]
+        assert reader.frames("s", "Step-2").tolist() == [0, 1, 2]
+        assert np.allclose(reader.times("s", "Step-2"), [1 / 3, 2 / 3, 1])
+        for block in odb.steps["Step-2"].frames[1].fieldOutputs["S"].bulkDataBlocks:
+            part = block.instance.name[:-2]
+            keys = reader.keys("s", "Step-2", part, frame=1)
+            points = reader.points("s", "Step-2", part, frame=1)
+            values = reader.values("s", "Step-2", part, frame=1, components=reader.components("s")[:6])
+            assert keys.tolist() == block.elementLabels.tolist()
+            assert points[:, 0].tolist() == block.integrationPoints.tolist()
+            assert values.dtype == np.dtype(dtype)
+            assert np.array_equal(values, block.data.astype(dtype))
+            mises = reader.column("s", "von_mises", "Step-2", part, frame=1)
+            expected = results_to_sql.compute_invariants([c for c, _ in COMPONENTS], block.data, ["MISES"])["MISES"]
+            assert np.allclose(mises, expected.astype(dtype), rtol=1e-6)
+        # the last frame by default
+        last = odb.steps["Step-1"].frames[2].fieldOutputs["U"].bulkDataBlocks[1]
+        assert np.array_equal(reader.values("u", "Step-1", "PART1", keys=last.nodeLabels[::-1]), last.data[::-1])
+
+
+@pytest.mark.parametrize("file_format", ["db", "npy"])
+def test_reader_rows(odb, odb_folder, file_format):
+    with AbaqusResultsReader(extract(odb_folder, file_format)) as reader:
+        keys = reader.keys("s", "Step-1", "PART0")
+        # the rows of the keys at several integration points are consecutive
+        rows = reader.rows("s", "Step-1", "PART0", [3, 1])
+        assert keys[rows].tolist() == [3, 3, 1, 1]
+        assert reader.points("s", "Step-1", "PART0")[rows, 0].tolist() == [1, 2, 1, 2]
+        with pytest.raises(KeyError):
+            reader.rows("s", "Step-1", "PART0", [100])
+        with pytest.raises(KeyError):
+            reader.column("s", "unknown", "Step-1", "PART0")
+        with pytest.raises(KeyError):
+            reader.values("s", "Step-1", "PART0", frame=5)
+        with pytest.raises(KeyError):
+            reader.values("unknown", "Step-1", "PART0")
+
+
+def test_reader_memory_maps_the_store(odb, odb_folder):
+    with AbaqusResultsReader(extract(odb_folder, "npy")) as reader:
+        assert isinstance(reader.column("u", "x", "Step-1", "PART0"), np.memmap)
+        assert reader._results_bytes == 0
+
+
+def test_reader_cache_bytes(odb, odb_folder):
+    path = extract(odb_folder, "db")
+    with AbaqusResultsReader(path) as reader:
+        first = reader.column("u", "x", "Step-1", "PART0")
+        assert reader.column("u", "x", "Step-1", "PART0") is first
+        assert 0 < reader._results_bytes <= reader.cache_bytes
+    with AbaqusResultsReader(path, cache_bytes=0) as reader:
+        first = reader.column("u", "x", "Step-1", "PART0")
+        assert reader.column("u", "x", "Step-1", "PART0") is not first
+        assert not reader._results
+    # the least recently used results are dropped first
+    with AbaqusResultsReader(path) as reader:
+        reader.values("u", "Step-1", "PART0", frame=0)
+        reader.cache_bytes = 2 * reader._results_bytes
+        for frame in range(1, 3):
+            reader.values("u", "Step-1", "PART0", frame=frame)
+        assert [key[3] for key in reader._results] == [1, 2]
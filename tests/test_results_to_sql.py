@@ -0,0 +1,482 @@
+import os
+import sqlite3
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import fake_odb
+from compas_fea2_abaqus.results import AbaqusResultsReader
+from compas_fea2_abaqus.results import results_to_sql
+
+U = dict(abaqus_fields=["U"], components=[["U1", "x"], ["U2", "y"], ["U3", "z"]])
+S = dict(
+    abaqus_fields=["S"],
+    components=[["S11", "s11"], ["S22", "s22"], ["S33", "s33"], ["S12", "s12"], ["S13", "s13"], ["S23", "s23"]],
+)
+
+
+def odb_values(odb, abaqus_field, step, frame):
+    """Return the {(part, key, ip, sp): values} of a field output of the odb,
+    with the node in place of the integration point for the values at the
+    nodes of the elements."""
+    values = {}
+    for block in odb.steps[step].frames[frame].fieldOutputs[abaqus_field].bulkDataBlocks:
+        part = block.instance.name[:-2]
+        labels = block.elementLabels if block.elementLabels is not None else block.nodeLabels
+        if block.elementLabels is not None and block.nodeLabels is not None:
+            points = block.nodeLabels
+        elif block.integrationPoints is not None:
+            points = block.integrationPoints
+        else:
+            points = np.zeros(len(labels), dtype=int)
+        for key, ip, data in zip(labels, points, block.data):
+            values[(part, int(key), int(ip), 0)] = tuple(float(value) for value in data)
+    return values
+
+
+def stored_values(database, field, names, step, frame):
+    """Return the {(part, key, ip, sp): values} stored in the database."""
+    sql = "SELECT part, key, ip, sp, {} FROM {} WHERE step = ? AND frame = ?".format(", ".join(names), field)
+    with sqlite3.connect(str(database)) as conn:
+        return dict((tuple(row[:4]), tuple(row[4:])) for row in conn.execute(sql, (step, frame)))
+
+
+def test_extract_odb_data(odb, odb_folder):
+    fields = [results_to_sql.field_request("u", **U), results_to_sql.field_request("s", frames="all", **S)]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields)
+    database = odb_folder / "job-results.db"
+    for step in ("Step-1", "Step-2"):
+        assert stored_values(database, "u", ["x", "y", "z"], step, 2) == odb_values(odb, "U", step, 2)
+        assert not stored_values(database, "u", ["x", "y", "z"], step, 0)
+        for frame in range(3):
+            names = ["s11", "s22", "s33", "s12", "s13", "s23"]
+            assert stored_values(database, "s", names, step, frame) == odb_values(odb, "S", step, frame)
+
+
+def frame_results():
+    """Return the results of a field in a frame, as merged by part."""
+    keys = np.array([1, 2, 3])
+    points = np.zeros((3, 2), dtype=np.int64)
+    values = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [7.0, 8.0, 9.0]])
+    return [("PART0", ["node"] * 3, ["NODAL"] * 3, keys, points, values)]
+
+
+def test_sqlite_writer(tmp_path):
+    database = str(tmp_path / "results.db")
+    writer = results_to_sql.SqliteWriter(database)
+    writer.add_field("u", ["x", "y"], ["magnitude"])
+    writer.write_frame("Step-1", 0, 0.5, [("u", frame_results())])
+    writer.write_frame("Step-1", 1, 1.0, [("u", frame_results()[:1])])
+    writer.info["odb"] = "fingerprint"
+    writer.close()
+    with sqlite3.connect(database) as conn:
+        rows = conn.execute("SELECT step, frame, time, part, type, position, key, x, y, magnitude FROM u").fetchall()
+        assert sorted(rows)[:3] == [
+            ("Step-1", 0, 0.5, "PART0", "node", "NODAL", 1, 1.0, 2.0, 3.0),
+            ("Step-1", 0, 0.5, "PART0", "node", "NODAL", 2, 4.0, 5.0, 6.0),
+            ("Step-1", 0, 0.5, "PART0", "node", "NODAL", 3, 7.0, 8.0, 9.0),
+        ]
+        assert len(rows) == 6
+        assert dict(conn.execute("SELECT property, description FROM info"))["odb"] == "fingerprint"
+    writer = results_to_sql.SqliteWriter(database, append=True)
+    assert writer.extracted == {("u", "Step-1", 0), ("u", "Step-1", 1)}
+    # the fields of a frame are written in a single transaction
+    with pytest.raises(KeyError):
+        writer.write_frame("Step-2", 0, 1.0, [("u", frame_results()), ("unknown", frame_results())])
+    assert ("u", "Step-2", 0) not in writer.extracted
+    writer.close()
+    with sqlite3.connect(database) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM u WHERE step = 'Step-2'").fetchone() == (0,)
+
+
+def test_npy_writer(tmp_path):
+    path = str(tmp_path / "results")
+    writer = results_to_sql.NpyWriter(path)
+    writer.add_field("u", ["x", "y"], ["magnitude"], dtype="float64")
+    writer.write_frame("Step-1", 0, 0.5, [("u", frame_results())])
+    writer.close()
+    manifest = results_to_sql.read_store_manifest(path)
+    assert manifest["fields"]["u"]["components"] == ["x", "y"]
+    assert manifest["extracted"] == [["u", "Step-1", 0]]
+    (block,) = manifest["blocks"]
+    assert [block[name] for name in ("step", "frame", "time", "part", "rows")] == ["Step-1", 0, 0.5, "PART0", 3]
+    assert results_to_sql.load_store_array(path, block, "keys").tolist() == [1, 2, 3]
+    assert results_to_sql.load_store_array(path, block, "ip") is None
+    magnitude = results_to_sql.load_store_array(path, block, "magnitude", mmap_mode="r")
+    assert isinstance(magnitude, np.memmap)
+    assert magnitude.tolist() == [3.0, 6.0, 9.0]
+
+
+def test_extract_odb_data_to_npy(odb, odb_folder):
+    results_to_sql.extract_odb_data(str(odb_folder), "job", [results_to_sql.field_request("u", **U)], file_format="npy")
+    path = str(odb_folder / "job-results")
+    stored = {}
+    for block in results_to_sql.read_store_manifest(path)["blocks"]:
+        assert (block["step"], block["frame"]) in [("Step-1", 2), ("Step-2", 2)]
+        keys = results_to_sql.load_store_array(path, block, "keys")
+        values = np.column_stack([results_to_sql.load_store_array(path, block, name) for name in "xyz"])
+        for key, row in zip(keys.tolist(), values.tolist()):
+            stored[(block["step"], block["part"], key, 0, 0)] = tuple(row)
+    expected = {}
+    for step in ("Step-1", "Step-2"):
+        expected.update(((step,) + key, values) for key, values in odb_values(odb, "U", step, 2).items())
+    assert stored == expected
+
+
+def test_merge_bulk_blocks_keeps_the_section_points():
+    labels = np.array([1, 1, 2, 2])
+    ips = np.array([[1, 1], [2, 1], [1, 1], [2, 1]])
+    data = np.arange(8.0).reshape(4, 2)
+    blocks = [
+        ("PART0", "element", "INTEGRATION_POINT", labels, ips, data, [(0, 0), (1, 1)]),
+        ("PART0", "element", "INTEGRATION_POINT", labels, ips + [0, 1], -data, [(0, 0), (1, 1)]),
+    ]
+    ((part, _, _, keys, points, values),) = results_to_sql.merge_bulk_blocks(blocks, 2)
+    assert keys.tolist() == [1, 1, 1, 1, 2, 2, 2, 2]
+    assert points.tolist() == [[1, 1], [1, 2], [2, 1], [2, 2]] * 2
+    assert values[:4].tolist() == [[0.0, 1.0], [-0.0, -1.0], [2.0, 3.0], [-2.0, -3.0]]
+
+
+def test_merge_bulk_blocks_of_large_keys():
+    labels = np.array([2**40, 2**40, 7])
+    nodes = np.array([[2**20, 0], [2**20 + 1, 0], [2**20, 0]])
+    blocks = [("PART0", "element", "ELEMENT_NODAL", labels, nodes, np.array([[1.0], [2.0], [3.0]]), [(0, 0)])]
+    ((_, _, _, keys, points, values),) = results_to_sql.merge_bulk_blocks(blocks, 1)
+    assert keys.tolist() == [7, 2**40, 2**40]
+    assert points.tolist() == [[2**20, 0], [2**20, 0], [2**20 + 1, 0]]
+    assert values.ravel().tolist() == [3.0, 1.0, 2.0]
+
+
+def test_extract_odb_data_at_the_nodes_of_the_elements(odb, odb_folder):
+    fields = [results_to_sql.field_request("nf", ["NFORC"], [["NFORC1", "x"], ["NFORC2", "y"], ["NFORC3", "z"]])]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields)
+    stored = stored_values(odb_folder / "job-results.db", "nf", ["x", "y", "z"], "Step-1", 2)
+    # each element has its own value at each of its nodes, even if shared
+    assert len(stored) == 2 * 3 * 2
+    assert stored == odb_values(odb, "NFORC", "Step-1", 2)
+    with sqlite3.connect(str(odb_folder / "job-results.db")) as conn:
+        assert conn.execute("SELECT DISTINCT type, position FROM nf").fetchall() == [("element", "ELEMENT_NODAL")]
+
+
+@pytest.mark.parametrize("reduction", ["mean", "max"])
+def test_reduce_points(reduction):
+    labels = np.array([3, 1, 3, 1, 3])
+    data = np.array([[1.0, -1.0], [2.0, 0.0], [4.0, 5.0], [6.0, 2.0], [7.0, 3.0]])
+    keys, points, values = results_to_sql.reduce_points(labels, data, reduction)
+    function = getattr(np, reduction)
+    assert keys.tolist() == [1, 3]
+    assert not points.any()
+    assert np.allclose(values, [function(data[labels == key], axis=0) for key in (1, 3)])
+
+
+@pytest.mark.parametrize("reduction", ["mean", "max", "centroid"])
+def test_extract_odb_data_reduced(odb, odb_folder, reduction):
+    fields = [results_to_sql.field_request("s", reduction=reduction, **S)]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields)
+    names = ["s11", "s22", "s33", "s12", "s13", "s23"]
+    stored = stored_values(odb_folder / "job-results.db", "s", names, "Step-1", 2)
+    values = odb_values(odb, "S", "Step-1", 2)
+    function = np.max if reduction == "max" else np.mean
+    expected = {}
+    for part, key in set((part, key) for part, key, _, _ in values):
+        points = [data for (p, k, _, _), data in values.items() if (p, k) == (part, key)]
+        expected[(part, key, 0, 0)] = tuple(function(points, axis=0))
+    assert set(stored) == set(expected)
+    for key, data in expected.items():
+        assert np.allclose(stored[key], data)
+
+
+def von_mises(s11, s22, s33, s12, s13, s23):
+    return np.sqrt(0.5 * ((s11 - s22) ** 2 + (s22 - s33) ** 2 + (s33 - s11) ** 2) + 3 * (s12**2 + s13**2 + s23**2))
+
+
+@pytest.mark.parametrize("reduction", ["mean", "max"])
+def test_extract_odb_data_reduced_invariants(odb, odb_folder, reduction):
+    invariants = [["MISES", "von_mises"], ["MIN_PRINCIPAL", "min_principal"]]
+    fields = [
+        results_to_sql.field_request("s", invariants=invariants, reduction=reduction, **S),
+        # the same field output, read once, without reduction
+        results_to_sql.field_request("s_points", invariants=invariants, **S),
+    ]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields)
+    names = ["s11", "s22", "s33", "s12", "s13", "s23", "von_mises", "min_principal"]
+    stored = stored_values(odb_folder / "job-results.db", "s", names, "Step-1", 2)
+    assert stored
+    for values in stored.values():
+        # the invariants of the reduced stress, not the reduction of the invariants
+        components = np.array([values[:6]])
+        expected = results_to_sql.compute_invariants([c for c, _ in S["components"]], components, ["MIN_PRINCIPAL"])
+        assert np.isclose(values[6], von_mises(*values[:6]))
+        assert np.isclose(values[7], expected["MIN_PRINCIPAL"][0])
+    assert len(stored_values(odb_folder / "job-results.db", "s_points", names, "Step-1", 2)) == 2 * len(stored)
+
+
+def test_compute_invariants():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(20, 6))
+    labels = ["S11", "S22", "S33", "S12", "S13", "S23"]
+    names = ["MISES", "MAX_PRINCIPAL", "MID_PRINCIPAL", "MIN_PRINCIPAL", "TRESCA", "PRESS"]
+    invariants = results_to_sql.compute_invariants(labels, data, names)
+    assert list(invariants) == names
+    s11, s22, s33, s12, s13, s23 = data.T
+    tensors = np.array([[[a, d, e], [d, b, f], [e, f, c]] for a, b, c, d, e, f in data])
+    principals = np.linalg.eigvalsh(tensors)
+    assert np.allclose(invariants["MISES"], von_mises(*data.T))
+    assert np.allclose(invariants["MIN_PRINCIPAL"], principals[:, 0])
+    assert np.allclose(invariants["MID_PRINCIPAL"], principals[:, 1])
+    assert np.allclose(invariants["MAX_PRINCIPAL"], principals[:, 2])
+    assert np.allclose(invariants["TRESCA"], principals[:, 2] - principals[:, 0])
+    assert np.allclose(invariants["PRESS"], -(s11 + s22 + s33) / 3)
+    magnitude = results_to_sql.compute_invariants(["U1", "U2", "U3"], data[:, :3], ["MAGNITUDE"])["MAGNITUDE"]
+    assert np.allclose(magnitude, np.linalg.norm(data[:, :3], axis=1))
+
+
+def test_compute_invariants_of_plane_tensors():
+    data = np.array([[3.0, 1.0, 2.0]])
+    invariants = results_to_sql.compute_invariants(["S11", "S22", "S12"], data, ["MISES", "MAX_INPLANE_PRINCIPAL"])
+    assert np.allclose(invariants["MISES"], np.sqrt(9.0 + 1.0 - 3.0 + 3 * 4.0))
+    assert np.allclose(invariants["MAX_INPLANE_PRINCIPAL"], 2.0 + np.sqrt(5.0))
+    with pytest.raises(ValueError):
+        results_to_sql.compute_invariants(["S11", "S22", "S12"], data, ["UNKNOWN"])
+
+
+def test_extract_odb_data_with_invariants(odb, odb_folder):
+    fields = [results_to_sql.field_request("s", invariants=[["MISES", "von_mises"]], **S)]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields)
+    names = ["s11", "s22", "s33", "s12", "s13", "s23", "von_mises"]
+    stored = stored_values(odb_folder / "job-results.db", "s", names, "Step-2", 2)
+    assert stored
+    for values in stored.values():
+        assert np.isclose(values[-1], von_mises(*values[:-1]))
+
+
+def test_extract_odb_data_append(odb, odb_folder, monkeypatch, capsys):
+    extract_frame_data = results_to_sql.extract_frame_data
+    extracted = []
+
+    def record(writer, step_name, frame_index, frame, fields):
+        extracted.append((step_name, frame_index))
+        extract_frame_data(writer, step_name, frame_index, frame, fields)
+
+    monkeypatch.setattr(results_to_sql, "extract_frame_data", record)
+    database = odb_folder / "job-results.db"
+    fields = [results_to_sql.field_request("u", frames="last", **U)]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields, append=True)
+    assert extracted == [("Step-1", 2), ("Step-2", 2)]
+
+    # only the frames not extracted yet are added
+    extracted.clear()
+    fields = [results_to_sql.field_request("u", frames="all", **U)]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields, append=True)
+    assert extracted == [("Step-1", 0), ("Step-1", 1), ("Step-2", 0), ("Step-2", 1)]
+    for frame in range(3):
+        assert stored_values(database, "u", ["x", "y", "z"], "Step-1", frame) == odb_values(odb, "U", "Step-1", frame)
+
+    # nothing is extracted for the same request on the same odb
+    extracted.clear()
+    capsys.readouterr()
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields, append=True)
+    assert not extracted
+    assert "up to date" in capsys.readouterr().out
+
+    # the results of a field whose storage changed are replaced
+    fields = [results_to_sql.field_request("u", frames="all", dtype="float32", **U)]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields, append=True)
+    assert len(extracted) == 6
+
+    # all the results are extracted again from a new odb
+    extracted.clear()
+    (odb_folder / "job.odb").write_bytes(b"new odb")
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields, append=True)
+    assert len(extracted) == 6
+
+
+def test_extract_odb_data_in_regions(odb, odb_folder):
+    odb.rootAssembly.nodeSets["TOP"] = fake_odb.OdbSet("TOP", {"PART0-1": np.array([1, 3])})
+    odb.rootAssembly.elementSets["CORE"] = fake_odb.OdbSet("CORE", {"PART1-1": np.array([5])})
+    fields = [
+        results_to_sql.field_request("u", regions=["nset:top"], **U),
+        results_to_sql.field_request("s", regions=["elset:core", "nset:top"], **S),
+    ]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields)
+    database = odb_folder / "job-results.db"
+    u = odb_values(odb, "U", "Step-1", 2)
+    assert stored_values(database, "u", ["x", "y", "z"], "Step-1", 2) == dict(
+        (key, values) for key, values in u.items() if key[:2] in [("PART0", 1), ("PART0", 3)]
+    )
+    s = odb_values(odb, "S", "Step-1", 2)
+    names = ["s11", "s22", "s33", "s12", "s13", "s23"]
+    assert stored_values(database, "s", names, "Step-1", 2) == dict(
+        (key, values) for key, values in s.items() if key[:2] == ("PART1", 5)
+    )
+    fields = [results_to_sql.field_request("u", regions=["nset:bottom"], **U)]
+    with pytest.raises(KeyError):
+        results_to_sql.extract_odb_data(str(odb_folder), "job", fields)
+
+
+def test_extraction_manifest(odb, odb_folder):
+    path = str(odb_folder / "job-extraction.json")
+    requests = [{"name": "u", "abaqus_fields": ["U"], "components": U["components"]}]
+    results_to_sql.write_extraction_manifest(path, str(odb_folder), "job", requests, steps=[1], format="npy")
+    arguments = results_to_sql.read_extraction_manifest(path)
+    assert arguments == {
+        "database_path": str(odb_folder),
+        "database_name": "job",
+        "fields": [results_to_sql.field_request("u", **U)],
+        "steps": [1],
+        "file_format": "npy",
+    }
+    results_to_sql.extract_odb_data(**arguments)
+    manifest = results_to_sql.read_store_manifest(str(odb_folder / "job-results"))
+    assert manifest["extracted"] == [["u", "Step-2", 2]]
+
+    with open(path, "w") as f:
+        f.write('{"version": 0}')
+    with pytest.raises(ValueError):
+        results_to_sql.read_extraction_manifest(path)
+
+
+def read_results(path):
+    """Return all the results of a database or of a columnar store."""
+    results = {}
+    with AbaqusResultsReader(path) as reader:
+        for field in reader.fields:
+            for step in reader.steps:
+                results[(field, step)] = reader.times(field, step).tolist()
+                for frame in reader.frames(field, step).tolist():
+                    for part in reader.parts:
+                        points = reader.points(field, step, part, frame)
+                        results[(field, step, frame, part)] = (
+                            reader.keys(field, step, part, frame).tolist(),
+                            None if points is None else points.tolist(),
+                            reader.values(field, step, part, frame).tolist(),
+                        )
+    return results
+
+
+@pytest.mark.parametrize("file_format", ["db", "npy"])
+def test_merge_shards(odb, odb_folder, file_format):
+    fields = [
+        results_to_sql.field_request("u", frames="all", **U),
+        results_to_sql.field_request("s", dtype="float32", compression="zlib", **S),
+    ]
+    extension = ".db" if file_format == "db" else ""
+    database = str(odb_folder / "job-results{}".format(extension))
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields, file_format=file_format)
+    serial = read_results(database)
+
+    # one shard per step, as written by the parallel extraction
+    shards = [str(odb_folder / "job-results-{}{}".format(step, extension)) for step in range(2)]
+    for step, shard in enumerate(shards):
+        results_to_sql.extract_odb_data(
+            str(odb_folder), "job", fields, steps=[step], output=shard, file_format=file_format
+        )
+    if file_format == "db":
+        results_to_sql.merge_databases(database, shards)
+    else:
+        results_to_sql.merge_stores(database, shards)
+    assert read_results(database) == serial
+    assert not any(os.path.exists(shard) for shard in shards)
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+@pytest.mark.parametrize("dtype", ["float64", "float32", "float16"])
+def test_pack_array(dtype, compression):
+    array = np.linspace(-1.0, 1.0, 12).reshape(4, 3).astype(dtype)
+    unpacked = results_to_sql.unpack_array(results_to_sql.pack_array(array, compression), compression)
+    assert unpacked.dtype == array.dtype
+    assert np.array_equal(unpacked, array)
+
+
+def test_extract_odb_data_packed(odb, odb_folder):
+    fields = [results_to_sql.field_request("s", dtype="float32", compression="zlib", **S)]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields)
+    with sqlite3.connect(str(odb_folder / "job-results.db")) as conn:
+        description = conn.execute("SELECT description FROM fields WHERE field = 's'").fetchone()[0]
+        assert results_to_sql.field_storage(description) == ("float32", "zlib")
+        blocks = list(results_to_sql.read_packed_field(conn, "s", "zlib"))
+    assert len(blocks) == 4
+    for step, frame, _, part, key_type, position, keys, points, data in blocks:
+        assert (frame, key_type, position) == (2, "element", "INTEGRATION_POINT")
+        assert data.dtype == np.float32
+        stored = dict(((part, key, ip, sp), tuple(row)) for key, (ip, sp), row in zip(keys, points, data.tolist()))
+        expected = odb_values(odb, "S", step, frame)
+        assert stored == dict((key, values) for key, values in expected.items() if key[0] == part)
+
+
+def test_iter_bulk_blocks(odb):
+    field_output = odb.steps["Step-1"].frames[0].fieldOutputs["S"]
+    blocks = list(results_to_sql.iter_bulk_blocks(field_output, invariants=["MISES"]))
+    assert [block[:3] for block in blocks] == [
+        ("PART0", "element", "INTEGRATION_POINT"),
+        ("PART1", "element", "INTEGRATION_POINT"),
+    ]
+    for (_, _, _, labels, points, data), block in zip(blocks, field_output.bulkDataBlocks):
+        assert labels.tolist() == block.elementLabels.tolist()
+        assert points.tolist() == [[ip, 0] for ip in block.integrationPoints]
+        assert np.array_equal(data[:, :6], block.data)
+        assert np.allclose(data[:, 6], von_mises(*block.data.T.astype(float)))
+
+
+@pytest.mark.parametrize(
+    "selection, indices",
+    [
+        (None, [4]),
+        ("last", [4]),
+        ("all", [0, 1, 2, 3, 4]),
+        ("every:2", [0, 2, 4]),
+        ("time:0.25:0.75", [1, 2, 3]),
+        ("time::0.25", [0, 1]),
+        ([0, -1, 10], [0, 4]),
+        ("3,1,1", [1, 3]),
+    ],
+)
+def test_select_frames(selection, indices):
+    frames = [SimpleNamespace(frameValue=index / 4.0) for index in range(5)]
+    assert [index for index, _ in results_to_sql.select_frames(frames, selection)] == indices
+    assert not list(results_to_sql.select_frames([], selection))
+
+
+def test_database_schema(odb, odb_folder):
+    fields = [results_to_sql.field_request("u", frames="all", **U)]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields)
+    with sqlite3.connect(str(odb_folder / "job-results.db")) as conn:
+        assert conn.execute("SELECT name FROM steps ORDER BY id").fetchall() == [("Step-1",), ("Step-2",)]
+        assert conn.execute("SELECT name FROM parts ORDER BY id").fetchall() == [("PART0",), ("PART1",)]
+        assert conn.execute("SELECT type, name FROM positions").fetchall() == [("node", "NODAL")]
+        assert conn.execute("SELECT COUNT(*) FROM frames").fetchone() == (6,)
+        indexes = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'u_data'")
+        assert ("u_part_key",) in indexes.fetchall()
+        # the results refer to the dimension tables by id
+        assert conn.execute("SELECT DISTINCT typeof(step_id), typeof(part_id) FROM u_data").fetchall() == [
+            ("integer", "integer")
+        ]
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO u_data SELECT * FROM u_data LIMIT 1")
+
+
+def test_extract_odb_data_reads_each_field_output_once(odb, odb_folder, monkeypatch):
+    reads = []
+    bulk_data_blocks = fake_odb.FieldOutput.bulkDataBlocks
+
+    def read(field_output):
+        reads.append(field_output.name)
+        return bulk_data_blocks.fget(field_output)
+
+    monkeypatch.setattr(fake_odb.FieldOutput, "bulkDataBlocks", property(read))
+    fields = [
+        results_to_sql.field_request("u", ["U"], [["U1", "x"], ["U2", "y"]]),
+        results_to_sql.field_request("uz", ["U"], [["U3", "z"]], invariants=[["MAGNITUDE", "magnitude"]]),
+        results_to_sql.field_request("s", **S),
+    ]
+    results_to_sql.extract_odb_data(str(odb_folder), "job", fields)
+    assert sorted(reads) == ["S", "S", "U", "U"]
+    database = odb_folder / "job-results.db"
+    u = stored_values(database, "u", ["x", "y"], "Step-1", 2)
+    uz = stored_values(database, "uz", ["z", "magnitude"], "Step-1", 2)
+    for key, (x, y, z) in odb_values(odb, "U", "Step-1", 2).items():
+        assert u[key] == (x, y)
+        assert uz[key][0] == z
+        magnitude = uz[key][1]
+        assert np.isclose(magnitude, np.linalg.norm([x, y, z]))
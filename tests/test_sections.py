@@ -0,0 +1,15 @@
+from types import SimpleNamespace
+
+from compas_fea2_abaqus.model.sections import AbaqusShellSection
+
+
+def test_shell_section_orientation_per_set():
+    section = SimpleNamespace(name="shell", material=SimpleNamespace(name="steel"), t=0.1, int_points=5)
+    orientations = {
+        "aux_S4_shell_1p0_0p0_0p0_0p0_1p0_0p0": ["1.0", "0.0", "0.0", "0.0", "1.0", "0.0"],
+        "aux_S4_shell_m1p0_0p0_0p0_0p0_1p0_0p0": ["-1.0", "0.0", "0.0", "0.0", "1.0", "0.0"],
+    }
+    for set_name, orientation in orientations.items():
+        lines = AbaqusShellSection.jobdata(section, set_name, orientation).split("\n")
+        assert lines[0] == "*Orientation, name=Ori_{}".format(set_name)
+        assert lines[3].endswith("elset={0}, material=steel, orientation=Ori_{0}".format(set_name))
@@ -0,0 +1,71 @@
+import io
+import os
+
+from compas_fea2_abaqus.job import streaming
+
+
+def test_read_lines(tmp_path):
+    content = "*Node\n1, 0.0\n2, 1.0\n\n*Element\n1, 1, 2"
+    path = tmp_path / "part.inp"
+    path.write_text(content)
+    lines = list(streaming.read_lines(str(path), size=4))
+    assert all(not line.endswith("\n") for line in lines)
+    buffer = io.StringIO()
+    streaming.write_lines(buffer, lines)
+    assert buffer.getvalue() == content
+
+
+def write(path, sections, previous=None):
+    """Write the sections to a file, splicing the unchanged ones from the
+    previous content of the file, and return the manifest."""
+    source = open(path, "rb") if previous else None
+    try:
+        with open(str(path) + ".tmp", "w") as f:
+            manifest = streaming.write_sections(f, sections, previous=previous, source=source)
+    finally:
+        if source:
+            source.close()
+    os.replace(str(path) + ".tmp", path)
+    return manifest
+
+
+def test_write_sections_splices_the_unchanged_sections(tmp_path):
+    rendered = []
+
+    def section(name, digest, lines):
+        def render():
+            rendered.append(name)
+            return lines
+
+        return name, lambda: digest, render
+
+    path = tmp_path / "job.inp"
+    heading = ("heading", None, lambda: ["*Heading"])
+    manifest = write(path, [heading, section("a", "1", ["*Part, name=a", "*End Part"]), section("b", "1", ["**"])])
+    assert rendered == ["a", "b"]
+    assert path.read_text() == "*Heading\n*Part, name=a\n*End Part\n**"
+    assert set(manifest) == {"a", "b"}
+
+    # the content of an unchanged section is copied, even if it would render differently
+    rendered.clear()
+    manifest = write(path, [heading, section("a", "1", ["stale"]), section("b", "2", ["*Step", "*End Step"])], manifest)
+    assert rendered == ["b"]
+    assert path.read_text() == "*Heading\n*Part, name=a\n*End Part\n*Step\n*End Step"
+
+    rendered.clear()
+    write(path, [heading, section("b", "2", []), section("a", "1", [])], manifest)
+    assert rendered == []
+    assert path.read_text() == "*Heading\n*Step\n*End Step\n*Part, name=a\n*End Part"
+
+
+def test_manifest(tmp_path):
+    path = tmp_path / "job.inp"
+    path.write_text("*Heading")
+    manifest_path = str(tmp_path / "job-sections.json")
+    sections = {"heading": ["1", 0, 8]}
+    assert streaming.read_manifest(manifest_path, str(path)) is None
+    streaming.write_manifest(manifest_path, str(path), sections)
+    assert streaming.read_manifest(manifest_path, str(path)) == sections
+    # the manifest does not describe an input file written since
+    path.write_text("*Heading, changed")
+    assert streaming.read_manifest(manifest_path, str(path)) is None